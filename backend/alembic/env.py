@@ -18,6 +18,8 @@ sys.path.append(PROJECT_ROOT)
 from app.db.base_class import Base
 from app.db.models.user import User # Importar User
 from app.db.models.report import Report # Importar Report
+from app.db.models.fire_detection import FireDetection, FirmsDailyRollup, FirmsSyncState # Store local de FIRMS
+from app.db.models.gee import GeeFireDay, GeeJob, GeeNdviComposite # Cache persistente de Earth Engine
 # Importa otros modelos aquí si los tienes
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,62 @@
+"""Add fire_detections store and firms_sync_state
+
+Revision ID: 016e8ac52655
+Revises: 3b7fd6ef4f66
+Create Date: 2026-10-18 10:55:12.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '016e8ac52655'
+down_revision: Union[str, None] = '3b7fd6ef4f66'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('fire_detections',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('source', sa.String(length=32), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('acq_date', sa.Date(), nullable=False),
+    sa.Column('acq_time', sa.Integer(), nullable=False),
+    sa.Column('acquired_at', sa.DateTime(), nullable=False),
+    sa.Column('satellite', sa.String(length=16), nullable=False),
+    sa.Column('instrument', sa.String(length=16), nullable=True),
+    sa.Column('confidence', sa.String(length=8), nullable=True),
+    sa.Column('bright_ti4', sa.Float(), nullable=True),
+    sa.Column('brightness', sa.Float(), nullable=True),
+    sa.Column('frp', sa.Float(), nullable=True),
+    sa.Column('daynight', sa.String(length=1), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('source', 'latitude', 'longitude', 'acq_date', 'acq_time', 'satellite', name='uq_fire_detections_pixel')
+    )
+    op.create_index(op.f('ix_fire_detections_id'), 'fire_detections', ['id'], unique=False)
+    op.create_index(op.f('ix_fire_detections_source'), 'fire_detections', ['source'], unique=False)
+    op.create_index(op.f('ix_fire_detections_acq_date'), 'fire_detections', ['acq_date'], unique=False)
+    op.create_index(op.f('ix_fire_detections_acquired_at'), 'fire_detections', ['acquired_at'], unique=False)
+
+    op.create_table('firms_sync_state',
+    sa.Column('source', sa.String(length=32), nullable=False),
+    sa.Column('synced_through', sa.Date(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('source')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('firms_sync_state')
+    op.drop_index(op.f('ix_fire_detections_acquired_at'), table_name='fire_detections')
+    op.drop_index(op.f('ix_fire_detections_acq_date'), table_name='fire_detections')
+    op.drop_index(op.f('ix_fire_detections_source'), table_name='fire_detections')
+    op.drop_index(op.f('ix_fire_detections_id'), table_name='fire_detections')
+    op.drop_table('fire_detections')
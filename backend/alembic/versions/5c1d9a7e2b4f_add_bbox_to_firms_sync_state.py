@@ -0,0 +1,30 @@
+"""Add bbox to firms_sync_state
+
+Revision ID: 5c1d9a7e2b4f
+Revises: 016e8ac52655
+Create Date: 2026-10-18 14:20:41.118304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1d9a7e2b4f'
+down_revision: Union[str, None] = '016e8ac52655'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('firms_sync_state') as batch_op:
+        batch_op.add_column(sa.Column('bbox', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('firms_sync_state') as batch_op:
+        batch_op.drop_column('bbox')
@@ -0,0 +1,42 @@
+"""Add firms_daily_rollups
+
+Revision ID: 8e3f0b6c1a7d
+Revises: 5c1d9a7e2b4f
+Create Date: 2026-10-18 15:02:17.530921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3f0b6c1a7d'
+down_revision: Union[str, None] = '5c1d9a7e2b4f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('firms_daily_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('dimension', sa.String(length=16), nullable=False),
+    sa.Column('key', sa.String(length=128), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('frp_sum', sa.Float(), nullable=False),
+    sa.Column('high_confidence_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'dimension', 'key', name='uq_firms_daily_rollups_day_key')
+    )
+    op.create_index(op.f('ix_firms_daily_rollups_id'), 'firms_daily_rollups', ['id'], unique=False)
+    op.create_index(op.f('ix_firms_daily_rollups_day'), 'firms_daily_rollups', ['day'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_firms_daily_rollups_day'), table_name='firms_daily_rollups')
+    op.drop_index(op.f('ix_firms_daily_rollups_id'), table_name='firms_daily_rollups')
+    op.drop_table('firms_daily_rollups')
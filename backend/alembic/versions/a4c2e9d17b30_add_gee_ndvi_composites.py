@@ -0,0 +1,40 @@
+"""Add gee_ndvi_composites
+
+Revision ID: a4c2e9d17b30
+Revises: 8e3f0b6c1a7d
+Create Date: 2026-10-18 17:41:08.214470
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c2e9d17b30'
+down_revision: Union[str, None] = '8e3f0b6c1a7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('gee_ndvi_composites',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('region', sa.String(length=64), nullable=False),
+    sa.Column('composite_date', sa.Date(), nullable=False),
+    sa.Column('mean_ndvi', sa.Float(), nullable=True),
+    sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('region', 'composite_date', name='uq_gee_ndvi_composites_region_date')
+    )
+    op.create_index(op.f('ix_gee_ndvi_composites_id'), 'gee_ndvi_composites', ['id'], unique=False)
+    op.create_index(op.f('ix_gee_ndvi_composites_composite_date'), 'gee_ndvi_composites', ['composite_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_gee_ndvi_composites_composite_date'), table_name='gee_ndvi_composites')
+    op.drop_index(op.f('ix_gee_ndvi_composites_id'), table_name='gee_ndvi_composites')
+    op.drop_table('gee_ndvi_composites')
@@ -0,0 +1,40 @@
+"""Add gee_fire_days
+
+Revision ID: c7d3f5a2e816
+Revises: a4c2e9d17b30
+Create Date: 2026-10-18 18:26:53.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d3f5a2e816'
+down_revision: Union[str, None] = 'a4c2e9d17b30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('gee_fire_days',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('region', sa.String(length=64), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('fire_pixel_count', sa.Integer(), nullable=True),
+    sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('region', 'day', name='uq_gee_fire_days_region_day')
+    )
+    op.create_index(op.f('ix_gee_fire_days_id'), 'gee_fire_days', ['id'], unique=False)
+    op.create_index(op.f('ix_gee_fire_days_day'), 'gee_fire_days', ['day'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_gee_fire_days_day'), table_name='gee_fire_days')
+    op.drop_index(op.f('ix_gee_fire_days_id'), table_name='gee_fire_days')
+    op.drop_table('gee_fire_days')
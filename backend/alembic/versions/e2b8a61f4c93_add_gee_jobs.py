@@ -0,0 +1,51 @@
+"""Add gee_jobs
+
+Revision ID: e2b8a61f4c93
+Revises: c7d3f5a2e816
+Create Date: 2026-10-18 19:12:40.571238
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b8a61f4c93'
+down_revision: Union[str, None] = 'c7d3f5a2e816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('gee_jobs',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('dedup_key', sa.String(length=128), nullable=False),
+    sa.Column('params', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('result', sa.Text(), nullable=True),
+    sa.Column('error_status', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('worker_id', sa.String(length=64), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_gee_jobs_dedup_key'), 'gee_jobs', ['dedup_key'], unique=False)
+    op.create_index(op.f('ix_gee_jobs_expires_at'), 'gee_jobs', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_gee_jobs_status'), 'gee_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_gee_jobs_status'), table_name='gee_jobs')
+    op.drop_index(op.f('ix_gee_jobs_expires_at'), table_name='gee_jobs')
+    op.drop_index(op.f('ix_gee_jobs_dedup_key'), table_name='gee_jobs')
+    op.drop_table('gee_jobs')
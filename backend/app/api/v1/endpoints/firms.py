@@ -1,11 +1,25 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
 from app.schemas.external.firms import FIRMSApiResponse
-from app.schemas.responses import APIResponse  # <-- Importa el modelo correcto
-from app.schemas.firms import TimePeriod  # <-- Importar desde el archivo correcto
-from app.services.firms import FIRMSService, firms_cache  # Add firms_cache import
+from app.schemas.responses import APIResponse, ClusterAPIResponse, DensidadResponse, EstadisticasAPIResponse, EventosAPIResponse  # <-- Importa el modelo correcto
+from app.schemas.firms import DensityFormat, DensityWeight, OutputFormat, RegionResponse, StatsGroup, TimePeriod  # <-- Importar desde el archivo correcto
+from app.core.config import settings
+from app.db.session import get_db
+from app.services.firms import FIRMSService, firms_cache, firms_singleflight  # Add firms_cache import
+from app.services.firms_metrics import render_firms_metrics
+from app.services.firms_poller import firms_poller
+from app.services.firms_regions import get_regions
+from app.services.firms_rollups import firms_rollups
+from app.services.firms_tiles import firms_tiles
+from app.utils.geospatial import get_departments, get_protected_areas
+from app.utils.metrics import PROMETHEUS_CONTENT_TYPE
+from app.utils.vector_tiles import MVT_CONTENT_TYPE
+import asyncio
 import logging
-from datetime import datetime
-from typing import Optional
+import math
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
 
 router = APIRouter(
     prefix="/firms",
@@ -15,20 +29,109 @@ router = APIRouter(
 firms_service = FIRMSService()
 logger = logging.getLogger(__name__)
 
+def _negotiate_encoding(accept_encoding: str | None) -> str:
+    """Elige la mejor codificación precalculada que acepta el cliente."""
+    accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+    for encoding in ("br", "gzip"):
+        if encoding in accepted:
+            return encoding
+    return "identity"
+
+STREAM_MEDIA_TYPES = {
+    OutputFormat.NDJSON: "application/x-ndjson",
+    OutputFormat.GEOJSON: "application/geo+json",
+}
+
+def _region(
+    region: str = Query(
+        default=settings.FIRMS_DEFAULT_REGION,
+        description="Región a consultar (ver /firms/regions)",
+        example="corrientes"
+    )
+) -> str:
+    if get_regions().get(region) is None:
+        raise HTTPException(status_code=404, detail=f"Región desconocida: {region}")
+    return region
+
+def _parse_bbox(bbox: str | None) -> Tuple[float, float, float, float] | None:
+    """Convierte "oeste,sur,este,norte" (mismo formato que la API de FIRMS) en una tupla."""
+    if bbox is None:
+        return None
+    try:
+        west, south, east, north = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox debe tener el formato oeste,sur,este,norte")
+    # float() acepta "nan" e "inf", que romperían el índice espacial y el agrupamiento
+    if not all(math.isfinite(value) for value in (west, south, east, north)):
+        raise HTTPException(status_code=400, detail="bbox inválido: las coordenadas deben ser números finitos")
+    if west > east or south > north:
+        raise HTTPException(status_code=400, detail="bbox inválido: oeste/sur deben ser menores que este/norte")
+    return west, south, east, north
+
 @router.get(
     "/",
     response_model=APIResponse,  # <-- Usa el modelo correcto aquí
-    summary="Consulta de Focos de Calor"
+    summary="Consulta de Focos de Calor",
+    responses={200: {"description": f"Con zoom <= {settings.FIRMS_CLUSTER_MAX_ZOOM} devuelve clusters", "model": ClusterAPIResponse}}
 )
 async def get_fires(
     period: TimePeriod = Query(
         default=TimePeriod.LAST_24H,
         description="Período de consulta"
-    )
+    ),
+    region: str = Depends(_region),
+    bbox: Optional[str] = Query(
+        default=None,
+        description="Área visible del mapa: oeste,sur,este,norte",
+        example="-58.5,-28.8,-57.0,-27.5"
+    ),
+    zoom: Optional[int] = Query(
+        default=None,
+        ge=0,
+        le=22,
+        description="Zoom del mapa; con zoom bajo se devuelven clusters en lugar de focos"
+    ),
+    output_format: OutputFormat = Query(
+        default=OutputFormat.JSON,
+        alias="format",
+        description="json (completo), ndjson o geojson (enviados por partes; siempre focos, sin clusters)"
+    ),
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Obtiene datos de focos de calor según el período especificado."""
+    viewport = _parse_bbox(bbox)
     try:
-        return firms_service.get_active_fires(period)
+        if output_format != OutputFormat.JSON:
+            # Se envía por partes: el cliente puede empezar a dibujar con el primer bloque
+            dataset = await firms_service.get_dataset_async(period, region)
+            return StreamingResponse(
+                firms_service.stream_focos(period, dataset, viewport, output_format),
+                media_type=STREAM_MEDIA_TYPES[output_format],
+                headers={"Age": str(int(dataset.age()))}
+            )
+
+        if viewport is not None or zoom is not None:
+            # Vista del mapa: búsqueda en los índices precalculados del dataset cacheado; serializar
+            # miles de focos o clusters es CPU y se hace fuera del event loop
+            dataset = await firms_service.get_dataset_async(period, region)
+            body = await asyncio.to_thread(firms_service.get_viewport_json, period, dataset, viewport, zoom)
+            return Response(content=body, media_type="application/json", headers={"Age": str(int(dataset.age()))})
+
+        # El cuerpo ya está serializado y comprimido en el cache: solo se eligen los bytes
+        dataset = await firms_service.get_dataset_async(period, region)
+        encoding = _negotiate_encoding(accept_encoding)
+        etag = dataset.etags[encoding]
+        headers = {
+            "ETag": etag,
+            "Vary": "Accept-Encoding",
+            "Age": str(int(dataset.age()))  # Antigüedad de los datos en segundos
+        }
+        if if_none_match and {etag, "*"} & {tag.strip() for tag in if_none_match.split(",")}:
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=dataset.encoded[encoding], media_type="application/json", headers=headers)
     except Exception as e:
         logger.error(f"Error en get_fires: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -39,21 +142,189 @@ async def get_fires(
             }
         )
 
+@router.get(
+    "/events",
+    response_model=EventosAPIResponse,
+    summary="Incendios: focos agrupados en eventos"
+)
+async def get_fire_events(
+    period: TimePeriod = Query(
+        default=TimePeriod.LAST_WEEK,
+        description="Período de consulta"
+    ),
+    region: str = Depends(_region)
+):
+    """
+    Agrupa los focos del período en incendios (cercanos en espacio y tiempo), con centroide,
+    extensión, primera y última detección, cantidad de focos, FRP y áreas protegidas alcanzadas.
+    """
+    try:
+        # Los eventos se calculan una vez por refresco del dataset; acá solo se serializan (fuera del event loop)
+        dataset = await firms_service.get_dataset_async(period, region)
+        body = await asyncio.to_thread(firms_service.get_events_json, period, dataset)
+        return Response(content=body, media_type="application/json", headers={"Age": str(int(dataset.age()))})
+    except Exception as e:
+        logger.error(f"Error en get_fire_events: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error al agrupar los focos en eventos")
+
+@router.get(
+    "/density",
+    response_model=DensidadResponse,
+    summary="Grilla de densidad de focos",
+    responses={200: {"content": {"image/png": {}}}}
+)
+async def get_fire_density(
+    period: TimePeriod = Query(
+        default=TimePeriod.LAST_WEEK,
+        description="Período de consulta"
+    ),
+    region: str = Depends(_region),
+    resolucion: float = Query(
+        default=0.05,
+        description=f"Tamaño de celda en grados; valores aceptados: {settings.FIRMS_DENSITY_RESOLUTIONS}"
+    ),
+    peso: DensityWeight = Query(
+        default=DensityWeight.COUNT,
+        description="cantidad de focos o suma de FRP por celda"
+    ),
+    output_format: DensityFormat = Query(
+        default=DensityFormat.JSON,
+        alias="format",
+        description="json (arreglo compacto) o png (raster)"
+    )
+):
+    """Superficie de calor: los focos de la región acumulados en una grilla lat/lon."""
+    if resolucion not in settings.FIRMS_DENSITY_RESOLUTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"resolucion debe ser uno de {settings.FIRMS_DENSITY_RESOLUTIONS}"
+        )
+    try:
+        dataset = await firms_service.get_dataset_async(period, region)
+        # Solo el primer pedido de cada combinación calcula la grilla; después se sirven los bytes memoizados
+        body = await asyncio.to_thread(firms_service.get_density, period, dataset, resolucion, peso, output_format)
+        media_type = "image/png" if output_format == DensityFormat.PNG else "application/json"
+        return Response(content=body, media_type=media_type, headers={"Age": str(int(dataset.age()))})
+    except Exception as e:
+        logger.error(f"Error en get_fire_density: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error al calcular la grilla de densidad")
+
+@router.get(
+    "/tiles/{period}/{z}/{x}/{y}.mvt",
+    summary="Vector tile (MVT) de focos de calor",
+    response_class=Response,
+    responses={200: {"content": {MVT_CONTENT_TYPE: {}}}}
+)
+async def get_fire_tile(
+    period: TimePeriod,
+    z: int,
+    x: int,
+    y: int,
+    region: str = Depends(_region),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Focos del período como Mapbox Vector Tile (capa "focos" con confianza, FRP y área protegida)."""
+    if not 0 <= z <= 22 or not 0 <= x < 2 ** z or not 0 <= y < 2 ** z:
+        raise HTTPException(status_code=404, detail="Tile fuera de rango")
+    try:
+        dataset = await firms_service.get_dataset_async(period, region)
+        version = firms_tiles.data_version(dataset)
+        headers = {"ETag": f'"{version}-{z}-{x}-{y}"', "Age": str(int(dataset.age()))}
+        if if_none_match and {headers["ETag"], "*"} & {tag.strip() for tag in if_none_match.split(",")}:
+            return Response(status_code=304, headers=headers)
+        # La generación del tile es CPU: se hace fuera del event loop
+        tile = await asyncio.to_thread(firms_tiles.get_tile, (period, region), dataset, z, x, y)
+        return Response(content=tile, media_type=MVT_CONTENT_TYPE, headers=headers)
+    except Exception as e:
+        logger.error(f"Error en get_fire_tile: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error al generar el tile")
+
+@router.get(
+    "/stats",
+    response_model=EstadisticasAPIResponse,
+    summary="Estadísticas diarias de focos por región, departamento o área protegida"
+)
+def get_fire_stats(
+    desde: Optional[date] = Query(None, description="Primer día (UTC); por defecto, hace 30 días"),
+    hasta: Optional[date] = Query(None, description="Último día (UTC); por defecto, hoy"),
+    agrupar_por: StatsGroup = Query(
+        default=StatsGroup.TOTAL,
+        description="total, region, departamento o area_protegida"
+    ),
+    por_dia: bool = Query(False, description="Serie diaria en lugar de un total por clave"),
+    db: Session = Depends(get_db)
+):
+    """
+    Cantidad de focos, FRP total y focos de alta confianza en el rango. Se responde desde los
+    agregados diarios que mantiene el poller, así que rangos de varios años no leen detecciones.
+    """
+    hasta = hasta or datetime.utcnow().date()
+    desde = desde or hasta - timedelta(days=30)
+    if desde > hasta:
+        raise HTTPException(status_code=400, detail="desde debe ser anterior o igual a hasta")
+    if agrupar_por == StatsGroup.DEPARTMENT and get_departments() is None:
+        raise HTTPException(status_code=400, detail="No hay límites departamentales configurados (FIRMS_DEPARTMENTS_GEOJSON)")
+    if agrupar_por == StatsGroup.PROTECTED_AREA and get_protected_areas() is None:
+        raise HTTPException(status_code=400, detail="No hay áreas protegidas configuradas (PROTECTED_AREAS_GEOJSON)")
+    try:
+        dias_calculados, datos = firms_rollups.query(db, desde, hasta, agrupar_por.value, por_dia)
+        return EstadisticasAPIResponse(
+            desde=desde,
+            hasta=hasta,
+            agrupar_por=agrupar_por.value,
+            dias_calculados=dias_calculados,
+            datos=datos
+        )
+    except Exception as e:
+        logger.error(f"Error en get_fire_stats: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error al consultar las estadísticas")
+
+@router.get(
+    "/regions",
+    response_model=List[RegionResponse],
+    summary="Regiones disponibles"
+)
+async def get_firms_regions():
+    """Provincias y áreas que se pueden consultar con el parámetro region."""
+    return get_regions().all()
+
 @router.get("/status")
 async def get_firms_status():
     """Obtiene el estado de actualización de los datos"""
     try:
+        # La última actualización real es la última corrida del poller contra FIRMS
+        last_run = firms_poller.last_run
+        next_run = last_run + timedelta(minutes=settings.FIRMS_POLL_INTERVAL_MINUTES) if last_run and settings.FIRMS_POLLER_ENABLED else None
         return {
-            "ultima_actualizacion": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "tiempo_cache": f"{firms_cache.ttl/60:.1f} minutos",
+            "ultima_actualizacion": last_run.strftime("%Y-%m-%d %H:%M:%S") if last_run else None,
+            "tiempo_cache": f"{settings.FIRMS_CACHE_SOFT_TTL/60:.1f} minutos",
+            "tiempo_maximo_obsoleto": f"{firms_cache.ttl/60:.1f} minutos",
             "elementos_cacheados": len(firms_cache),
-            "proximo_refresco": datetime.fromtimestamp(
-                datetime.now().timestamp() + firms_cache.ttl
-            ).strftime("%Y-%m-%d %H:%M:%S")
+            "proximo_refresco": next_run.strftime("%Y-%m-%d %H:%M:%S") if next_run else None,
+            # Aciertos, fallos y entradas vencidas o desalojadas del cache de datasets
+            "cache": firms_cache.stats(),
+            # Por período: cuándo se calculó, filas, tiempo por fase y descargas de sus fuentes
+            "entradas": firms_service.get_cache_entries(),
+            # Descargas del poller por fuente: latencia, bytes y filas parseadas
+            "fuentes": firms_service.get_source_stats(),
+            # Requests que calcularon el dataset vs. los que esperaron ese mismo cálculo
+            "coalescencia": firms_singleflight.stats(),
+            # Aciertos del cache de vector tiles y tiempo de generación por tile
+            "tiles": firms_tiles.stats()
         }
     except Exception as e:
         logger.error(f"Error al obtener estado del cache: {str(e)}")
         raise HTTPException(
             status_code=500, 
             detail="Error al obtener estado de actualización"
-        )
\ No newline at end of file
+        )
+
+@router.get(
+    "/metrics",
+    summary="Métricas de FIRMS en formato Prometheus",
+    response_class=Response,
+    responses={200: {"content": {PROMETHEUS_CONTENT_TYPE: {}}}}
+)
+async def get_firms_metrics():
+    """Las mismas cifras de /firms/status en el formato de texto que consume Prometheus."""
+    return Response(content=render_firms_metrics(firms_service), media_type=PROMETHEUS_CONTENT_TYPE)
\ No newline at end of file
@@ -1,32 +1,67 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, Body
-from app.services.gee import GEEService
-from app.schemas.external.gee import GEEHistoricalApiResponse, NBRAnalysisResponse, NBRResult
+from fastapi import APIRouter, Depends, Query, HTTPException, Body, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from app.core.config import settings
+from app.services.gee import GEEService, analyze_nbr, gee_service, run_gee, validate_nbr_request
+from app.services.gee_jobs import FINAL_STATUSES, SUCCEEDED, gee_jobs
+from app.services.gee_metrics import render_gee_metrics
+from app.utils.metrics import PROMETHEUS_CONTENT_TYPE
+from app.schemas.external.gee import GEEHistoricalApiResponse, GEEJobResponse, NBRAnalysisResponse, NBRResult
+import asyncio
 import datetime
+import logging
 from typing import List, Dict, Any, Optional
-import ee
 import json
 
 router = APIRouter()
-
-# Caché simple para la instancia del servicio GEE (Singleton básico)
-_gee_service_instance: Optional[GEEService] = None
+logger = logging.getLogger(__name__)
 
 def get_gee_service() -> GEEService:
     """Dependency function para obtener la instancia del GEEService."""
-    global _gee_service_instance
-    if _gee_service_instance is None:
-        _gee_service_instance = GEEService()
-        # La inicialización real de GEE ocurrirá dentro de los métodos del servicio
-    return _gee_service_instance
+    # GEE se inicializa al arrancar la aplicación (o en el primer uso si eso falló)
+    return gee_service
+
+def run_as_job(asincronico: Optional[bool], start_date: str, end_date: str) -> bool:
+    """Sin `asincronico` explícito, los rangos de más de GEE_JOB_SYNC_MAX_DAYS días se encolan."""
+    if asincronico is not None:
+        return asincronico
+    start = datetime.datetime.strptime(start_date, '%Y-%m-%d').date()
+    end = datetime.datetime.strptime(end_date, '%Y-%m-%d').date()
+    return (end - start).days > settings.GEE_JOB_SYNC_MAX_DAYS
+
+def job_response(request: Request, job: Dict[str, Any]) -> GEEJobResponse:
+    status_url = str(request.url_for("get_gee_job", job_id=job['job_id']))
+    return GEEJobResponse(
+        **job,
+        status_url=status_url,
+        result_url=f"{status_url}/result",
+        events_url=f"{status_url}/events",
+    )
+
+async def submit_job(request: Request, kind: str, params: Dict[str, Any]) -> JSONResponse:
+    """202 con el trabajo (nuevo o el idéntico ya existente) y su URL en Location."""
+    job, _ = await gee_jobs.submit(kind, params)
+    body = job_response(request, job)
+    return JSONResponse(status_code=202, content=jsonable_encoder(body), headers={"Location": body.status_url})
+
+ASYNC_QUERY = Query(
+    None,
+    description="true: encola el análisis y responde 202 con el trabajo. Por defecto se encolan los rangos de más de "
+                "GEE_JOB_SYNC_MAX_DAYS días; false fuerza la respuesta sincrónica.",
+)
+JOB_RESPONSES = {202: {"model": GEEJobResponse, "description": "Análisis encolado; consultar /gee/jobs/{job_id}"}}
 
 
 @router.get("/ndvi-stats", 
             summary="Obtener estadísticas NDVI regional",
-            response_description="Una lista de diccionarios con la fecha y el NDVI medio para Corrientes.")
+            response_description="Una lista de diccionarios con la fecha y el NDVI medio para Corrientes.",
+            responses=JOB_RESPONSES)
 async def get_regional_ndvi(
+    request: Request,
     service: GEEService = Depends(get_gee_service), # Inyectar dependencia
     start_date: Optional[str] = Query(None, description="Fecha de inicio (YYYY-MM-DD). Por defecto: hace un año."),
     end_date: Optional[str] = Query(None, description="Fecha de fin (YYYY-MM-DD). Por defecto: hoy."),
+    asincronico: Optional[bool] = ASYNC_QUERY,
 ) -> List[Dict[str, Any]]: # Mantener el tipo de respuesta original aquí
     """Obtiene estadísticas de NDVI (media) para toda la provincia de Corrientes \
     calculadas a partir de imágenes MODIS en el rango de fechas especificado (por defecto, último año)."""
@@ -49,9 +84,12 @@ async def get_regional_ndvi(
         except ValueError:
             raise HTTPException(status_code=400, detail="Formato de fecha inicial inválido. Usar YYYY-MM-DD.")
     
-    # Llamar al servicio GEE
-    # Ahora la inicialización ocurre dentro si es necesario
-    ndvi_stats = service.get_regional_ndvi_stats(
+    if run_as_job(asincronico, start_date, end_date):
+        return await submit_job(request, 'ndvi', {'start_date': start_date, 'end_date': end_date})
+
+    # Llamar al servicio GEE en el pool dedicado (getInfo bloquea)
+    ndvi_stats = await run_gee(
+        service.get_regional_ndvi_stats,
         start_date=start_date, 
         end_date=end_date
     )
@@ -60,11 +98,14 @@ async def get_regional_ndvi(
 @router.get("/historical-fires", 
             summary="Obtener focos de calor históricos",
             response_description="Resumen y datos diarios de píxeles de fuego detectados por MODIS.",
-            response_model=GEEHistoricalApiResponse)
+            response_model=GEEHistoricalApiResponse,
+            responses=JOB_RESPONSES)
 async def get_historical_fires(
+    request: Request,
     service: GEEService = Depends(get_gee_service), # Inyectar dependencia
     start_date: Optional[str] = Query(None, description="Fecha de inicio (YYYY-MM-DD). Por defecto: hace un año."),
     end_date: Optional[str] = Query(None, description="Fecha de fin (YYYY-MM-DD). Por defecto: hoy."),
+    asincronico: Optional[bool] = ASYNC_QUERY,
 ):
     """Obtiene una lista de detecciones de focos de calor históricos (MODIS) \
     para la provincia de Corrientes en el rango de fechas especificado (por defecto, último año)."""
@@ -87,9 +128,11 @@ async def get_historical_fires(
         except ValueError:
             raise HTTPException(status_code=400, detail="Formato de fecha inicial inválido. Usar YYYY-MM-DD.")
 
-    # Llamar al servicio GEE
-    # Ahora la inicialización ocurre dentro si es necesario
-    fire_data = service.get_historical_fire_data(
+    if run_as_job(asincronico, start_date, end_date):
+        return await submit_job(request, 'historical', {'start_date': start_date, 'end_date': end_date})
+
+    # El servicio reparte los días que faltan en tramos anuales sobre el pool de GEE
+    fire_data = await service.get_historical_fire_data(
         start_date=start_date,
         end_date=end_date
     )
@@ -101,9 +144,12 @@ async def get_historical_fires(
             description="""
             Calcula el NBR (Normalized Burn Ratio) para evaluar la severidad de un incendio.
             Compara imágenes satelitales pre y post-incendio para determinar el daño causado.
-            """
+            Con `asincronico=true` responde 202 con un trabajo en lugar de esperar el cálculo.
+            """,
+            responses=JOB_RESPONSES
            )
 async def calculate_nbr_analysis(
+    request: Request,
     pre_fire_date: str = Query(..., description="Fecha pre-incendio en formato 'YYYY-MM-DD'"),
     post_fire_date: str = Query(..., description="Fecha post-incendio en formato 'YYYY-MM-DD'"),
     geometry: Optional[Dict[str, Any]] = Body(
@@ -122,7 +168,8 @@ async def calculate_nbr_analysis(
         },
         description="Geometría GeoJSON del área de interés. Si no se proporciona, se usa la provincia de Corrientes."
     ),
-    service: GEEService = Depends(get_gee_service)
+    service: GEEService = Depends(get_gee_service),
+    asincronico: bool = Query(False, description="true: encola el análisis (polígonos grandes) y responde 202 con el trabajo."),
 ):
     """
     Calcula el NBR (Normalized Burn Ratio) para evaluar la severidad de un incendio.
@@ -139,97 +186,13 @@ async def calculate_nbr_analysis(
     - dNBR >= 0.66: Severidad alta
     """
     try:
-        # Validar fechas
-        try:
-            pre_date = datetime.datetime.strptime(pre_fire_date, '%Y-%m-%d').date()
-            post_date = datetime.datetime.strptime(post_fire_date, '%Y-%m-%d').date()
-            
-            if pre_date >= post_date:
-                raise HTTPException(
-                    status_code=400,
-                    detail="La fecha pre-incendio debe ser anterior a la fecha post-incendio"
-                )
-                
-            # Asegurarse de que las fechas no estén en el futuro
-            today = datetime.date.today()
-            if pre_date > today or post_date > today:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Las fechas no pueden estar en el futuro"
-                )
-                
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail="Formato de fecha inválido. Usar YYYY-MM-DD"
-            )
-        
-        # Convertir la geometría de GeoJSON a objeto ee.Geometry si se proporciona
-        ee_geometry = None
-        if geometry:
-            try:
-                # Validar que la geometría sea un GeoJSON válido
-                if 'type' not in geometry or 'coordinates' not in geometry:
-                    raise ValueError("Formato GeoJSON inválido. Se requiere 'type' y 'coordinates'")
-                
-                # Crear geometría de Earth Engine a partir de GeoJSON
-                if geometry['type'].lower() == 'polygon':
-                    ee_geometry = ee.Geometry.Polygon(geometry['coordinates'])
-                elif geometry['type'].lower() == 'point':
-                    # Para un punto, creamos un buffer de 1km
-                    point = geometry['coordinates']
-                    ee_geometry = ee.Geometry.Point(point[0], point[1]).buffer(1000)  # 1km de radio
-                else:
-                    # Para otros tipos de geometría, intentamos crear un polígono delimitador
-                    ee_geometry = ee.Geometry(geometry).bounds()
-            except Exception as e:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Error al procesar la geometría: {str(e)}"
-                )
-        
-        # Llamar al servicio para calcular el NBR
-        results = service.calculate_nbr(
-            pre_fire_date=pre_fire_date,
-            post_fire_date=post_fire_date,
-            geometry=ee_geometry
-        )
-        
-        # Formatear la respuesta según el esquema NBRAnalysisResponse
-        response = {
-            'pre_fire_date': pre_fire_date,
-            'post_fire_date': post_fire_date,
-            'results': [
-                {
-                    'date': pre_fire_date,
-                    'nbr_value': results['pre_fire_nbr'],
-                    'dNBR': None,
-                    'severity': None,
-                    'geometry': results.get('geometry')
-                },
-                {
-                    'date': post_fire_date,
-                    'nbr_value': results['post_fire_nbr'],
-                    'dNBR': results['dnbr'],
-                    'severity': results['severity'],
-                    'geometry': results.get('geometry')
-                }
-            ],
-            'metadata': {
-                'description': 'Análisis NBR para evaluación de severidad de incendios',
-                'satellite': 'Landsat 8',
-                'processing_date': datetime.datetime.now().isoformat(),
-                'severity_scale': {
-                    '0': 'Aumento en la vegetación',
-                    '1': 'Severidad baja',
-                    '2': 'Severidad moderada-baja',
-                    '3': 'Severidad moderada-alta',
-                    '4': 'Severidad alta'
-                }
-            }
-        }
-        
-        return response
+        validate_nbr_request(pre_fire_date, post_fire_date, geometry)
+        if asincronico:
+            return await submit_job(request, 'nbr', {
+                'pre_fire_date': pre_fire_date, 'post_fire_date': post_fire_date, 'geometry': geometry,
+            })
+        # Mismas fechas y geometría: el resultado sale del cache sin ocupar el pool de GEE
+        return await analyze_nbr(pre_fire_date, post_fire_date, geometry)
         
     except HTTPException:
         # Re-lanzar excepciones HTTP existentes
@@ -239,4 +202,72 @@ async def calculate_nbr_analysis(
         raise HTTPException(
             status_code=500,
             detail=f"Error interno al calcular el NBR: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/jobs/metrics",
+            summary="Métricas de la cola de trabajos y del pool de GEE (Prometheus)",
+            response_class=Response,
+            responses={200: {"content": {PROMETHEUS_CONTENT_TYPE: {}}}})
+async def get_gee_metrics():
+    """Profundidad de la cola, trabajos por resultado, tiempos en cola y en ejecución, y ocupación del pool."""
+    content = await asyncio.to_thread(render_gee_metrics, gee_jobs)
+    return Response(content=content, media_type=PROMETHEUS_CONTENT_TYPE)
+
+@router.get("/jobs/{job_id}",
+            response_model=GEEJobResponse,
+            summary="Estado de un trabajo de GEE")
+async def get_gee_job(job_id: str, request: Request):
+    job = await gee_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Trabajo inexistente o con el resultado vencido")
+    return job_response(request, job)
+
+@router.get("/jobs/{job_id}/result",
+            summary="Resultado de un trabajo de GEE",
+            responses={202: {"model": GEEJobResponse, "description": "El trabajo todavía no terminó"}})
+async def get_gee_job_result(job_id: str, request: Request):
+    """
+    El cuerpo que habría devuelto el endpoint sincrónico. Mientras el trabajo no termina
+    responde 202 con su estado; si falló, el mismo código de error que el endpoint.
+    """
+    job, result = await gee_jobs.get_result(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Trabajo inexistente o con el resultado vencido")
+    if job['status'] == SUCCEEDED:
+        # Se devuelve el JSON guardado tal cual, sin volver a validarlo ni serializarlo
+        return Response(content=result, media_type="application/json")
+    if job['status'] in FINAL_STATUSES:
+        raise HTTPException(status_code=job['error_status'] or 500, detail=job['error'])
+    return JSONResponse(status_code=202, content=jsonable_encoder(job_response(request, job)))
+
+SSE_KEEPALIVE_SECONDS = 15.0
+
+@router.get("/jobs/{job_id}/events",
+            summary="Stream de estado de un trabajo de GEE (Server-Sent Events)",
+            responses={200: {"content": {"text/event-stream": {}}}})
+async def stream_gee_job(job_id: str, request: Request):
+    """Un evento `status` por cada cambio de estado, hasta que el trabajo termina."""
+    job = await gee_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Trabajo inexistente o con el resultado vencido")
+
+    async def events():
+        nonlocal job
+        last_status = None
+        while job is not None:
+            if job['status'] != last_status:
+                last_status = job['status']
+                data = job_response(request, job).model_dump_json()
+                yield f"event: status\ndata: {data}\n\n"
+            if job['status'] in FINAL_STATUSES or await request.is_disconnected():
+                return
+            await gee_jobs.wait_for_change(SSE_KEEPALIVE_SECONDS)
+            previous, job = job, await gee_jobs.get(job_id)
+            if job is not None and job['status'] == previous['status']:
+                yield ": keepalive\n\n"  # Comentario SSE: mantiene viva la conexión a través de proxies
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
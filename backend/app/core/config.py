@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -11,9 +13,58 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 horas
     
     FIRMS_API_KEY: str
+    FIRMS_BASE_URL: str = "https://firms.modaps.eosdis.nasa.gov/api/area/csv"
+    FIRMS_CONNECT_TIMEOUT: float = 5.0
+    FIRMS_READ_TIMEOUT: float = 30.0
+    FIRMS_MAX_CONNECTIONS: int = 4
+    # Fuentes FIRMS que se descargan y fusionan por período, en orden de prioridad
+    # (ante detecciones duplicadas entre sensores se conserva la de la primera fuente)
+    FIRMS_RECENT_SOURCES: List[str] = ["VIIRS_SNPP_NRT", "VIIRS_NOAA20_NRT", "VIIRS_NOAA21_NRT", "MODIS_NRT"]
+    FIRMS_HISTORICAL_SOURCES: List[str] = ["MODIS_SP"]
+    FIRMS_FUSION_DISTANCE_KM: float = 1.0  # Distancia máxima entre detecciones del mismo píxel de fuego
+    FIRMS_FUSION_MINUTES: float = 60.0  # Diferencia máxima entre pasadas de distintos satélites
+    FIRMS_CACHE_SOFT_TTL: int = 3600  # Pasado este tiempo se sirve el dato y se refresca en segundo plano
+    FIRMS_CACHE_HARD_TTL: int = 21600  # Edad máxima de un dato servido desde el cache
+    FIRMS_ARCHIVE_DIR: str = "./data/firms"  # Parquet de períodos cerrados (no expiran)
+    FIRMS_POLLER_ENABLED: bool = True
+    FIRMS_POLL_INTERVAL_MINUTES: int = 30
+    FIRMS_MAX_DAY_RANGE: int = 10  # Máximo de días por consulta que acepta la API de área de FIRMS
+    FIRMS_MAX_CONCURRENT_WINDOWS: int = 4
+    FIRMS_WINDOW_RETRIES: int = 2
+    FIRMS_RETRY_BACKOFF: float = 1.0  # Segundos antes del primer reintento
+    FIRMS_CLUSTER_MAX_ZOOM: int = 9  # Hasta este zoom del mapa /firms/ devuelve clusters en lugar de focos
+    FIRMS_CLUSTER_CELLS_PER_TILE: int = 4  # Celdas de agrupamiento por lado de tile (≈64 px)
+    FIRMS_TILE_CACHE_SIZE: int = 2048  # Vector tiles guardados en el LRU
+    FIRMS_EVENT_DISTANCE_KM: float = 1.5  # Tamaño de celda espacial para agrupar focos en eventos
+    FIRMS_EVENT_GAP_HOURS: float = 24.0  # Tamaño de celda temporal para agrupar focos en eventos
+    FIRMS_DENSITY_RESOLUTIONS: List[float] = [0.01, 0.025, 0.05, 0.1, 0.25]  # Grados por celda aceptados
+    FIRMS_STREAM_CHUNK_ROWS: int = 5000  # Focos serializados por parte en las respuestas ndjson/geojson
+    FIRMS_REGIONS_FILE: str | None = None  # JSON con las regiones consultables; por defecto app/data/regiones.json
+    FIRMS_DEFAULT_REGION: str = "corrientes"
+    FIRMS_DEPARTMENTS_GEOJSON: str | None = None  # Límites departamentales (propiedad "nombre") para las estadísticas
+    PROTECTED_AREAS_GEOJSON: str | None = None  # Límites oficiales de áreas protegidas (propiedad "nombre"); sin ellos no se etiquetan
+    
     GEE_CREDENTIAL_PATH: str = "./config/credentials/service-account.json"
     GEE_SERVICE_ACCOUNT_EMAIL: str
     GEE_API_KEY: str
+    GEE_MAX_WORKERS: int = 4  # Hilos dedicados a las llamadas bloqueantes de Earth Engine
+    GEE_MAX_QUEUED: int = 8  # Llamadas en espera de un hilo; las siguientes reciben 503
+    GEE_CALL_TIMEOUT: float = 120.0  # Plazo por llamada (espera en la cola incluida); vencido, 504
+    GEE_INIT_TIMEOUT: float = 30.0
+    GEE_UNPUBLISHED_RECHECK_SECONDS: int = 21600  # Cada cuánto se vuelve a buscar una imagen (compuesto NDVI, día) aún no publicada
+    GEE_HISTORICAL_PARALLEL_CHUNKS: int = 3  # Tramos anuales de un mismo request calculados a la vez
+    GEE_FIRE_DAY_LAG_DAYS: int = 10  # Pasados estos días, un día sin imagen MOD14A1 se guarda como sin datos
+    GEE_NBR_CACHE_SECONDS: int = 86400  # Los análisis NBR de fechas pasadas no cambian
+    GEE_WARMUP_ENABLED: bool = True  # Inicializa GEE al arrancar la aplicación en lugar de en el primer request
+    GEE_JOBS_ENABLED: bool = True  # Procesa la cola de trabajos (análisis largos) en este proceso
+    GEE_JOB_WORKERS: int = 2  # Trabajos en ejecución a la vez
+    GEE_JOB_THREADS: int = 3  # Hilos del pool de GEE de los trabajos, aparte de los GEE_MAX_WORKERS sincrónicos
+    GEE_JOB_MAX_QUEUED: int = 6  # Llamadas de trabajos en espera (un histórico abre hasta GEE_HISTORICAL_PARALLEL_CHUNKS)
+    GEE_JOB_TIMEOUT: float = 1800.0  # Plazo por llamada a GEE dentro de un trabajo
+    GEE_JOB_RESULT_TTL_SECONDS: int = 86400  # Tiempo que se guarda el resultado (o error) de un trabajo terminado
+    GEE_JOB_SYNC_MAX_DAYS: int = 730  # Rangos NDVI/históricos más largos se encolan como trabajo salvo asincronico=false
+    GEE_JOB_LEASE_SECONDS: float = 60.0  # Un trabajo en ejecución cuyo worker no renueva el lease en este plazo vuelve a la cola
+    GEE_JOB_POLL_SECONDS: float = 5.0  # Cada cuánto revisan la cola los workers ociosos (trabajos de otros procesos, vencidos)
 
     class Config:
         env_file = ".env"
@@ -3,5 +3,7 @@ from app.db.base_class import Base
 from .user import User
 from .report import Report
 from .alert import Alert
+from .fire_detection import FireDetection, FirmsDailyRollup, FirmsSyncState
+from .gee import GeeFireDay, GeeJob, GeeNdviComposite
 
-__all__ = ["Base", "User", "Report", "Alert"]  # Opcional pero recomendado
\ No newline at end of file
+__all__ = ["Base", "User", "Report", "Alert", "FireDetection", "FirmsSyncState", "FirmsDailyRollup", "GeeNdviComposite", "GeeFireDay", "GeeJob"]  # Opcional pero recomendado
\ No newline at end of file
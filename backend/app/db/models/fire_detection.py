@@ -0,0 +1,61 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class FireDetection(Base):
+    """Detección FIRMS almacenada localmente por el poller."""
+    __tablename__ = "fire_detections"
+    __table_args__ = (
+        # Clave natural de una detección: evita duplicados entre corridas del poller. Incluye la
+        # fuente para que un producto (p. ej. NRT) no descarte la misma pasada de otro (SP)
+        UniqueConstraint("source", "latitude", "longitude", "acq_date", "acq_time", "satellite", name="uq_fire_detections_pixel"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String(32), nullable=False, index=True)  # Ej: 'VIIRS_SNPP_NRT', 'MODIS_SP'
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    acq_date = Column(Date, nullable=False, index=True)
+    acq_time = Column(Integer, nullable=False)  # HHMM (UTC)
+    acquired_at = Column(DateTime, nullable=False, index=True)  # acq_date + acq_time (UTC)
+    satellite = Column(String(16), nullable=False)
+    instrument = Column(String(16), nullable=True)
+    confidence = Column(String(8), nullable=True)  # 'l'/'n'/'h' (VIIRS) o 0-100 (MODIS)
+    bright_ti4 = Column(Float, nullable=True)
+    brightness = Column(Float, nullable=True)
+    frp = Column(Float, nullable=True)
+    daynight = Column(String(1), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<FireDetection {self.source} {self.acq_date} {self.acq_time} ({self.latitude}, {self.longitude})>"
+
+class FirmsSyncState(Base):
+    """Marca de agua del poller: hasta qué día se sincronizó cada fuente FIRMS."""
+    __tablename__ = "firms_sync_state"
+
+    source = Column(String(32), primary_key=True)
+    synced_through = Column(Date, nullable=False)
+    bbox = Column(String(64), nullable=True)  # Área descargada ("oeste,sur,este,norte") a la que vale la marca
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class FirmsDailyRollup(Base):
+    """
+    Agregado diario de focos (ya fusionados entre satélites) por dimensión:
+    'total', 'region', 'departamento' o 'area_protegida'. Lo mantiene el poller.
+    """
+    __tablename__ = "firms_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("day", "dimension", "key", name="uq_firms_daily_rollups_day_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, index=True)
+    dimension = Column(String(16), nullable=False)
+    key = Column(String(128), nullable=False)  # Nombre de la región, departamento o área ('total' para el total)
+    count = Column(Integer, nullable=False)
+    frp_sum = Column(Float, nullable=False)
+    high_confidence_count = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<FirmsDailyRollup {self.day} {self.dimension}={self.key}: {self.count}>"
@@ -0,0 +1,65 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class GeeNdviComposite(Base):
+    """
+    NDVI medio regional de un compuesto MODIS MOD13A1 (16 días). Un compuesto publicado no
+    cambia, así que cada uno se calcula en Earth Engine una sola vez.
+    """
+    __tablename__ = "gee_ndvi_composites"
+    __table_args__ = (
+        UniqueConstraint("region", "composite_date", name="uq_gee_ndvi_composites_region_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    region = Column(String(64), nullable=False)
+    composite_date = Column(Date, nullable=False, index=True)  # Primer día del período del compuesto
+    mean_ndvi = Column(Float, nullable=True)  # None si la región quedó enmascarada (nubes, sin datos)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<GeeNdviComposite {self.region} {self.composite_date}: {self.mean_ndvi}>"
+
+class GeeFireDay(Base):
+    """Píxeles de fuego MODIS MOD14A1 de un día en la región. Se calcula en Earth Engine una sola vez."""
+    __tablename__ = "gee_fire_days"
+    __table_args__ = (
+        UniqueConstraint("region", "day", name="uq_gee_fire_days_region_day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    region = Column(String(64), nullable=False)
+    day = Column(Date, nullable=False, index=True)
+    fire_pixel_count = Column(Integer, nullable=True)  # None si GEE no tiene imagen de ese día
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<GeeFireDay {self.region} {self.day}: {self.fire_pixel_count}>"
+
+class GeeJob(Base):
+    """
+    Análisis de Earth Engine encolado (NBR, serie NDVI o serie histórica de fuego). La cola
+    vive en la base para sobrevivir reinicios; el resultado se guarda como JSON hasta expires_at.
+    """
+    __tablename__ = "gee_jobs"
+
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(16), nullable=False)  # 'nbr', 'ndvi' o 'historical'
+    dedup_key = Column(String(128), nullable=False, index=True)  # Mismo tipo y parámetros normalizados
+    params = Column(Text, nullable=False)  # JSON
+    status = Column(String(16), nullable=False, index=True)  # pending, running, succeeded, failed
+    result = Column(Text, nullable=True)  # JSON de la respuesta del endpoint equivalente
+    error_status = Column(Integer, nullable=True)  # Código HTTP con el que habría fallado el request
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)  # Veces que un worker lo tomó (se reintenta si GEE está saturado)
+    created_at = Column(DateTime, nullable=False)  # UTC
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # Proceso que lo ejecuta y hasta cuándo: si el lease vence sin renovarse, el proceso murió y el trabajo vuelve a la cola
+    worker_id = Column(String(64), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True, index=True)  # Pasada esta fecha el trabajo deja de existir
+
+    def __repr__(self):
+        return f"<GeeJob {self.id} {self.kind} {self.status}>"
@@ -15,4 +15,6 @@ class User(Base):
     is_superuser = Column(Boolean(), default=False)
 
     # Inverse relationship with Report
-    reports = relationship("Report", back_populates="reporter")
\ No newline at end of file
+    reports = relationship("Report", back_populates="reporter")
+    # Inverse relationship with Alert (Alert.creator)
+    alerts = relationship("Alert", back_populates="creator")
\ No newline at end of file
@@ -1,16 +1,41 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.router import router as api_router  # Cambiado de 'api_router' a 'router'
 from app.core.config import settings
 from app.db.session import engine
 from app.db.models import Base
+from app.services.firms_client import firms_client
+from app.services.firms_poller import firms_poller
+from app.services.gee import gee_executor, gee_job_executor, warm_up_gee
+from app.services.gee_jobs import gee_jobs
 
 Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # El poller mantiene actualizado el store local de focos FIRMS
+    poller_task = asyncio.create_task(firms_poller.run_forever()) if settings.FIRMS_POLLER_ENABLED else None
+    # Credenciales e ee.Initialize una sola vez, sin demorar el arranque ni cobrarlas al primer request
+    gee_task = asyncio.create_task(warm_up_gee()) if settings.GEE_WARMUP_ENABLED else None
+    # Cola de análisis largos; con GEE_JOBS_ENABLED, sus workers retoman los trabajos que quedaron de una corrida anterior
+    await gee_jobs.start(run_workers=settings.GEE_JOBS_ENABLED)
+    yield
+    await gee_jobs.stop()
+    if poller_task is not None:
+        poller_task.cancel()
+    if gee_task is not None:
+        gee_task.cancel()
+    gee_executor.shutdown()
+    gee_job_executor.shutdown()
+    await firms_client.aclose()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Sistema de prevención y monitoreo de incendios",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -75,14 +75,41 @@ class NBRResult(BaseModel):
     nbr_value: float = Field(..., description="Valor del índice NBR")
     dNBR: Optional[float] = Field(None, description="Diferencial NBR (pre-fuego vs post-fuego)")
     severity: Optional[str] = Field(None, description="Severidad del daño por incendio (si aplica)")
-    geometry: Optional[Dict[str, Any]] = Field(None, description="Geometría del área analizada")
+    percentiles: Optional[Dict[str, float]] = Field(None, description="Percentiles p10, p50 y p90 del NBR en la geometría")
+    dNBR_percentiles: Optional[Dict[str, float]] = Field(None, description="Percentiles p10, p50 y p90 del dNBR")
+    geometry: Optional[Dict[str, Any]] = Field(None, description="Obsoleto: la geometría va una sola vez en NBRAnalysisResponse.geometry")
+
+class NBRSeverityClass(BaseModel):
+    """Schema for the burned area of one dNBR severity class."""
+    severity_class: int = Field(..., description="Clase de severidad (0-4)")
+    label: str
+    area_ha: float = Field(..., ge=0, description="Superficie de la clase dentro de la geometría, en hectáreas")
+    percent: float = Field(..., ge=0, le=100)
 
 class NBRAnalysisResponse(BaseModel):
     """Schema for NBR analysis API response."""
     pre_fire_date: str = Field(..., description="Fecha de la imagen pre-incendio")
     post_fire_date: str = Field(..., description="Fecha de la imagen post-incendio")
     results: List[NBRResult] = Field(..., description="Resultados del análisis NBR")
+    severity_histogram: List[NBRSeverityClass] = Field(default_factory=list, description="Superficie por clase de severidad")
+    geometry: Optional[Dict[str, Any]] = Field(None, description="Geometría GeoJSON analizada")
     metadata: Dict[str, Any] = Field(
         default_factory=dict,
         description="Metadatos adicionales del análisis"
-    )
\ No newline at end of file
+    )
+# Schemas for the GEE job queue
+
+class GEEJobResponse(BaseModel):
+    """Estado de un análisis de GEE encolado como trabajo."""
+    job_id: str
+    kind: str = Field(..., description="Tipo de análisis: nbr, ndvi o historical")
+    status: str = Field(..., description="pending, running, succeeded o failed")
+    params: Dict[str, Any] = Field(..., description="Parámetros del análisis, como en el endpoint sincrónico")
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = Field(None, description="Hasta cuándo se guarda el resultado (UTC)")
+    error: Optional[str] = None
+    status_url: str
+    result_url: str
+    events_url: str = Field(..., description="Stream (Server-Sent Events) con cada cambio de estado")
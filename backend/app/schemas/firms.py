@@ -73,6 +73,35 @@ class ReportDetail(str, Enum):
     DETAILED = "detailed"
     ANALYTICAL = "analytical"
 
+class OutputFormat(str, Enum):
+    """Formatos de salida de /firms/."""
+    JSON = "json"        # Cuerpo JSON completo (precalculado y comprimido)
+    NDJSON = "ndjson"    # Una línea por foco, enviada en partes
+    GEOJSON = "geojson"  # FeatureCollection enviada en partes
+
+class DensityWeight(str, Enum):
+    """Qué acumula cada celda de la grilla de densidad."""
+    COUNT = "cantidad"  # Cantidad de focos
+    FRP = "frp"         # Suma de la potencia radiativa (MW)
+
+class DensityFormat(str, Enum):
+    """Formatos de salida de /firms/density."""
+    JSON = "json"  # Arreglo float32 en base64 con su forma y extensión
+    PNG = "png"    # Raster con paleta de calor (celdas vacías transparentes)
+
+class StatsGroup(str, Enum):
+    """Dimensiones por las que se agrupan las estadísticas de /firms/stats."""
+    TOTAL = "total"
+    REGION = "region"
+    DEPARTMENT = "departamento"
+    PROTECTED_AREA = "area_protegida"
+
+class RegionResponse(BaseModel):
+    """Región consultable en /firms/ (provincia o área personalizada)."""
+    id: str = Field(..., description="Identificador usado en el parámetro region", example="corrientes")
+    nombre: str = Field(..., description="Nombre para mostrar", example="Corrientes")
+    bbox: List[float] = Field(..., description="Extensión: oeste, sur, este, norte", example=[-60.0, -31.0, -57.0, -26.0])
+
 class FIRMSFireData(BaseModel):
     """Modelo de datos para focos de calor individuales con validación estricta."""
     latitude: float = Field(..., ge=-31.0, le=-26.0)
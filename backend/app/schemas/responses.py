@@ -1,3 +1,4 @@
+from datetime import date
 from pydantic import BaseModel, Field
 from typing import List
 
@@ -25,6 +26,7 @@ class FocoCalorResponse(BaseModel):
         example="Fuego fuerte, visible desde lejos"
     )
     area_protegida: str | None = Field(None, description="Nombre del área protegida si corresponde")
+    sensores: List[str] = Field(default_factory=list, description="Satélites que detectaron este foco")
 
 class ResumenResponse(BaseModel):
     """Resumen general de la situación"""
@@ -32,6 +34,69 @@ class ResumenResponse(BaseModel):
     periodo: str = Field(..., description="Período consultado (ej: 24h, 48h, semana)")
     fuente_datos: str = Field(..., description="Fuente satelital (ej: VIIRS, MODIS)")
     mensaje: str = Field(..., description="Mensaje de situación")
+    region: str | None = Field(None, description="Región consultada (ej: Corrientes, Chaco)")
+
+class ClusterResponse(BaseModel):
+    """Grupo de focos cercanos para los niveles de zoom bajos del mapa"""
+    latitud: float = Field(..., description="Latitud del centroide del grupo")
+    longitud: float = Field(..., description="Longitud del centroide del grupo")
+    cantidad: int = Field(..., description="Cantidad de focos agrupados")
+    frp_max: float | None = Field(None, description="Mayor potencia radiativa del grupo (MW)")
+
+class ClusterAPIResponse(BaseModel):
+    """Respuesta de /firms/ con zoom bajo: focos agrupados dentro del bbox"""
+    resumen: ResumenResponse
+    zoom: int
+    clusters: List[ClusterResponse]
+
+class EventoFuegoResponse(BaseModel):
+    """Incendio: focos cercanos en espacio y tiempo agrupados en un solo evento"""
+    id: int = Field(..., description="Identificador del evento dentro del período")
+    latitud: float = Field(..., description="Latitud del centroide de los focos")
+    longitud: float = Field(..., description="Longitud del centroide de los focos")
+    bbox: List[float] = Field(..., description="Extensión del evento: oeste, sur, este, norte")
+    primera_deteccion: str = Field(..., description="Fecha y hora del primer foco (UTC)")
+    ultima_deteccion: str = Field(..., description="Fecha y hora del último foco (UTC)")
+    cantidad_focos: int = Field(..., description="Cantidad de detecciones del evento")
+    frp_total: float | None = Field(None, description="Suma de la potencia radiativa de los focos (MW)")
+    frp_max: float | None = Field(None, description="Mayor potencia radiativa del evento (MW)")
+    areas_protegidas: List[str] = Field(default_factory=list, description="Áreas protegidas alcanzadas por el evento")
+
+class EventosAPIResponse(BaseModel):
+    """Respuesta de /firms/events"""
+    resumen: ResumenResponse
+    cantidad_eventos: int
+    eventos: List[EventoFuegoResponse]
+
+class DensidadResponse(BaseModel):
+    """Grilla de densidad de focos en formato compacto"""
+    periodo: str = Field(..., description="Período consultado")
+    region: str | None = Field(None, description="Región consultada")
+    peso: str = Field(..., description="Qué acumula cada celda: cantidad o frp")
+    bbox: List[float] = Field(..., description="Extensión de la grilla: oeste, sur, este, norte")
+    resolucion: float = Field(..., description="Tamaño de celda en grados")
+    filas: int = Field(..., description="Filas de la grilla (de norte a sur)")
+    columnas: int = Field(..., description="Columnas de la grilla (de oeste a este)")
+    maximo: float = Field(..., description="Valor de la celda más alta")
+    total: float = Field(..., description="Suma de todas las celdas")
+    codificacion: str = Field(..., description="Codificación de datos", example="float32-le-base64")
+    datos: str = Field(..., description="Valores de la grilla, fila por fila")
+
+class EstadisticaResponse(BaseModel):
+    """Agregado de focos de una clave (región, departamento o área protegida) en el rango o en un día"""
+    clave: str = Field(..., description="Región, departamento o área protegida ('total' sin agrupar)")
+    dia: date | None = Field(None, description="Día (UTC) si se pidió la serie diaria")
+    cantidad_focos: int = Field(..., description="Cantidad de focos")
+    frp_total: float = Field(..., description="Suma de la potencia radiativa (MW)")
+    focos_alta_confianza: int = Field(..., description="Focos con confianza Alta")
+
+class EstadisticasAPIResponse(BaseModel):
+    """Respuesta de /firms/stats, calculada desde los agregados diarios"""
+    desde: date
+    hasta: date
+    agrupar_por: str
+    dias_calculados: int = Field(..., description="Días del rango con agregados disponibles")
+    datos: List[EstadisticaResponse]
 
 class APIResponse(BaseModel):
     """Respuesta completa de la API"""
@@ -58,7 +123,8 @@ class APIResponse(BaseModel):
                         "confianza_texto": "El satélite está seguro de este foco",
                         "frp": 4.7,
                         "intensidad_texto": "Fuego fuerte, visible desde lejos",
-                        "area_protegida": "Parque Nacional Iberá"
+                        "area_protegida": "Parque Nacional Iberá",
+                        "sensores": ["VIIRS S-NPP", "VIIRS NOAA-20"]
                     },
                     {
                         "latitud": -28.6000,
@@ -70,7 +136,8 @@ class APIResponse(BaseModel):
                         "confianza_texto": "El satélite tiene dudas, pero es posible que haya fuego",
                         "frp": 2.1,
                         "intensidad_texto": "Fuego de baja intensidad",
-                        "area_protegida": None
+                        "area_protegida": None,
+                        "sensores": ["VIIRS NOAA-21"]
                     }
                 ]
             }
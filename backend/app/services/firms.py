@@ -1,24 +1,59 @@
-import requests
-from datetime import datetime, timedelta
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import threading
+from datetime import date, datetime, timedelta
 from fastapi import HTTPException
 from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.firms_archive import firms_archive
+from app.services.firms_client import firms_client
+from app.services.firms_regions import format_bbox, get_regions
+from app.services.firms_store import firms_store
+from app.utils.concurrency import SingleFlight
+from app.utils.date_utils import acquisition_timestamps, plan_windows
+from app.utils.geospatial import ClusterPyramid, GridIndex, cluster_events, density_grid, get_protected_areas, match_nearby
+from app.utils.metrics import InstrumentedTTLCache, Stopwatch
+from app.utils.raster import encode_png, heat_palette
 from app.schemas.external.firms import (
     FIRMSFireData, 
     FIRMSFireDataFrontend
 )
 from app.schemas.firms import (
+    DensityFormat,
+    DensityWeight,
+    OutputFormat,
+    RegionResponse,
     TimePeriod
 )
-from app.schemas.responses import APIResponse, ResumenResponse, FocoCalorResponse
-from typing import Dict, List, Tuple, Any
+from app.schemas.responses import APIResponse, EventoFuegoResponse, ResumenResponse, FocoCalorResponse
+from typing import Dict, Iterator, List, Tuple, Any
 import logging
+import brotli
+import numpy as np
 import pandas as pd
 from io import StringIO
-from cachetools import cached, TTLCache
+import time
 
 logger = logging.getLogger(__name__)
 
-firms_cache = TTLCache(maxsize=20, ttl=3600)  # 1 hora
+# Stale-while-revalidate: pasado el TTL blando se sirve lo cacheado y se refresca en segundo plano;
+# el TTL duro (el del TTLCache) acota cuán viejo puede ser un dato servido.
+# Cuenta aciertos, fallos y entradas descartadas para /firms/status y /firms/metrics.
+firms_cache = InstrumentedTTLCache(maxsize=20, ttl=settings.FIRMS_CACHE_HARD_TTL)
+firms_cache_lock = threading.RLock()  # get_dataset se ejecuta en el threadpool
+# Un solo cálculo en curso por período ante misses concurrentes del cache
+firms_singleflight = SingleFlight()
+# Referencias a los refrescos en segundo plano (evita que el GC los descarte)
+_refresh_tasks: set = set()
+
+def invalidate_firms_cache() -> None:
+    """Marca todas las entradas como obsoletas: se siguen sirviendo mientras se refrescan."""
+    with firms_cache_lock:
+        for dataset in firms_cache.values():
+            dataset.invalidated = True
 
 def _kelvin_to_celsius(kelvin: float) -> float:
     if kelvin is None:
@@ -77,10 +112,8 @@ def _intensidad_text(frp: float | None) -> str:
         return "Sin fuego"
 
 def _get_area_protegida(lat: float, lon: float) -> str | None:
-    # Ejemplo simple, puedes mejorar con polígonos reales
-    if -28.7 <= lat <= -28.0 and -57.8 <= lon <= -57.0:
-        return "Parque Nacional Iberá"
-    return None
+    areas = get_protected_areas()
+    return areas.name_at(lat, lon) if areas is not None else None
 
 def _combine_datetime(acq_date: str, acq_time: int) -> str | None:
     try:
@@ -91,19 +124,377 @@ def _combine_datetime(acq_date: str, acq_time: int) -> str | None:
     except Exception:
         return None
 
+# --- Versiones vectorizadas (columna a columna) de los helpers anteriores ---
+# Las funciones escalares de arriba definen la semántica; estas la replican
+# sobre columnas completas de pandas/NumPy para no iterar fila por fila.
+
+_CONFIDENCE_TEXTS = {
+    "Alta": "El satélite está seguro de este foco",
+    "Nominal": "El satélite tiene dudas, pero es posible que haya fuego",
+    "Baja": "El satélite detectó algo, pero puede ser falso",
+}
+
+# Orden de columnas de FocoCalorResponse, usado para serializar en bloque
+FOCO_COLUMNS = list(FocoCalorResponse.model_fields.keys())
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    """Devuelve la columna numérica `name` o una columna vacía (NaN) si no existe."""
+    if name in df.columns:
+        return pd.to_numeric(df[name], errors="coerce")
+    return pd.Series(np.nan, index=df.index, dtype="float64")
+
+def _kelvin_to_celsius_column(kelvin: pd.Series) -> pd.Series:
+    return (kelvin - 273.15).round(1)
+
+def _map_confidence_column(confidence: pd.Series) -> pd.Series:
+    # Hay pocos valores distintos ('l'/'n'/'h' en VIIRS, 0-100 en MODIS):
+    # se mapean los valores únicos con la función escalar y se expanden por código.
+    codes, uniques = pd.factorize(confidence)
+    labels = np.array([_map_confidence(value) for value in uniques] + ["Desconocida"], dtype=object)
+    return pd.Series(labels[codes], index=confidence.index)
+
+def _confidence_text_column(conf: pd.Series) -> pd.Series:
+    return conf.map(_CONFIDENCE_TEXTS).fillna("Sin información")
+
+def _temp_text_column(temp: pd.Series) -> np.ndarray:
+    return np.select(
+        [temp.isna(), temp > 80, temp > 60, temp > 40],
+        ["Sin dato", "Muy caliente", "Caliente", "Tibio"],
+        default="Bajo",
+    )
+
+def _intensidad_text_column(frp: pd.Series) -> np.ndarray:
+    return np.select(
+        [frp.isna(), frp > 50, frp > 20, frp > 0],
+        ["Sin dato", "Fuego fuerte, visible desde lejos", "Fuego de intensidad media", "Fuego de baja intensidad"],
+        default="Sin fuego",
+    )
+
+def _area_protegida_column(lat: pd.Series, lon: pd.Series) -> np.ndarray:
+    areas = get_protected_areas()
+    if areas is None:
+        return np.full(len(lat), None, dtype=object)
+    # Una sola consulta punto-en-polígono para todo el lote
+    return areas.tag(lat.to_numpy(), lon.to_numpy())
+
+def _combine_datetime_column(acq_date: pd.Series, acq_time: pd.Series) -> np.ndarray:
+    """Equivalente a `_combine_datetime` para columnas; las fechas inválidas quedan como ""."""
+    values = acquisition_timestamps(acq_date, acq_time)
+    iso = np.char.add(np.datetime_as_string(values, unit="s"), "Z").astype(object)
+    iso[np.isnat(values)] = ""
+    return iso
+
+def _transform_detections(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte el CSV crudo de FIRMS en un DataFrame con las columnas de
+    FocoCalorResponse, operando sobre columnas completas.
+    Las filas sin coordenadas válidas se descartan.
+    """
+    lat = _column(df, "latitude")
+    lon = _column(df, "longitude")
+    valid = lat.notna() & lon.notna()
+    if not valid.all():
+        logger.warning(f"Se descartaron {int((~valid).sum())} focos sin coordenadas válidas")
+        df, lat, lon = df[valid], lat[valid], lon[valid]
+
+    temp_c = _kelvin_to_celsius_column(_column(df, "bright_ti4"))
+    frp = _column(df, "frp")
+    confidence = df["confidence"] if "confidence" in df.columns else pd.Series(None, index=df.index, dtype=object)
+    conf = _map_confidence_column(confidence)
+    if "acq_date" in df.columns and "acq_time" in df.columns:
+        fecha_hora = _combine_datetime_column(df["acq_date"], _column(df, "acq_time"))
+    else:
+        fecha_hora = np.full(len(df), "", dtype=object)
+
+    focos = pd.DataFrame({
+        "latitud": lat,
+        "longitud": lon,
+        "fecha_hora": fecha_hora,
+        "temperatura_celsius": temp_c,
+        "temperatura_texto": _temp_text_column(temp_c),
+        "confianza": conf,
+        "confianza_texto": _confidence_text_column(conf),
+        "frp": frp,
+        "intensidad_texto": _intensidad_text_column(frp),
+        "area_protegida": _area_protegida_column(lat, lon),
+        "sensores": df["sensores"] if "sensores" in df.columns else [[] for _ in range(len(df))],
+    }, index=df.index)
+    return focos[FOCO_COLUMNS].reset_index(drop=True)
+
+# Clave natural de una detección FIRMS (la misma que usa el store local)
+DETECTION_KEY = ["latitude", "longitude", "acq_date", "acq_time", "satellite"]
+
+def merge_detection_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Une los CSVs de varias ventanas descartando detecciones repetidas."""
+    chunks = [chunk for chunk in chunks if not chunk.empty]
+    if not chunks:
+        return pd.DataFrame()
+    merged = pd.concat(chunks, ignore_index=True)
+    subset = [column for column in DETECTION_KEY if column in merged.columns]
+    return merged.drop_duplicates(subset=subset, ignore_index=True)
+
+EVENT_COLUMNS = list(EventoFuegoResponse.model_fields.keys())
+
+def _build_events(focos: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrupa los focos en eventos de fuego (cluster_events sobre lat, lon y hora de detección)
+    y resume cada evento. Los focos sin fecha válida no se agrupan.
+    Los eventos quedan ordenados del más reciente al más antiguo.
+    """
+    focos = focos[focos["fecha_hora"] != ""]
+    if focos.empty:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    # fecha_hora es "YYYY-MM-DDTHH:MM:SSZ": NumPy lo interpreta sin la Z final
+    detected_at = focos["fecha_hora"].str[:-1].to_numpy().astype("datetime64[s]")
+    hours = (detected_at - detected_at.min()).astype("float64") / 3600
+    labels = cluster_events(
+        focos["latitud"].to_numpy(), focos["longitud"].to_numpy(), hours,
+        distance_km=settings.FIRMS_EVENT_DISTANCE_KM,
+        gap_hours=settings.FIRMS_EVENT_GAP_HOURS,
+    )
+    focos = focos.assign(evento=labels, detectado=detected_at)
+    grouped = focos.groupby("evento")
+    events = grouped.agg(
+        latitud=("latitud", "mean"),
+        longitud=("longitud", "mean"),
+        oeste=("longitud", "min"),
+        sur=("latitud", "min"),
+        este=("longitud", "max"),
+        norte=("latitud", "max"),
+        primera_deteccion=("detectado", "min"),
+        ultima_deteccion=("detectado", "max"),
+        cantidad_focos=("fecha_hora", "size"),
+        frp_max=("frp", "max"),
+    )
+    events["frp_total"] = grouped["frp"].sum(min_count=1)
+    # Áreas protegidas distintas por evento: se ordenan los pares y se cortan por evento
+    areas = focos[["evento", "area_protegida"]].dropna().drop_duplicates().sort_values(["evento", "area_protegida"])
+    area_events, starts = np.unique(areas["evento"].to_numpy(), return_index=True)
+    area_lists = [[] for _ in range(len(events))]  # Las etiquetas de evento son 0..k-1
+    if len(areas):
+        for event, names in zip(area_events, np.split(areas["area_protegida"].to_numpy(), starts[1:])):
+            area_lists[event] = names.tolist()
+    events["areas_protegidas"] = area_lists
+    events["bbox"] = events[["oeste", "sur", "este", "norte"]].to_numpy().tolist()
+    events = events.sort_values(["ultima_deteccion", "cantidad_focos"], ascending=False, ignore_index=True)
+    for column in ("primera_deteccion", "ultima_deteccion"):
+        events[column] = np.char.add(np.datetime_as_string(events[column].to_numpy(), unit="s"), "Z").astype(object)
+    events["id"] = np.arange(1, len(events) + 1)
+    return events[EVENT_COLUMNS]
+
+def _iter_chunks(focos: pd.DataFrame):
+    chunk_rows = settings.FIRMS_STREAM_CHUNK_ROWS
+    for start in range(0, len(focos), chunk_rows):
+        yield focos.iloc[start:start + chunk_rows]
+
+def iter_ndjson(resumen: ResumenResponse, focos: pd.DataFrame) -> Iterator[bytes]:
+    """
+    NDJSON por partes: la primera línea es {"resumen": ...} y cada línea siguiente un foco.
+    Solo se serializa un bloque de FIRMS_STREAM_CHUNK_ROWS focos a la vez.
+    """
+    yield b'{"resumen":' + resumen.model_dump_json().encode("utf-8") + b"}\n"
+    for chunk in _iter_chunks(focos):
+        # to_json con lines=True ya termina cada línea (incluida la última) con salto de línea
+        yield chunk.to_json(orient="records", lines=True, force_ascii=False).encode("utf-8")
+
+def iter_geojson(resumen: ResumenResponse, focos: pd.DataFrame) -> Iterator[bytes]:
+    """FeatureCollection de puntos por partes; el resumen va como miembro adicional de la colección."""
+    yield b'{"type":"FeatureCollection","resumen":' + resumen.model_dump_json().encode("utf-8") + b',"features":['
+    separator = ""
+    for chunk in _iter_chunks(focos):
+        properties = chunk.drop(columns=["latitud", "longitud"]).to_json(
+            orient="records", lines=True, force_ascii=False
+        ).splitlines()
+        features = ",".join(
+            f'{{"type":"Feature","geometry":{{"type":"Point","coordinates":[{lon},{lat}]}},"properties":{props}}}'
+            for lon, lat, props in zip(chunk["longitud"].tolist(), chunk["latitud"].tolist(), properties)
+        )
+        yield (separator + features).encode("utf-8")
+        separator = ","
+    yield b"]}"
+
+# Nombre corto de cada fuente FIRMS para la lista de sensores de un foco
+SOURCE_LABELS = {
+    "VIIRS_SNPP_NRT": "VIIRS S-NPP",
+    "VIIRS_NOAA20_NRT": "VIIRS NOAA-20",
+    "VIIRS_NOAA21_NRT": "VIIRS NOAA-21",
+    "VIIRS_SNPP_SP": "VIIRS S-NPP",
+    "VIIRS_NOAA20_SP": "VIIRS NOAA-20",
+    "MODIS_NRT": "MODIS",
+    "MODIS_SP": "MODIS",
+}
+
+def fuse_sources(frames: List[Tuple[str, pd.DataFrame]]) -> pd.DataFrame:
+    """
+    Fusiona los CSVs crudos de varias fuentes (en orden de prioridad) en un solo DataFrame.
+    Las detecciones de otra fuente a menos de FIRMS_FUSION_DISTANCE_KM y FIRMS_FUSION_MINUTES
+    de un foco ya incorporado son el mismo píxel de fuego: no se agregan y solo suman su
+    sensor a la columna `sensores` del foco existente. Los pares se buscan con match_nearby.
+    """
+    parts: List[pd.DataFrame] = []
+    columns: List[str] = []
+    sensores: List[List[str]] = []
+    anchor = None  # Coordenadas (lat, lon, minutos, válidas) de los focos ya incorporados
+    for source, df in frames:
+        if df.empty:
+            continue
+        df = df.reset_index(drop=True)
+        label = SOURCE_LABELS.get(source, source)
+        point = _fusion_coordinates(df)
+        new = np.ones(len(df), dtype=bool)
+        if anchor is not None:
+            anchor_valid, point_valid = np.flatnonzero(anchor[3]), np.flatnonzero(point[3])
+            matched, anchors = match_nearby(
+                *(values[anchor_valid] for values in anchor[:3]),
+                *(values[point_valid] for values in point[:3]),
+                distance_km=settings.FIRMS_FUSION_DISTANCE_KM,
+                tolerance_minutes=settings.FIRMS_FUSION_MINUTES,
+            )
+            for anchor_idx in anchor_valid[anchors]:
+                if label not in sensores[anchor_idx]:
+                    sensores[anchor_idx].append(label)
+            new[point_valid[matched]] = False
+        if new.any():
+            parts.append(df[new])
+            columns += [column for column in df.columns if column not in columns]
+            sensores += [[label] for _ in range(int(new.sum()))]
+            added = tuple(values[new] for values in point)
+            anchor = added if anchor is None else tuple(np.concatenate(pair) for pair in zip(anchor, added))
+    if not parts:
+        return pd.DataFrame()
+    if len(parts) == 1:
+        fused = parts[0]
+    else:
+        # Las columnas vacías de una fuente (p. ej. bright_ti4 en MODIS) quedan fuera del concat:
+        # pandas avisa que dejará de ignorarlas al elegir el dtype. El reindex las repone
+        fused = pd.concat([part.dropna(axis=1, how="all") for part in parts], ignore_index=True).reindex(columns=columns)
+    return fused.assign(sensores=sensores)
+
+def _fusion_coordinates(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Latitud, longitud, minutos de adquisición y máscara de filas utilizables para la fusión."""
+    lat = _column(df, "latitude").to_numpy()
+    lon = _column(df, "longitude").to_numpy()
+    acquired = acquisition_timestamps(df["acq_date"], df["acq_time"])
+    minutes = acquired.astype("datetime64[m]").astype("int64").astype("float64")
+    valid = ~np.isnat(acquired) & ~np.isnan(lat) & ~np.isnan(lon)
+    return lat, lon, minutes, valid
+
+class FirmsDataset:
+    """
+    Resultado de una consulta FIRMS ya transformado.
+    Guarda los focos como DataFrame para poder serializarlos en bloque
+    sin construir ni validar un FocoCalorResponse por fila.
+    """
+
+    def __init__(self, resumen: ResumenResponse, focos: pd.DataFrame):
+        self.resumen = resumen
+        self.focos = focos
+        self.fetched_at = time.time()
+        self.invalidated = False  # Llegaron datos nuevos al store desde que se calculó
+        self.immutable = False  # Período cerrado servido desde el archivo persistente
+        self.encoded: Dict[str, bytes] = {}  # Cuerpo JSON por Content-Encoding
+        self.etags: Dict[str, str] = {}
+        self.index: GridIndex | None = None  # Índice espacial de los focos (consultas por bbox)
+        self.clusters: ClusterPyramid | None = None  # Clusters precalculados por nivel de zoom
+        self.eventos: pd.DataFrame | None = None  # Focos agrupados en eventos de fuego
+        self.sources: List[str] = []
+        self.regions: Dict[str, "FirmsDataset"] = {}  # Vistas por región recortadas de este dataset
+        self.bbox: List[float] | None = None  # Extensión de la región (solo en las vistas)
+        self.density: Dict[Tuple[float, str, str], bytes] = {}  # Grillas de densidad ya codificadas
+        self.origin = "store"  # De dónde salieron los focos: "store" o "archivo"
+        self.rows: Dict[str, int] = {}  # Filas leídas, fusionadas y descartadas al construirlo
+        self.timings: Dict[str, float] = {}  # Segundos por fase de construcción
+
+    def age(self) -> float:
+        """Antigüedad de los datos en segundos."""
+        return time.time() - self.fetched_at
+
+    def is_stale(self) -> bool:
+        if self.immutable:
+            return False
+        return self.invalidated or self.age() > settings.FIRMS_CACHE_SOFT_TTL
+
+    def to_api_response(self) -> APIResponse:
+        """
+        Construye el APIResponse sin validación por fila (los datos ya vienen normalizados).
+        Como to_json, recorre los focos por columnas: DataFrame.to_dict("records") costaba más
+        que validar fila por fila.
+        """
+        names = list(self.focos.columns)
+        columns = []
+        for name in names:
+            column = self.focos[name]
+            values = column.astype(object).where(column.notna(), None).tolist()
+            if name == "sensores":
+                # Leídas de Parquet, las listas de sensores son arrays de NumPy, que pydantic no serializa
+                values = [list(value) if isinstance(value, np.ndarray) else value for value in values]
+            columns.append(values)
+        fields_set = set(names)
+        return APIResponse.model_construct(
+            resumen=self.resumen,
+            focos=[FocoCalorResponse.model_construct(fields_set, **dict(zip(names, row))) for row in zip(*columns)],
+        )
+
+    def to_json(self) -> bytes:
+        """Serializa la respuesta completa usando el encoder JSON de pandas para los focos."""
+        focos_json = self.focos.to_json(orient="records", force_ascii=False)
+        return b"".join([
+            b'{"resumen":', self.resumen.model_dump_json().encode("utf-8"),
+            b',"focos":', focos_json.encode("utf-8"), b"}",
+        ])
+
+    def prepare_encodings(self) -> None:
+        """
+        Serializa y comprime la respuesta una sola vez por refresco (identity, gzip y brotli),
+        junto con un ETag fuerte por representación derivado del contenido.
+        """
+        body = self.to_json()
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.encoded = {
+            "identity": body,
+            "gzip": gzip.compress(body, compresslevel=6),
+            "br": brotli.compress(body, quality=5),
+        }
+        self.etags = {
+            encoding: f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+            for encoding in self.encoded
+        }
+
+    def build_spatial_index(self) -> None:
+        """Indexa los focos y precalcula los clusters de todos los zoom una sola vez por refresco."""
+        lat = self.focos["latitud"].to_numpy(dtype="float64")
+        lon = self.focos["longitud"].to_numpy(dtype="float64")
+        frp = pd.to_numeric(self.focos["frp"], errors="coerce").to_numpy(dtype="float64")
+        self.index = GridIndex(lat, lon)
+        self.clusters = ClusterPyramid(
+            lat, lon, frp,
+            max_zoom=settings.FIRMS_CLUSTER_MAX_ZOOM,
+            cells_per_tile=settings.FIRMS_CLUSTER_CELLS_PER_TILE,
+        )
+
+    def viewport(self, bbox: Tuple[float, float, float, float] | None, zoom: int | None) -> Tuple[str, pd.DataFrame]:
+        """
+        Focos (o clusters, si el zoom es bajo) dentro del bbox, resueltos con los índices precalculados.
+        Devuelve el tipo de resultado ("clusters" o "focos") y las filas.
+        """
+        if zoom is not None and zoom <= settings.FIRMS_CLUSTER_MAX_ZOOM:
+            return "clusters", self.clusters.query(zoom, bbox)
+        if bbox is None:
+            return "focos", self.focos
+        return "focos", self.focos.iloc[self.index.query(*bbox)]
+
 class FIRMSService:
-    CORRIENTES_BBOX = "-60,-31,-57,-26"
     SOURCES = {
-        "recent": "VIIRS_SNPP_NRT",
-        "historical": "MODIS_SP"
+        "recent": settings.FIRMS_RECENT_SOURCES,
+        "historical": settings.FIRMS_HISTORICAL_SOURCES
     }
 
     def __init__(self):
         self.api_key = settings.FIRMS_API_KEY
-        self.base_url = "https://firms.modaps.eosdis.nasa.gov/api/area/csv"
 
     def get_date_range(self, period: TimePeriod) -> Tuple[datetime, datetime]:
-        today = datetime.now()
+        # En UTC, como acquired_at en el store y los días que sincroniza el poller
+        today = datetime.utcnow()
         current_year = today.year
         period_mapping = {
             TimePeriod.LAST_24H: (today - timedelta(days=1), today),
@@ -121,63 +512,384 @@ class FIRMSService:
             return today - timedelta(days=1), today
         return period_mapping[period]
 
-    @cached(cache=firms_cache)
-    def get_active_fires(self, period: TimePeriod) -> APIResponse:
+    def get_fetch_bbox(self) -> str:
+        """Unión de los bbox de todas las regiones: se descarga una sola vez para todas."""
+        return format_bbox(get_regions().union_bbox())
+
+    def get_sources(self, period: TimePeriod) -> List[str]:
+        """Fuentes que se fusionan para el período, en orden de prioridad."""
+        if period.value in ['2021', '2022', '2023']:
+            return self.SOURCES["historical"]
+        return self.SOURCES["recent"]
+
+    def get_source_coverage(self) -> Dict[str, Tuple[date, date]]:
+        """Rango de días que el store local debe cubrir por fuente para responder todos los períodos."""
+        coverage: Dict[str, Tuple[date, date]] = {}
+        for period in TimePeriod:
+            period_start, period_end = (value.date() for value in self.get_date_range(period))
+            for source in self.get_sources(period):
+                start, end = period_start, period_end
+                if source in coverage:
+                    start = min(start, coverage[source][0])
+                    end = max(end, coverage[source][1])
+                coverage[source] = (start, end)
+        return coverage
+
+    async def fetch_window(self, source: str, start: date, days: int) -> pd.DataFrame:
+        """Descarga de FIRMS `days` días de `source` a partir de `start` (CSV crudo como DataFrame)."""
+        if not self.api_key:
+            raise HTTPException(status_code=500, detail="API key no configurada")
+        text = await firms_client.fetch_csv(self.api_key, source, self.get_fetch_bbox(), days, start)
+        if '\n' not in text.strip():  # Solo encabezado: no hubo detecciones
+            return pd.DataFrame()
+        # El parseo de CSVs grandes se hace fuera del event loop
+        started = time.perf_counter()
+        df = await asyncio.to_thread(pd.read_csv, StringIO(text))
+        firms_client.record_parse(source, len(df), time.perf_counter() - started)
+        return df
+
+    async def _fetch_window_with_retry(self, source: str, start: date, days: int) -> pd.DataFrame:
+        """Reintenta solo esta ventana ante errores del upstream (502/504), con espera exponencial."""
+        for attempt in range(settings.FIRMS_WINDOW_RETRIES + 1):
+            try:
+                return await self.fetch_window(source, start, days)
+            except HTTPException as e:
+                if e.status_code not in (502, 504) or attempt == settings.FIRMS_WINDOW_RETRIES:
+                    raise
+                logger.warning(f"Reintentando ventana FIRMS {source} {start} ({days} días): {e.detail}")
+                await asyncio.sleep(settings.FIRMS_RETRY_BACKOFF * 2 ** attempt)
+
+    async def fetch_windows(self, source: str, windows: List[Tuple[date, int]]) -> List[pd.DataFrame | Exception]:
+        """
+        Descarga las ventanas en paralelo con concurrencia acotada.
+        Devuelve un resultado por ventana, en orden: el DataFrame o la excepción si falló.
+        """
+        semaphore = asyncio.Semaphore(settings.FIRMS_MAX_CONCURRENT_WINDOWS)
+
+        async def fetch(window: Tuple[date, int]) -> pd.DataFrame:
+            async with semaphore:
+                return await self._fetch_window_with_retry(source, *window)
+
+        return await asyncio.gather(*(fetch(window) for window in windows), return_exceptions=True)
+
+    async def fetch_range(self, source: str, start: date, end: date) -> pd.DataFrame:
+        """Descarga cualquier rango de fechas dividiéndolo en ventanas aceptadas por la API."""
+        windows = plan_windows(start, end, settings.FIRMS_MAX_DAY_RANGE)
+        results = await self.fetch_windows(source, windows)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return merge_detection_chunks(results)
+
+    def _is_archivable(self, db, sources: List[str], end_date: datetime) -> bool:
+        """Un período es archivable si su rango terminó (en UTC) y el store ya lo tiene completo en todas sus fuentes."""
+        if end_date.date() >= datetime.utcnow().date():
+            return False
+        for source in sources:
+            synced_through = firms_store.get_synced_through(db, source, self.get_fetch_bbox())
+            if synced_through is None or synced_through < end_date.date():
+                return False
+        return True
+
+    def _build_dataset(self, period: TimePeriod) -> FirmsDataset:
+        """
+        Responde el período con una consulta por rango sobre el store local (lo alimenta el poller).
+        Los períodos cerrados se sirven desde el archivo Parquet persistente una vez generado.
+        """
         try:
+            watch = Stopwatch()
             start_date, end_date = self.get_date_range(period)
-            days = (end_date - start_date).days
-            if period.value in ['2021', '2022', '2023']:
-                source = self.SOURCES["historical"]
-            else:
-                source = self.SOURCES["recent"]
-            url = f"{self.base_url}/{self.api_key}/{source}/{self.CORRIENTES_BBOX}/{days}"
-            if not self.api_key:
-                raise HTTPException(status_code=500, detail="API key no configurada")
-            response = requests.get(url, timeout=30)
-            if response.status_code != 200:
-                raise HTTPException(status_code=502, detail="Error consultando FIRMS")
-            lines = response.text.strip().split('\n')
-            if len(lines) <= 1:
-                return self._empty_response(period)
-            df = pd.read_csv(StringIO(response.text))
-            focos: List[FocoCalorResponse] = []
-            for fire in df.to_dict('records'):
-                try:
-                    lat = fire['latitude']
-                    lon = fire['longitude']
-                    temp_k = fire.get('bright_ti4')
-                    temp_c = _kelvin_to_celsius(temp_k)
-                    conf = _map_confidence(fire.get('confidence'))
-                    frp = fire.get('frp')
-                    area = _get_area_protegida(lat, lon)
-                    fecha_hora = _combine_datetime(fire.get('acq_date'), fire.get('acq_time'))
-                    foco = FocoCalorResponse(
-                        latitud=lat,
-                        longitud=lon,
-                        fecha_hora=fecha_hora or "",
-                        temperatura_celsius=temp_c,
-                        temperatura_texto=_temp_text(temp_c),
-                        confianza=conf,
-                        confianza_texto=_confidence_text(conf),
-                        frp=frp,
-                        intensidad_texto=_intensidad_text(frp),
-                        area_protegida=area
-                    )
-                    focos.append(foco)
-                except Exception as e:
-                    logger.warning(f"Error al parsear foco: {fire} - {e}")
-                    continue
-            resumen = ResumenResponse(
-                cantidad_focos=len(focos),
-                periodo=period.value,
-                fuente_datos="Satélite VIIRS" if source == "VIIRS_SNPP_NRT" else "Satélite MODIS",
-                mensaje=self._mensaje_rural(len(focos), period)
-            )
-            return APIResponse(resumen=resumen, focos=focos)
+            sources = self.get_sources(period)
+            # El archivo depende de las fuentes y del área descargada (cambia si cambian las regiones)
+            bbox = self.get_fetch_bbox()
+            archive_key = f"{'+'.join(sources)}_{hashlib.sha256(bbox.encode()).hexdigest()[:8]}"
+            db = SessionLocal()
+            try:
+                archivable = self._is_archivable(db, sources, end_date)
+                if archivable:
+                    focos = firms_archive.load(archive_key, start_date.date(), end_date.date())
+                    if focos is not None:
+                        watch.lap("archivo")
+                        dataset = self._make_dataset(period, sources, focos, immutable=True)
+                        dataset.origin = "archivo"
+                        dataset.rows = {"leidas": len(focos), "focos": len(focos)}
+                        dataset.timings = {**watch.laps, **dataset.timings}
+                        return dataset
+                frames = [(source, firms_store.get_detections(db, source, start_date, end_date)) for source in sources]
+                watch.lap("consulta")
+            finally:
+                db.close()
+            # Un mismo fuego visto por varios satélites queda como un solo foco con todos sus sensores
+            df = fuse_sources(frames)
+            watch.lap("fusion")
+            focos = _transform_detections(df) if not df.empty else pd.DataFrame(columns=FOCO_COLUMNS)
+            watch.lap("transformacion")
+            if archivable:
+                firms_archive.save(archive_key, start_date.date(), end_date.date(), focos)
+                watch.lap("archivo")
+            dataset = self._make_dataset(period, sources, focos, immutable=archivable)
+            dataset.rows = {
+                "leidas": sum(len(frame) for _, frame in frames),
+                "fusionadas": len(df),
+                "rechazadas": len(df) - len(focos),  # Sin coordenadas válidas
+                "focos": len(focos),
+            }
+            dataset.timings = {**watch.laps, **dataset.timings}
+            return dataset
         except Exception as e:
             logger.error(f"Error en get_active_fires: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail=str(e))
 
+    def _make_dataset(
+        self,
+        period: TimePeriod,
+        sources: List[str],
+        focos: pd.DataFrame,
+        immutable: bool = False,
+        region: RegionResponse | None = None,
+    ) -> FirmsDataset:
+        """
+        Sin `region` arma el dataset del área descargada completa (el que se cachea por período),
+        que solo se indexa para recortar regiones. Con `region` arma la vista que se sirve.
+        """
+        resumen = ResumenResponse(
+            cantidad_focos=len(focos),
+            periodo=period.value,
+            fuente_datos=self._fuente_datos(sources),
+            mensaje=self._mensaje_rural(len(focos), period),
+            region=region.nombre if region else None
+        )
+        watch = Stopwatch()
+        dataset = FirmsDataset(resumen=resumen, focos=focos)
+        dataset.sources = sources
+        dataset.immutable = immutable
+        dataset.build_spatial_index()
+        watch.lap("indices")
+        if region is not None:
+            # Se codifica acá (en el hilo que construye el dataset) para que los requests
+            # solo copien bytes o hagan búsquedas en los índices
+            dataset.prepare_encodings()
+            watch.lap("codificacion")
+            dataset.eventos = _build_events(focos)
+            watch.lap("eventos")
+        dataset.timings = watch.laps
+        return dataset
+
+    def _region_view(self, period: TimePeriod, dataset: FirmsDataset, region_id: str) -> FirmsDataset:
+        """Recorta (una vez por refresco) la región del dataset del período usando su índice espacial."""
+        with firms_cache_lock:
+            view = dataset.regions.get(region_id)
+        if view is not None:
+            return view
+        region = get_regions().get(region_id)
+        focos = dataset.focos.iloc[dataset.index.query(*region.bbox)].reset_index(drop=True)
+        view = self._make_dataset(period, dataset.sources, focos, immutable=dataset.immutable, region=region)
+        view.fetched_at = dataset.fetched_at
+        view.bbox = region.bbox
+        with firms_cache_lock:
+            return dataset.regions.setdefault(region_id, view)
+
+    def get_dataset(self, period: TimePeriod, region: str | None = None) -> FirmsDataset:
+        """
+        Devuelve el dataset cacheado del período (aunque esté obsoleto) o lo calcula.
+        El cache es por período para toda el área descargada; las regiones se recortan de ahí.
+        """
+        with firms_cache_lock:
+            dataset = firms_cache.get(period)
+        if dataset is None:
+            dataset = self._build_dataset(period)
+            with firms_cache_lock:
+                firms_cache[period] = dataset
+        return self._region_view(period, dataset, region or settings.FIRMS_DEFAULT_REGION)
+
+    async def get_dataset_async(self, period: TimePeriod, region: str | None = None) -> FirmsDataset:
+        """
+        Versión para endpoints async: la consulta al store y la transformación no bloquean el event loop.
+        Ante un miss, los requests concurrentes del mismo período esperan un único cálculo.
+        Si el dato está obsoleto (TTL blando) se devuelve igual y se refresca en segundo plano.
+        """
+        with firms_cache_lock:
+            dataset = firms_cache.get(period)
+            # _refresh puede reemplazar la entrada desde otro hilo: contador y vistas, bajo el mismo lock
+            stale = dataset is not None and dataset.is_stale()
+            if stale:
+                firms_cache.stale_hits += 1
+        if dataset is None:
+            dataset = await firms_singleflight.do(period, lambda: self._refresh(period))
+        elif stale:
+            self._schedule_refresh(period)
+        region = region or settings.FIRMS_DEFAULT_REGION
+        with firms_cache_lock:
+            view = dataset.regions.get(region)
+        if view is None:
+            # Primer pedido de la región desde el último refresco: un solo recorte por (período, región)
+            key = (period, region, dataset.fetched_at)
+            view = await firms_singleflight.do(key, lambda: asyncio.to_thread(self._region_view, period, dataset, region))
+        return view
+
+    async def _refresh(self, period: TimePeriod) -> FirmsDataset:
+        dataset = await asyncio.to_thread(self._build_dataset, period)
+        with firms_cache_lock:
+            firms_cache[period] = dataset
+        return dataset
+
+    def _schedule_refresh(self, period: TimePeriod) -> None:
+        """Lanza un único refresco en segundo plano por período."""
+        if firms_singleflight.is_in_flight(period):
+            return
+        task = firms_singleflight.start(period, lambda: self._refresh(period))
+        _refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_done)
+
+    @staticmethod
+    def _refresh_done(task: asyncio.Task) -> None:
+        _refresh_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error refrescando datos FIRMS en segundo plano: {task.exception()}")
+
+    def get_source_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Descargas por fuente (latencia, bytes, filas parseadas) y filas descartadas al guardarlas."""
+        return {
+            source: {**stats, "filas_rechazadas": firms_store.rejected.get(source, 0)}
+            for source, stats in firms_client.get_stats().items()
+        }
+
+    def get_cache_entries(self) -> List[Dict[str, Any]]:
+        """
+        Estado de cada período cacheado: cuándo se calculó, de dónde salieron los datos, filas
+        y tiempo por fase, las vistas por región y las descargas de sus fuentes (las hace el poller).
+        """
+        with firms_cache_lock:
+            entries = list(firms_cache.items())
+        result = []
+        for period, dataset in entries:
+            if firms_singleflight.is_in_flight(period):
+                estado = "actualizando"
+            elif dataset.is_stale():
+                estado = "obsoleto"
+            else:
+                estado = "fresco"
+            with firms_cache_lock:
+                regions = dict(dataset.regions)
+            upstream = self.get_source_stats()
+            result.append({
+                "periodo": period.value,
+                "obtenido": datetime.fromtimestamp(dataset.fetched_at).strftime("%Y-%m-%d %H:%M:%S"),
+                "edad_segundos": int(dataset.age()),
+                "estado": estado,
+                "origen": dataset.origin,
+                "filas": dataset.rows,
+                "tiempos_ms": {phase: round(seconds * 1000, 2) for phase, seconds in dataset.timings.items()},
+                "regiones": {
+                    region_id: {
+                        "focos": len(view.focos),
+                        "tiempos_ms": {phase: round(seconds * 1000, 2) for phase, seconds in view.timings.items()},
+                    }
+                    for region_id, view in regions.items()
+                },
+                "fuentes": {source: upstream[source] for source in dataset.sources if source in upstream},
+            })
+        return result
+
+    def get_viewport_json(
+        self,
+        period: TimePeriod,
+        dataset: FirmsDataset,
+        bbox: Tuple[float, float, float, float] | None,
+        zoom: int | None,
+    ) -> bytes:
+        """Serializa la vista del mapa: clusters con zoom bajo o focos dentro del bbox."""
+        kind, rows = dataset.viewport(bbox, zoom)
+        cantidad = int(rows["cantidad"].sum()) if kind == "clusters" else len(rows)
+        resumen = self._viewport_resumen(period, dataset, cantidad)
+        parts = [b'{"resumen":', resumen.model_dump_json().encode("utf-8")]
+        if kind == "clusters":
+            parts.append(f',"zoom":{zoom}'.encode("utf-8"))
+        parts += [f',"{kind}":'.encode("utf-8"), rows.to_json(orient="records", force_ascii=False).encode("utf-8"), b"}"]
+        return b"".join(parts)
+
+    def _viewport_resumen(self, period: TimePeriod, dataset: FirmsDataset, cantidad: int) -> ResumenResponse:
+        if cantidad == dataset.resumen.cantidad_focos:
+            return dataset.resumen
+        return dataset.resumen.model_copy(update={
+            "cantidad_focos": cantidad,
+            "mensaje": self._mensaje_rural(cantidad, period),
+        })
+
+    def stream_focos(
+        self,
+        period: TimePeriod,
+        dataset: FirmsDataset,
+        bbox: Tuple[float, float, float, float] | None,
+        output_format: OutputFormat,
+    ) -> Iterator[bytes]:
+        """Focos del período (o del bbox) como NDJSON o GeoJSON, serializados por partes."""
+        _, focos = dataset.viewport(bbox, None)
+        resumen = self._viewport_resumen(period, dataset, len(focos))
+        if output_format == OutputFormat.GEOJSON:
+            return iter_geojson(resumen, focos)
+        return iter_ndjson(resumen, focos)
+
+    def get_events_json(self, period: TimePeriod, dataset: FirmsDataset) -> bytes:
+        """Serializa los eventos de fuego precalculados del dataset."""
+        eventos = dataset.eventos
+        resumen = dataset.resumen.model_copy(update={
+            "mensaje": self._mensaje_eventos(len(eventos), dataset.resumen.cantidad_focos, period)
+        })
+        return b"".join([
+            b'{"resumen":', resumen.model_dump_json().encode("utf-8"),
+            f',"cantidad_eventos":{len(eventos)},"eventos":'.encode("utf-8"),
+            eventos.to_json(orient="records", force_ascii=False).encode("utf-8"), b"}",
+        ])
+
+    def get_density(
+        self,
+        period: TimePeriod,
+        dataset: FirmsDataset,
+        resolution: float,
+        weight: DensityWeight,
+        output_format: DensityFormat,
+    ) -> bytes:
+        """
+        Grilla de densidad de la región ya codificada (JSON compacto o PNG).
+        Se calcula una sola vez por refresco del dataset y combinación de parámetros.
+        """
+        key = (resolution, weight.value, output_format.value)
+        with firms_cache_lock:
+            body = dataset.density.get(key)
+        if body is not None:
+            return body
+
+        weights = None
+        if weight == DensityWeight.FRP:
+            weights = pd.to_numeric(dataset.focos["frp"], errors="coerce").fillna(0).to_numpy(dtype="float64")
+        grid = density_grid(dataset.focos["latitud"], dataset.focos["longitud"], weights, tuple(dataset.bbox), resolution)
+        if output_format == DensityFormat.PNG:
+            # Escala logarítmica: unos pocos incendios grandes no deben apagar el resto del mapa
+            maximum = grid.max()
+            scaled = np.log1p(grid) / np.log1p(maximum) if maximum > 0 else grid
+            indices = np.where(grid > 0, np.clip(np.ceil(scaled * 255), 1, 255), 0)
+            body = encode_png(indices, heat_palette())
+        else:
+            body = json.dumps({
+                "periodo": period.value,
+                "region": dataset.resumen.region,
+                "peso": weight.value,
+                "bbox": dataset.bbox,
+                "resolucion": resolution,
+                "filas": grid.shape[0],
+                "columnas": grid.shape[1],
+                "maximo": float(grid.max()),
+                "total": float(grid.sum()),
+                "codificacion": "float32-le-base64",
+                "datos": base64.b64encode(grid.astype("<f4").tobytes()).decode("ascii"),
+            }, ensure_ascii=False).encode("utf-8")
+        with firms_cache_lock:
+            return dataset.density.setdefault(key, body)
+
+    def get_active_fires(self, period: TimePeriod) -> APIResponse:
+        return self.get_dataset(period).to_api_response()
+
     def _mensaje_rural(self, cantidad: int, period: TimePeriod) -> str:
         if cantidad == 0:
             return f"No se detectaron focos de calor en el período seleccionado ({period.value})."
@@ -186,11 +898,17 @@ class FIRMSService:
         else:
             return f"Se detectaron {cantidad} focos de calor. Si está cerca de estos puntos, mantenga distancia y avise a un guardaparque."
 
-    def _empty_response(self, period: TimePeriod) -> APIResponse:
-        resumen = ResumenResponse(
-            cantidad_focos=0,
-            periodo=period.value,
-            fuente_datos="Satélite VIIRS",
-            mensaje=self._mensaje_rural(0, period)
-        )
-        return APIResponse(resumen=resumen, focos=[])
\ No newline at end of file
+    def _mensaje_eventos(self, eventos: int, focos: int, period: TimePeriod) -> str:
+        if eventos == 0:
+            return self._mensaje_rural(0, period)
+        elif eventos == 1:
+            return f"Los {focos} focos detectados corresponden a 1 incendio. Si está cerca, mantenga distancia y avise a un guardaparque." if focos > 1 else self._mensaje_rural(1, period)
+        else:
+            return f"Los {focos} focos detectados corresponden a {eventos} incendios distintos. Si está cerca de alguno, mantenga distancia y avise a un guardaparque."
+
+    def _fuente_datos(self, sources: List[str]) -> str:
+        # Mismo texto que antes de fusionar satélites: por instrumento, no por satélite
+        instruments = list(dict.fromkeys("MODIS" if source.startswith("MODIS") else "VIIRS" for source in sources))
+        if len(instruments) == 1:
+            return f"Satélite {instruments[0]}"
+        return f"Satélites {' y '.join(instruments)}"
@@ -0,0 +1,75 @@
+import logging
+import os
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Se incrementa cuando cambia la transformación de los focos: los archivos viejos quedan sin usar
+ARCHIVE_FORMAT_VERSION = 4
+
+class FIRMSArchive:
+    """
+    Cache persistente e inmutable para períodos cerrados (su rango de fechas ya terminó).
+    Guarda los focos transformados como Parquet comprimido; nunca expira.
+    Los archivos se escriben de forma atómica y se cargan recién en el primer acceso.
+    """
+
+    def __init__(self, data_dir: str | None = None):
+        self.data_dir = Path(data_dir or settings.FIRMS_ARCHIVE_DIR)
+        self._loaded: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, source: str, start: date, end: date) -> str:
+        return f"v{ARCHIVE_FORMAT_VERSION}_{source}_{start:%Y%m%d}_{end:%Y%m%d}"
+
+    def _path(self, key: str) -> Path:
+        return self.data_dir / f"{key}.parquet"
+
+    def load(self, source: str, start: date, end: date) -> Optional[pd.DataFrame]:
+        """Devuelve los focos archivados del rango, o None si todavía no se archivaron."""
+        key = self._key(source, start, end)
+        with self._lock:
+            if key in self._loaded:
+                return self._loaded[key]
+        path = self._path(key)
+        if not path.is_file():
+            return None
+        try:
+            focos = pd.read_parquet(path)
+            # Parquet devuelve las columnas de listas como arrays de NumPy
+            if "sensores" in focos.columns:
+                focos["sensores"] = focos["sensores"].map(list)
+        except Exception as e:
+            logger.error(f"No se pudo leer el archivo FIRMS {path}: {e}")
+            return None
+        with self._lock:
+            self._loaded[key] = focos
+        logger.info(f"Período archivado {key} cargado desde disco ({len(focos)} focos)")
+        return focos
+
+    def save(self, source: str, start: date, end: date, focos: pd.DataFrame) -> None:
+        """Escribe el Parquet en un temporal del mismo directorio y lo renombra (atómico)."""
+        key = self._key(source, start, end)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.data_dir, prefix=f".{key}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            focos.to_parquet(tmp_path, compression="zstd", index=False)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self._loaded[key] = focos
+        logger.info(f"Período {key} archivado en disco ({len(focos)} focos)")
+
+# Instancia compartida del cache persistente
+firms_archive = FIRMSArchive()
@@ -0,0 +1,112 @@
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict
+
+import httpx
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class UpstreamStats:
+    """Contadores de las descargas de una fuente (acumulados y de la última descarga)."""
+    requests: int = 0
+    errors: int = 0
+    bytes: int = 0
+    request_seconds: float = 0.0
+    rows_parsed: int = 0
+    parse_seconds: float = 0.0
+    last_fetch_at: float | None = None  # Epoch de la última descarga exitosa
+    last_latency: float | None = None
+    last_bytes: int | None = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "descargas": self.requests,
+            "errores": self.errors,
+            "ultima_descarga": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.last_fetch_at)) if self.last_fetch_at else None,
+            "ultima_latencia_ms": round(self.last_latency * 1000, 1) if self.last_latency is not None else None,
+            "latencia_promedio_ms": round(self.request_seconds / self.requests * 1000, 1) if self.requests else None,
+            "ultimos_bytes": self.last_bytes,
+            "bytes_descargados": self.bytes,
+            "filas_parseadas": self.rows_parsed,
+            "parseo_ms": round(self.parse_seconds * 1000, 1),
+        }
+
+class FIRMSClient:
+    """
+    Cliente asíncrono para la API de área de FIRMS.
+    Reutiliza un único httpx.AsyncClient (pool de conexiones keep-alive) entre llamadas,
+    con timeouts explícitos de conexión y de lectura.
+    """
+
+    def __init__(self, base_url: str | None = None):
+        self.base_url = base_url or settings.FIRMS_BASE_URL
+        self._client: httpx.AsyncClient | None = None
+        self.stats: Dict[str, UpstreamStats] = {}  # Por fuente
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Se crea al primer uso para quedar ligado al event loop que lo utiliza
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    connect=settings.FIRMS_CONNECT_TIMEOUT,
+                    read=settings.FIRMS_READ_TIMEOUT,
+                    write=settings.FIRMS_CONNECT_TIMEOUT,
+                    pool=settings.FIRMS_CONNECT_TIMEOUT,
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.FIRMS_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.FIRMS_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def fetch_csv(self, api_key: str, source: str, bbox: str, days: int, start: date) -> str:
+        """Descarga el CSV de `days` días de `source` a partir de `start` dentro de `bbox`."""
+        url = f"{self.base_url}/{api_key}/{source}/{bbox}/{days}/{start.isoformat()}"
+        stats = self.stats.setdefault(source, UpstreamStats())
+        stats.requests += 1
+        started = time.perf_counter()
+        try:
+            response = await self.client.get(url)
+        except httpx.TimeoutException as e:
+            stats.errors += 1
+            logger.error(f"Timeout consultando FIRMS ({source}, {start}, {days} días): {e}")
+            raise HTTPException(status_code=504, detail="Timeout consultando FIRMS")
+        except httpx.HTTPError as e:
+            stats.errors += 1
+            logger.error(f"Error de conexión con FIRMS ({source}, {start}, {days} días): {e}")
+            raise HTTPException(status_code=502, detail="Error consultando FIRMS")
+        finally:
+            stats.request_seconds += time.perf_counter() - started
+        if response.status_code != 200:
+            stats.errors += 1
+            raise HTTPException(status_code=502, detail="Error consultando FIRMS")
+        stats.last_fetch_at = time.time()
+        stats.last_latency = response.elapsed.total_seconds()
+        stats.last_bytes = len(response.content)
+        stats.bytes += stats.last_bytes
+        return response.text
+
+    def record_parse(self, source: str, rows: int, seconds: float) -> None:
+        """Registra el parseo del CSV descargado (se hace fuera del cliente, en el threadpool)."""
+        stats = self.stats.setdefault(source, UpstreamStats())
+        stats.rows_parsed += rows
+        stats.parse_seconds += seconds
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {source: stats.as_dict() for source, stats in self.stats.items()}
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+# Instancia compartida: un solo pool de conexiones para toda la aplicación
+firms_client = FIRMSClient()
@@ -0,0 +1,73 @@
+import time
+from typing import List, Tuple
+
+from app.services.firms import FIRMSService, firms_cache, firms_cache_lock, firms_singleflight
+from app.services.firms_client import firms_client
+from app.services.firms_poller import firms_poller
+from app.services.firms_store import firms_store
+from app.services.firms_tiles import firms_tiles
+from app.utils.metrics import Sample, format_prometheus
+
+def render_firms_metrics(service: FIRMSService) -> str:
+    """
+    Métricas de FIRMS en formato de texto de Prometheus: estado y antigüedad de cada período
+    cacheado (para alertar si el cache queda obsoleto), tiempo por fase de construcción,
+    contadores del cache y de las descargas del poller por fuente.
+    """
+    with firms_cache_lock:
+        entries = list(firms_cache.items())
+    now = time.time()
+
+    age: List[Sample] = []
+    stale: List[Sample] = []
+    rows: List[Sample] = []
+    build: List[Sample] = []
+    for period, dataset in entries:
+        labels = {"period": period.value}
+        age.append((labels, now - dataset.fetched_at))
+        stale.append((labels, int(dataset.is_stale())))
+        rows.extend(({**labels, "kind": kind}, count) for kind, count in dataset.rows.items())
+        build.extend(({**labels, "region": "", "phase": phase}, seconds) for phase, seconds in dataset.timings.items())
+        with firms_cache_lock:
+            regions = list(dataset.regions.items())
+        for region_id, view in regions:
+            build.extend(({**labels, "region": region_id, "phase": phase}, seconds) for phase, seconds in view.timings.items())
+
+    upstream = list(firms_client.stats.items())
+
+    def per_source(attribute: str) -> List[Sample]:
+        return [({"source": source}, getattr(stats, attribute)) for source, stats in upstream]
+
+    metrics: List[Tuple[str, str, str, List[Sample]]] = [
+        ("firms_cache_entries", "gauge", "Períodos en el cache de datasets", [({}, len(entries))]),
+        ("firms_cache_hits_total", "counter", "Consultas al cache con dataset", [({}, firms_cache.hits)]),
+        ("firms_cache_stale_hits_total", "counter", "Aciertos servidos obsoletos mientras se refrescaban", [({}, firms_cache.stale_hits)]),
+        ("firms_cache_misses_total", "counter", "Consultas al cache sin dataset", [({}, firms_cache.misses)]),
+        ("firms_cache_evictions_total", "counter", "Entradas descartadas del cache", [
+            ({"reason": "ttl"}, firms_cache.expirations),
+            ({"reason": "size"}, firms_cache.evictions),
+        ]),
+        ("firms_dataset_age_seconds", "gauge", "Antigüedad del dataset cacheado", age),
+        ("firms_dataset_stale", "gauge", "1 si el dataset pasó el TTL blando o llegaron datos nuevos", stale),
+        ("firms_dataset_rows", "gauge", "Filas leídas, fusionadas, rechazadas y focos del dataset", rows),
+        ("firms_dataset_build_seconds", "gauge", "Tiempo por fase de la última construcción del dataset", build),
+        ("firms_singleflight_leaders_total", "counter", "Cálculos ejecutados tras un miss", [({}, firms_singleflight.leaders)]),
+        ("firms_singleflight_coalesced_total", "counter", "Requests que esperaron un cálculo en curso", [({}, firms_singleflight.coalesced)]),
+        ("firms_tile_cache_hits_total", "counter", "Vector tiles servidos desde el LRU", [({}, firms_tiles.hits)]),
+        ("firms_tile_cache_misses_total", "counter", "Vector tiles generados", [({}, firms_tiles.misses)]),
+        ("firms_upstream_requests_total", "counter", "Descargas a la API de FIRMS", per_source("requests")),
+        ("firms_upstream_errors_total", "counter", "Descargas fallidas (timeout, conexión o estado HTTP)", per_source("errors")),
+        ("firms_upstream_request_seconds_total", "counter", "Tiempo total esperando a FIRMS", per_source("request_seconds")),
+        ("firms_upstream_last_latency_seconds", "gauge", "Latencia de la última descarga exitosa", per_source("last_latency")),
+        ("firms_upstream_last_fetch_timestamp_seconds", "gauge", "Epoch de la última descarga exitosa", per_source("last_fetch_at")),
+        ("firms_upstream_bytes_total", "counter", "Bytes descargados de FIRMS", per_source("bytes")),
+        ("firms_upstream_rows_parsed_total", "counter", "Filas de CSV parseadas", per_source("rows_parsed")),
+        ("firms_upstream_parse_seconds_total", "counter", "Tiempo total parseando CSVs", per_source("parse_seconds")),
+        ("firms_upstream_rows_rejected_total", "counter", "Filas descartadas al guardar (sin fecha o coordenadas)", [
+            ({"source": source}, count) for source, count in firms_store.rejected.items()
+        ]),
+        ("firms_poller_last_run_timestamp_seconds", "gauge", "Epoch de la última corrida del poller", [
+            ({}, firms_poller.last_run.timestamp() if firms_poller.last_run else None)
+        ]),
+    ]
+    return format_prometheus(metrics)
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import threading
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.firms import FIRMSService, invalidate_firms_cache, merge_detection_chunks
+from app.services.firms_rollups import firms_rollups
+from app.services.firms_store import firms_store
+from app.utils.date_utils import plan_windows
+
+logger = logging.getLogger(__name__)
+
+class FIRMSPoller:
+    """
+    Sincroniza de forma incremental el store local de detecciones con FIRMS.
+    Cada corrida pide solo los días posteriores a la última sincronización de cada fuente.
+    """
+
+    def __init__(self, service: FIRMSService | None = None):
+        self.service = service or FIRMSService()
+        self.last_run: datetime | None = None
+        # Días que recibieron detecciones nuevas y cuyos agregados hay que recalcular
+        self._dirty_days: set[date] = set()
+        # Las descargas de las fuentes van en paralelo pero las escrituras se serializan:
+        # SQLite admite un solo escritor y con varios a la vez falla con "database is locked"
+        self._write_lock = threading.Lock()
+
+    def _get_synced_through(self, source: str) -> date | None:
+        db = SessionLocal()
+        try:
+            # Si cambió el área descargada (se agregó una región) la fuente se vuelve a sincronizar
+            return firms_store.get_synced_through(db, source, self.service.get_fetch_bbox())
+        finally:
+            db.close()
+
+    def _save_window(self, source: str, df, synced_through: date | None) -> int:
+        """Guarda lo descargado y, si corresponde, avanza la marca de agua de la fuente."""
+        db = SessionLocal()
+        try:
+            with self._write_lock:
+                inserted = firms_store.save_detections(db, df, source)
+                if synced_through is not None:
+                    firms_store.set_synced_through(db, source, synced_through, self.service.get_fetch_bbox())
+            return inserted
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def sync_source(self, source: str, coverage_start: date, coverage_end: date) -> int:
+        """Descarga los días pendientes de `source` en ventanas paralelas y los guarda."""
+        today = datetime.utcnow().date()
+        synced_through = await asyncio.to_thread(self._get_synced_through, source)
+        if synced_through is not None and synced_through >= coverage_end and coverage_end < today:
+            return 0  # Rango cerrado y completo: no hay nada nuevo que pedir
+
+        # El último día sincronizado se vuelve a pedir: en NRT puede haber pasadas posteriores del mismo día
+        start = max(synced_through or coverage_start, coverage_start)
+        end = min(coverage_end, today)
+        windows = plan_windows(start, end, settings.FIRMS_MAX_DAY_RANGE)
+        results = await self.service.fetch_windows(source, windows)
+
+        # La marca de agua solo avanza hasta la última ventana del tramo inicial sin fallas;
+        # lo descargado después de una falla se guarda igual (el store ignora duplicados)
+        watermark = None
+        for (day, days), result in zip(windows, results):
+            if isinstance(result, Exception):
+                logger.error(f"Poller FIRMS: ventana {source} {day} ({days} días) falló: {result}")
+                break
+            watermark = day + timedelta(days=days - 1)
+        chunks = [result for result in results if not isinstance(result, Exception)]
+        merged = merge_detection_chunks(chunks)
+        # Las escrituras en la base se hacen fuera del event loop
+        inserted = await asyncio.to_thread(self._save_window, source, merged, watermark)
+        if inserted:
+            self._dirty_days.update(pd.to_datetime(merged["acq_date"], errors="coerce").dropna().dt.date.unique())
+        return inserted
+
+    def _refresh_rollups(self, days: set[date]) -> int:
+        """Recalcula los agregados de los días con datos nuevos y de los que nunca se calcularon."""
+        db = SessionLocal()
+        try:
+            days = days | set(firms_rollups.pending_days(db))
+            return firms_rollups.refresh_days(db, days) if days else 0
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def poll_once(self) -> int:
+        """Sincroniza todas las fuentes en paralelo. Devuelve la cantidad de detecciones nuevas."""
+        coverage = self.service.get_source_coverage()
+        results = await asyncio.gather(
+            *(self.sync_source(source, start, end) for source, (start, end) in coverage.items()),
+            return_exceptions=True,
+        )
+        inserted = 0
+        for source, result in zip(coverage, results):
+            if isinstance(result, Exception):
+                logger.error(f"Poller FIRMS: error sincronizando {source}: {result}", exc_info=result)
+                continue
+            inserted += result
+            logger.info(f"Poller FIRMS: {result} detecciones nuevas de {source}")
+        if inserted:
+            # Los datasets cacheados se derivan del store: quedan obsoletos al llegar datos nuevos
+            invalidate_firms_cache()
+        days, self._dirty_days = self._dirty_days, set()
+        try:
+            refreshed = await asyncio.to_thread(self._refresh_rollups, days)
+            if refreshed:
+                logger.info(f"Poller FIRMS: agregados diarios recalculados para {refreshed} días")
+        except Exception as e:
+            # Se reintentan en la próxima corrida
+            self._dirty_days |= days
+            logger.error(f"Poller FIRMS: error recalculando agregados: {e}", exc_info=True)
+        self.last_run = datetime.now()
+        return inserted
+
+    async def run_forever(self) -> None:
+        """Bucle del poller en segundo plano; se inicia desde el lifespan de la aplicación."""
+        while True:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.error(f"Poller FIRMS: corrida fallida: {e}", exc_info=True)
+            await asyncio.sleep(settings.FIRMS_POLL_INTERVAL_MINUTES * 60)
+
+# Instancia del poller para usar en el lifespan de la aplicación
+firms_poller = FIRMSPoller()
@@ -0,0 +1,58 @@
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.schemas.firms import RegionResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGIONS_PATH = Path(__file__).resolve().parent.parent / "data" / "regiones.json"
+
+class RegionRegistry:
+    """
+    Regiones consultables en /firms/ (provincias y áreas personalizadas como el Iberá).
+    El poller descarga una sola vez la unión de todos los bbox; cada región se recorta
+    después del dataset en memoria, así las provincias vecinas no generan pedidos aparte.
+    """
+
+    def __init__(self, regions: Dict[str, RegionResponse]):
+        self.regions = regions
+
+    @classmethod
+    def from_json(cls, path: str | Path) -> "RegionRegistry":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        regions = {
+            region_id: RegionResponse(id=region_id, nombre=region["nombre"], bbox=region["bbox"])
+            for region_id, region in data.items()
+        }
+        logger.info(f"Regiones FIRMS cargadas desde {path}: {', '.join(regions)}")
+        return cls(regions)
+
+    def get(self, region_id: str) -> Optional[RegionResponse]:
+        return self.regions.get(region_id)
+
+    def all(self) -> List[RegionResponse]:
+        return list(self.regions.values())
+
+    def union_bbox(self) -> Tuple[float, float, float, float]:
+        """Bbox (oeste, sur, este, norte) que cubre todas las regiones."""
+        bboxes = [region.bbox for region in self.regions.values()]
+        return (
+            min(bbox[0] for bbox in bboxes),
+            min(bbox[1] for bbox in bboxes),
+            max(bbox[2] for bbox in bboxes),
+            max(bbox[3] for bbox in bboxes),
+        )
+
+def format_bbox(bbox: Tuple[float, float, float, float]) -> str:
+    """Bbox en el formato de la API de área de FIRMS: "oeste,sur,este,norte"."""
+    return ",".join(f"{value:g}" for value in bbox)
+
+@lru_cache(maxsize=1)
+def get_regions() -> RegionRegistry:
+    """Registro de regiones, cargado una sola vez por proceso."""
+    return RegionRegistry.from_json(settings.FIRMS_REGIONS_FILE or DEFAULT_REGIONS_PATH)
@@ -0,0 +1,189 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.db.models.fire_detection import FireDetection, FirmsDailyRollup
+from app.services.firms import FIRMSService, _transform_detections, fuse_sources
+from app.services.firms_regions import get_regions
+from app.services.firms_store import firms_store
+from app.utils.geospatial import get_departments
+
+logger = logging.getLogger(__name__)
+
+# Dimensiones de los agregados; 'total' tiene una sola clave ("total") y existe para
+# todos los días calculados, aun sin focos: así se distinguen los días sin calcular
+ROLLUP_DIMENSIONS = ["total", "region", "departamento", "area_protegida"]
+TOTAL_KEY = "total"
+HIGH_CONFIDENCE = "Alta"
+
+# Días que se leen del store y se fusionan juntos al recalcular
+ROLLUP_CHUNK_DAYS = 31
+
+class FIRMSRollups:
+    """
+    Agregados diarios de focos (cantidad, FRP total y focos de alta confianza) por región,
+    departamento y área protegida, en la tabla firms_daily_rollups.
+    El poller recalcula solo los días que recibieron detecciones nuevas; /firms/stats
+    responde rangos de varios años sumando filas diarias, sin volver a leer detecciones.
+    """
+
+    def __init__(self, service: FIRMSService | None = None):
+        self.service = service or FIRMSService()
+
+    def _sources_for_day(self, day: date, coverage: Dict[str, Tuple[date, date]]) -> Tuple[str, ...]:
+        """Fuentes con las que se arma el día: las mismas que usa el período que lo cubre."""
+        for group in self.service.SOURCES.values():
+            sources = tuple(source for source in group if source in coverage and coverage[source][0] <= day <= coverage[source][1])
+            if sources:
+                return sources
+        # Días que ya salieron de todos los períodos: quedan en el store con las fuentes NRT
+        return tuple(self.service.SOURCES["recent"])
+
+    def _plan_chunks(self, days: Iterable[date]) -> List[Tuple[Tuple[str, ...], date, date, set]]:
+        """Agrupa los días en tramos de hasta ROLLUP_CHUNK_DAYS con las mismas fuentes."""
+        coverage = self.service.get_source_coverage()
+        chunks: List[Tuple[Tuple[str, ...], date, date, set]] = []
+        for day in sorted(set(days)):
+            sources = self._sources_for_day(day, coverage)
+            if chunks and chunks[-1][0] == sources and (day - chunks[-1][1]).days < ROLLUP_CHUNK_DAYS:
+                chunk_sources, chunk_start, _, chunk_days = chunks[-1]
+                chunk_days.add(day)
+                chunks[-1] = (chunk_sources, chunk_start, day, chunk_days)
+            else:
+                chunks.append((sources, day, day, {day}))
+        return chunks
+
+    def aggregate(self, focos: pd.DataFrame) -> pd.DataFrame:
+        """Agregados por día y dimensión de focos ya transformados (columnas de FocoCalorResponse)."""
+        day = focos["fecha_hora"].str[:10].to_numpy()
+        frp = focos["frp"].to_numpy(dtype="float64")
+        high = (focos["confianza"] == HIGH_CONFIDENCE).to_numpy()
+        lat = focos["latitud"].to_numpy()
+        lon = focos["longitud"].to_numpy()
+
+        parts = [("total", np.ones(len(focos), dtype=bool), np.full(len(focos), TOTAL_KEY, dtype=object))]
+        # Un foco cuenta en cada región que lo contiene (las regiones pueden superponerse)
+        for region in get_regions().all():
+            west, south, east, north = region.bbox
+            inside = (lon >= west) & (lon <= east) & (lat >= south) & (lat <= north)
+            parts.append(("region", inside, np.full(len(focos), region.id, dtype=object)))
+        departments = get_departments()
+        if departments is not None:
+            names = departments.tag(lat, lon)
+            parts.append(("departamento", pd.notna(names), names))
+        areas = focos["area_protegida"].to_numpy(dtype=object)
+        parts.append(("area_protegida", pd.notna(areas), areas))
+
+        rows = pd.concat([
+            pd.DataFrame({
+                "day": day[mask],
+                "dimension": dimension,
+                "key": keys[mask],
+                "frp": frp[mask],
+                "high": high[mask],
+            })
+            for dimension, mask, keys in parts
+        ], ignore_index=True)
+        grouped = rows.groupby(["day", "dimension", "key"], sort=False)
+        result = pd.DataFrame({
+            "count": grouped.size(),
+            "frp_sum": grouped["frp"].sum(),
+            "high_confidence_count": grouped["high"].sum(),
+        }).reset_index()
+        result["day"] = pd.to_datetime(result["day"]).dt.date
+        return result
+
+    def refresh_days(self, db: Session, days: Iterable[date]) -> int:
+        """Recalcula (reemplaza) los agregados de `days` desde el store. Devuelve los días procesados."""
+        processed = 0
+        for sources, start, end, chunk_days in self._plan_chunks(days):
+            # Se lee un día de margen a cada lado: la fusión empareja pasadas cercanas a la medianoche
+            start_dt = datetime.combine(start - timedelta(days=1), datetime.min.time())
+            end_dt = datetime.combine(end + timedelta(days=1), datetime.min.time())
+            frames = [(source, firms_store.get_detections(db, source, start_dt, end_dt)) for source in sources]
+            fused = fuse_sources(frames)
+            if fused.empty:
+                rows = pd.DataFrame(columns=["day", "dimension", "key", "count", "frp_sum", "high_confidence_count"])
+            else:
+                rows = self.aggregate(_transform_detections(fused))
+                rows = rows[rows["day"].isin(chunk_days)]
+
+            # Todos los días del tramo tienen fila 'total', aunque no hayan tenido focos
+            missing = sorted(chunk_days - set(rows.loc[rows["dimension"] == "total", "day"]))
+            if missing:
+                empty_days = pd.DataFrame({
+                    "day": missing,
+                    "dimension": "total",
+                    "key": TOTAL_KEY,
+                    "count": 0,
+                    "frp_sum": 0.0,
+                    "high_confidence_count": 0,
+                })
+                # Sin focos en el tramo no se concatena el frame vacío (pandas avisa al hacerlo)
+                rows = pd.concat([rows, empty_days], ignore_index=True) if not rows.empty else empty_days
+
+            db.execute(delete(FirmsDailyRollup).where(FirmsDailyRollup.day.in_(chunk_days)))
+            records = rows.astype({"count": int, "frp_sum": float, "high_confidence_count": int}).to_dict("records")
+            db.execute(FirmsDailyRollup.__table__.insert(), records)
+            db.commit()
+            processed += len(chunk_days)
+        return processed
+
+    def pending_days(self, db: Session) -> List[date]:
+        """Días con detecciones en el store que todavía no tienen agregados (p. ej. el primer arranque)."""
+        computed = select(FirmsDailyRollup.day).where(FirmsDailyRollup.dimension == "total")
+        query = select(FireDetection.acq_date).distinct().where(FireDetection.acq_date.not_in(computed))
+        return list(db.execute(query).scalars())
+
+    def query(
+        self,
+        db: Session,
+        start: date,
+        end: date,
+        dimension: str,
+        by_day: bool = False,
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Suma los agregados diarios del rango por clave (y por día si `by_day`).
+        Devuelve también cuántos días del rango tienen agregados calculados.
+        """
+        columns = [FirmsDailyRollup.key]
+        if by_day:
+            columns.append(FirmsDailyRollup.day)
+        query = (
+            select(
+                *columns,
+                func.sum(FirmsDailyRollup.count),
+                func.sum(FirmsDailyRollup.frp_sum),
+                func.sum(FirmsDailyRollup.high_confidence_count),
+            )
+            .where(FirmsDailyRollup.dimension == dimension)
+            .where(FirmsDailyRollup.day >= start)
+            .where(FirmsDailyRollup.day <= end)
+            .group_by(*columns)
+            .order_by(*reversed(columns))
+        )
+        rows = []
+        for row in db.execute(query):
+            rows.append({
+                "clave": row[0],
+                "dia": row[1] if by_day else None,
+                "cantidad_focos": int(row[-3]),
+                "frp_total": round(float(row[-2]), 2),
+                "focos_alta_confianza": int(row[-1]),
+            })
+        computed_days = db.execute(
+            select(func.count())
+            .where(FirmsDailyRollup.dimension == "total")
+            .where(FirmsDailyRollup.day >= start)
+            .where(FirmsDailyRollup.day <= end)
+        ).scalar()
+        return computed_days, rows
+
+# Instancia del servicio para usar en el poller y en /firms/stats
+firms_rollups = FIRMSRollups()
@@ -0,0 +1,94 @@
+from datetime import date, datetime
+from typing import Dict, Optional
+import logging
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db.models.fire_detection import FireDetection, FirmsSyncState
+from app.utils.date_utils import acquisition_timestamps
+
+logger = logging.getLogger(__name__)
+
+# Columnas del CSV de FIRMS que se guardan tal cual en la tabla local
+STORED_COLUMNS = [
+    "latitude", "longitude", "acq_date", "acq_time", "satellite", "instrument",
+    "confidence", "bright_ti4", "brightness", "frp", "daynight",
+]
+
+INSERT_CHUNK_SIZE = 1000
+
+class FIRMSStore:
+    """Acceso a las detecciones FIRMS guardadas localmente (tabla fire_detections)."""
+
+    def __init__(self):
+        self.rejected: Dict[str, int] = {}  # Filas descartadas al guardar (sin fecha o coordenadas), por fuente
+
+    def _insert_ignore(self, db: Session, table):
+        """INSERT que ignora filas duplicadas según la restricción única (SQLite o PostgreSQL)."""
+        dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+        return dialect.insert(table).on_conflict_do_nothing()
+
+    def save_detections(self, db: Session, df: pd.DataFrame, source: str) -> int:
+        """Guarda las detecciones del CSV crudo, ignorando las ya existentes. Devuelve cuántas se insertaron."""
+        if df.empty:
+            return 0
+        rows = df.reindex(columns=STORED_COLUMNS)
+        acquired_at = acquisition_timestamps(rows["acq_date"], rows["acq_time"])
+        valid = ~np.isnat(acquired_at) & rows["latitude"].notna().to_numpy() & rows["longitude"].notna().to_numpy()
+        if not valid.all():
+            self.rejected[source] = self.rejected.get(source, 0) + int((~valid).sum())
+            logger.warning(f"Se ignoraron {int((~valid).sum())} detecciones de {source} sin fecha o coordenadas válidas")
+        rows = rows[valid].copy()
+        rows["acquired_at"] = pd.to_datetime(acquired_at[valid]).to_pydatetime()
+        rows["acq_date"] = rows["acquired_at"].map(lambda value: value.date())
+        rows["acq_time"] = rows["acq_time"].astype(int)
+        rows["satellite"] = rows["satellite"].fillna(source).astype(str)
+        rows["confidence"] = rows["confidence"].map(lambda value: None if pd.isna(value) else str(value))
+        rows["source"] = source
+        records = rows.astype(object).where(rows.notna(), None).to_dict("records")
+
+        inserted = 0
+        statement = self._insert_ignore(db, FireDetection.__table__)
+        for start in range(0, len(records), INSERT_CHUNK_SIZE):
+            result = db.execute(statement, records[start:start + INSERT_CHUNK_SIZE])
+            inserted += max(result.rowcount, 0)
+        db.commit()
+        return inserted
+
+    def get_detections(self, db: Session, source: str, start: datetime, end: datetime) -> pd.DataFrame:
+        """Consulta por rango de adquisición; devuelve un DataFrame con las columnas del CSV de FIRMS."""
+        query = (
+            select(*[getattr(FireDetection, column) for column in STORED_COLUMNS])
+            .where(FireDetection.source == source)
+            .where(FireDetection.acquired_at >= start)
+            .where(FireDetection.acq_date <= end.date())
+            .order_by(FireDetection.acquired_at)
+        )
+        df = pd.read_sql(query, db.bind)
+        # MODIS guarda la confianza como porcentaje: se recupera como número
+        numeric = pd.to_numeric(df["confidence"], errors="coerce")
+        df["confidence"] = numeric.astype(object).where(numeric.notna(), df["confidence"])
+        return df
+
+    def get_synced_through(self, db: Session, source: str, bbox: str | None = None) -> Optional[date]:
+        """Último día sincronizado de la fuente; None si nunca se sincronizó o si fue para otra área."""
+        state = db.get(FirmsSyncState, source)
+        if state is None or (bbox is not None and state.bbox != bbox):
+            return None
+        return state.synced_through
+
+    def set_synced_through(self, db: Session, source: str, day: date, bbox: str | None = None) -> None:
+        state = db.get(FirmsSyncState, source)
+        if state is None:
+            db.add(FirmsSyncState(source=source, synced_through=day, bbox=bbox))
+        else:
+            state.synced_through = day
+            state.bbox = bbox
+        db.commit()
+
+# Instancia del servicio para usar en el poller y en FIRMSService
+firms_store = FIRMSStore()
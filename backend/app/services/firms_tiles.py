@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Hashable
+
+from cachetools import LRUCache
+
+from app.core.config import settings
+from app.utils.vector_tiles import encode_point_layer, project_to_tile, tile_bounds, MVT_EXTENT
+
+logger = logging.getLogger(__name__)
+
+# Atributos de cada foco que viajan en el tile
+TILE_PROPERTIES = ["confianza", "frp", "area_protegida"]
+TILE_LAYER = "focos"
+
+class FIRMSTileService:
+    """
+    Vector tiles (MVT) de los focos, generados bajo demanda desde el dataset cacheado.
+    Los tiles se guardan en un LRU con clave (período, versión de los datos, z, x, y);
+    cuando el dataset de un período se refresca cambia la versión y se descartan sus tiles.
+    """
+
+    def __init__(self, maxsize: int | None = None):
+        self.cache: LRUCache = LRUCache(maxsize=maxsize or settings.FIRMS_TILE_CACHE_SIZE)
+        self.lock = threading.Lock()  # Los tiles se generan en el threadpool
+        self._versions: Dict[Hashable, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.render_seconds = 0.0
+        self.render_max_seconds = 0.0
+
+    def _check_version(self, period: Hashable, version: str) -> None:
+        """Si el dataset del período cambió, descarta los tiles de la versión anterior."""
+        previous = self._versions.get(period)
+        if previous == version:
+            return
+        self._versions[period] = version
+        if previous is not None:
+            for key in [key for key in self.cache if key[0] == period and key[1] == previous]:
+                del self.cache[key]
+
+    def data_version(self, dataset) -> str:
+        """
+        Versión de los datos del dataset: el hash de su contenido serializado o, si no se
+        codificó (el dataset del área completa), período, momento del cálculo y cantidad de focos.
+        """
+        etag = dataset.etags.get("identity")
+        if etag is not None:
+            return etag.strip('"')
+        return f"{dataset.resumen.periodo}-{dataset.fetched_at:.6f}-{len(dataset.focos)}"
+
+    def render(self, dataset, z: int, x: int, y: int) -> bytes:
+        """Codifica los focos del dataset que caen en el tile z/x/y."""
+        focos = dataset.focos.iloc[dataset.index.query(*tile_bounds(z, x, y))]
+        tile_x, tile_y = project_to_tile(focos["latitud"].to_numpy(), focos["longitud"].to_numpy(), z, x, y)
+        # Los puntos justo sobre el borde sur/este pertenecen al tile vecino
+        inside = (tile_x >= 0) & (tile_x < MVT_EXTENT) & (tile_y >= 0) & (tile_y < MVT_EXTENT)
+        focos = focos[inside]
+        properties = {
+            column: focos[column].astype(object).where(focos[column].notna(), None).tolist()
+            for column in TILE_PROPERTIES
+        }
+        return encode_point_layer(TILE_LAYER, tile_x[inside], tile_y[inside], properties)
+
+    def get_tile(self, period: Hashable, dataset, z: int, x: int, y: int) -> bytes:
+        """Devuelve el tile desde el LRU o lo genera y lo guarda."""
+        version = self.data_version(dataset)
+        key = (period, version, z, x, y)
+        with self.lock:
+            self._check_version(period, version)
+            tile = self.cache.get(key)
+            if tile is not None:
+                self.hits += 1
+                return tile
+            self.misses += 1
+
+        start = time.perf_counter()
+        tile = self.render(dataset, z, x, y)
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.render_seconds += elapsed
+            self.render_max_seconds = max(self.render_max_seconds, elapsed)
+            if self._versions.get(period) == version:
+                self.cache[key] = tile
+        return tile
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.hits + self.misses
+        return {
+            "tiles_cacheados": len(self.cache),
+            "aciertos": self.hits,
+            "fallos": self.misses,
+            "tasa_aciertos": round(self.hits / requests, 3) if requests else None,
+            "render_promedio_ms": round(self.render_seconds / self.misses * 1000, 2) if self.misses else None,
+            "render_maximo_ms": round(self.render_max_seconds * 1000, 2),
+        }
+
+# Instancia del servicio para usar en los endpoints
+firms_tiles = FIRMSTileService()
@@ -1,17 +1,140 @@
+import asyncio
 import ee
+import hashlib
+import json
 import os
+import threading
+from contextvars import ContextVar
 from fastapi import HTTPException
 from app.core.config import settings
+from app.utils.concurrency import BoundedExecutor, ExecutorSaturated, SingleFlight
 from pathlib import Path
 import logging
-from datetime import datetime, date
-from app.schemas.external.gee import GEEHistoricalFireDay, GEEHistoricalSummary, GEEHistoricalApiResponse
+import requests
+from cachetools import TTLCache
+from datetime import datetime, date, timedelta, timezone
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from app.db.models.gee import GeeFireDay, GeeNdviComposite
+from app.db.session import SessionLocal
+from app.schemas.external.gee import GEEHistoricalApiResponse
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+NDVI_REGION = "corrientes"  # Clave de la geometría de los compuestos cacheados
+FIRE_REGION = "corrientes"  # Clave de la geometría de los conteos diarios de fuego guardados
+CORRIENTES_BBOX = [-59.8, -30.7, -55.5, -27.1]  # oeste, sur, este, norte
+CORRIENTES_GEOJSON = {
+    'type': 'Polygon',
+    'coordinates': [[
+        [CORRIENTES_BBOX[0], CORRIENTES_BBOX[1]], [CORRIENTES_BBOX[2], CORRIENTES_BBOX[1]],
+        [CORRIENTES_BBOX[2], CORRIENTES_BBOX[3]], [CORRIENTES_BBOX[0], CORRIENTES_BBOX[3]],
+        [CORRIENTES_BBOX[0], CORRIENTES_BBOX[1]],
+    ]],
+}
+NDVI_COMPOSITE_DAYS = 16  # MOD13A1: compuestos que empiezan los días 1, 17, 33, ... de cada año
+
+# Imágenes esperadas que GEE todavía no publicó, por (colección, fecha): no se vuelven a pedir en cada request
+_unpublished: TTLCache = TTLCache(maxsize=1024, ttl=settings.GEE_UNPUBLISHED_RECHECK_SECONDS)
+_unpublished_lock = threading.Lock()  # Lo usan los hilos del pool de GEE
+_fire_days_write_lock = threading.Lock()
+# Series históricas ya armadas, por (start_date, end_date); sólo se usan desde el event loop
+_fire_series_cache: TTLCache = TTLCache(maxsize=64, ttl=settings.GEE_UNPUBLISHED_RECHECK_SECONDS)
+# Cálculos en curso (series históricas, análisis NBR): un request idéntico espera el mismo en lugar de repetirlo
+gee_singleflight = SingleFlight()
+
+# Severidad por dNBR: la clase es la cantidad de umbrales que se superan
+NBR_SEVERITY_THRESHOLDS = [0.1, 0.27, 0.44, 0.66]
+NBR_SEVERITY_LABELS = [
+    'Aumento en la vegetación',
+    'Severidad baja',
+    'Severidad moderada-baja',
+    'Severidad moderada-alta',
+    'Severidad alta',
+]
+NBR_PERCENTILES = [10, 50, 90]
+NBR_SCALE = 30  # Resolución de Landsat 8, en metros
+
+# Análisis NBR ya calculados, por (geometría normalizada, fechas)
+nbr_cache: TTLCache = TTLCache(maxsize=256, ttl=settings.GEE_NBR_CACHE_SECONDS)
+
+def classify_dnbr(dnbr: float) -> int:
+    return sum(dnbr >= threshold for threshold in NBR_SEVERITY_THRESHOLDS)
+
+def _round_coordinates(value):
+    if isinstance(value, float):
+        return round(value, 6)
+    if isinstance(value, (list, tuple)):
+        return [_round_coordinates(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _round_coordinates(item) for key, item in value.items()}
+    return value
+
+def nbr_cache_key(pre_fire_date: str, post_fire_date: str, geometry: Optional[Dict[str, Any]]) -> Tuple[str, str, str]:
+    """Clave del análisis: el mismo polígono con otro orden de claves o más decimales comparte resultado."""
+    if geometry is None:
+        digest = 'corrientes'
+    else:
+        normalized = json.dumps(_round_coordinates(geometry), sort_keys=True, separators=(',', ':'))
+        digest = hashlib.sha256(normalized.encode()).hexdigest()[:16]
+    return digest, pre_fire_date, post_fire_date
+
+def _insert_ignore(db: Session, table):
+    """INSERT que ignora las filas ya existentes (misma restricción única)."""
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    return dialect.insert(table).on_conflict_do_nothing()
+
+def _to_millis(day: date) -> int:
+    """system:time_start de una imagen diaria de GEE (medianoche UTC)."""
+    return int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp() * 1000)
+
+def yearly_chunks(days: List[date]) -> List[List[date]]:
+    """Agrupa días (ordenados) por año calendario: cada grupo se calcula en GEE por separado."""
+    chunks: Dict[int, List[date]] = {}
+    for day in days:
+        chunks.setdefault(day.year, []).append(day)
+    return list(chunks.values())
+
+def ndvi_composite_dates(start: date, end: date) -> List[date]:
+    """Fechas de inicio de los compuestos MOD13A1 en [start, end). El calendario se reinicia cada año."""
+    dates = []
+    for year in range(start.year, end.year + 1):
+        first = date(year, 1, 1)
+        for offset in range(0, 366, NDVI_COMPOSITE_DAYS):
+            composite = first + timedelta(days=offset)
+            if composite.year == year and start <= composite < end:
+                dates.append(composite)
+    return dates
+
+# Plazo (segundos) de los round trips de ee del hilo actual; lo fija cada pool al crear sus hilos
+_ee_deadline = threading.local()
+
+def _set_ee_deadline(seconds: float) -> None:
+    _ee_deadline.seconds = seconds
+
+class _ThreadDeadlineHttp:
+    """
+    Transporte HTTP de ee que vence con el plazo del hilo que hace la llamada. ee.data.setDeadline
+    es uno solo para todo el proceso: con el de los trabajos, un getInfo() sincrónico que ya
+    respondió 504 seguía ocupando su hilo del pool hasta GEE_JOB_TIMEOUT.
+    """
+
+    def __init__(self):
+        self._session = requests.Session()
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=None, connection_type=None):
+        # El transporte de ee (requests con semántica de httplib2), con el plazo de este hilo
+        from ee._cloud_api_utils import _Http
+        timeout = getattr(_ee_deadline, 'seconds', settings.GEE_CALL_TIMEOUT)
+        return _Http(self._session, timeout).request(uri, method, body, headers)
+
 class GEEService:
     _initialized = False
     _corrientes_geometry = None
+    _init_lock = threading.Lock()  # Los hilos del pool pueden llegar a la vez al primer uso
 
     def __init__(self):
         pass
@@ -20,7 +143,13 @@ class GEEService:
         """Asegura que GEE esté inicializado antes de usarlo. Llama a esto al inicio de cada método que use ee."""
         if GEEService._initialized:
             return
+        with GEEService._init_lock:
+            if not GEEService._initialized:
+                self._initialize()
+                # Recién con la geometría cargada: los demás hilos leen la bandera sin el lock
+                GEEService._initialized = True
 
+    def _initialize(self):
         # Obtener credenciales de la configuración
         credentials_path = settings.GEE_CREDENTIAL_PATH
         service_account_email = settings.GEE_SERVICE_ACCOUNT_EMAIL
@@ -45,12 +174,11 @@ class GEEService:
             # Crear objeto de credenciales de cuenta de servicio
             credentials = ee.ServiceAccountCredentials(service_account_email, credentials_path)
             # Intentar inicializar GEE con las credenciales específicas
-            ee.Initialize(credentials=credentials)
+            # Cada round trip HTTP de ee vence con el plazo del pool que lo hace (ver _ThreadDeadlineHttp)
+            ee.Initialize(credentials=credentials, http_transport=_ThreadDeadlineHttp())
             logger.info("✅ Google Earth Engine inicializado correctamente con cuenta de servicio.")
-            GEEService._initialized = True
         except Exception as e: # Capturar excepción más genérica aquí puede ser útil
             logger.error(f"Error inicializando Google Earth Engine con cuenta de servicio: {str(e)}", exc_info=True)
-            GEEService._initialized = False
             # Levantar excepción o manejar como sea apropiado
             raise HTTPException(
                 status_code=503,  # Service Unavailable
@@ -60,7 +188,7 @@ class GEEService:
         # Cargar la geometría DESPUÉS de inicializar GEE exitosamente
         if GEEService._corrientes_geometry is None:
             try:
-                GEEService._corrientes_geometry = ee.Geometry.Rectangle([-59.8, -30.7, -55.5, -27.1])
+                GEEService._corrientes_geometry = ee.Geometry.Rectangle(CORRIENTES_BBOX)
                 logger.info("Geometría de Corrientes cargada.")
             except Exception as e:
                 logger.exception(f"Error cargando geometría de Corrientes: {str(e)}")
@@ -68,23 +196,73 @@ class GEEService:
 
     # Renombrado y modificado para trabajar con la región de Corrientes
     def get_regional_ndvi_stats(self, start_date: str, end_date: str):
+        """
+        NDVI medio de Corrientes por compuesto MOD13A1 en [start_date, end_date). Los compuestos
+        ya calculados se leen de la base; sólo los que faltan se piden a GEE, en un único getInfo().
+        """
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        expected = ndvi_composite_dates(start, end)
+        logger.info(f"Iniciando get_regional_ndvi_stats para Corrientes, start={start_date}, end={end_date}")
+
+        db = SessionLocal()
+        try:
+            cached = {
+                row.composite_date: row.mean_ndvi
+                for row in db.query(GeeNdviComposite).filter(
+                    GeeNdviComposite.region == NDVI_REGION,
+                    GeeNdviComposite.composite_date >= start,
+                    GeeNdviComposite.composite_date < end,
+                )
+            }
+            # Los compuestos aún no publicados se vuelven a consultar recién pasado GEE_UNPUBLISHED_RECHECK_SECONDS
+            with _unpublished_lock:
+                missing = [d for d in expected if d not in cached and ('ndvi', d) not in _unpublished]
+            if missing:
+                computed = self._compute_ndvi_composites(missing)
+                if computed:
+                    # Otro request pudo guardar los mismos compuestos en paralelo
+                    db.execute(_insert_ignore(db, GeeNdviComposite.__table__), [
+                        {'region': NDVI_REGION, 'composite_date': d, 'mean_ndvi': mean_ndvi}
+                        for d, mean_ndvi in computed.items()
+                    ])
+                    db.commit()
+                cached.update(computed)
+                with _unpublished_lock:
+                    for composite_date in missing:
+                        if composite_date not in computed:
+                            _unpublished[('ndvi', composite_date)] = True
+        finally:
+            db.close()
+
+        results = [
+            {'date': d.strftime('%Y-%m-%d'), 'mean_ndvi': cached[d]}
+            for d in sorted(cached)
+            if cached[d] is not None
+        ]
+        logger.info(f"Cálculo de NDVI regional completado. {len(results)} resultados ({len(missing)} compuestos pedidos a GEE).")
+        return results
+
+    def _compute_ndvi_composites(self, dates: List[date]) -> Dict[date, Optional[float]]:
+        """NDVI medio regional de los compuestos de `dates` que ya existen en GEE, en un solo round trip."""
         self._ensure_initialized()
         # Asegurarse que la geometría exista
         if GEEService._corrientes_geometry is None:
             raise HTTPException(status_code=500, detail="La geometría regional no está definida.")
-        logger.info(f"Iniciando get_regional_ndvi_stats para Corrientes, start={start_date}, end={end_date}")
-            
         try:
             # Usar la geometría de Corrientes definida en la instancia
             geometry = GEEService._corrientes_geometry
-            
+            millis = [_to_millis(d) for d in dates]
+
             collection = (
                 ee.ImageCollection('MODIS/061/MOD13A1') # Usar MODIS 500m (MOD13A1) o 1km (MOD13A2)
                 .filterBounds(geometry)
-                .filterDate(start_date, end_date)
+                .filterDate(min(dates).isoformat(), (max(dates) + timedelta(days=1)).isoformat())
+                # Sólo los compuestos pedidos, no los ya cacheados que caen en medio del rango
+                .filter(ee.Filter.inList('system:time_start', millis))
                 .select('NDVI')
             )
-            logger.debug("Filtrando colección MODIS NDVI para Corrientes.")
+            logger.debug(f"Calculando {len(dates)} compuestos MODIS NDVI para Corrientes.")
 
             def calculate_mean_ndvi(image):
                 # Escalar NDVI (viene como Int16, escalar a float -1 a 1)
@@ -96,22 +274,15 @@ class GEEService:
                     scale=500, # Escala espacial en metros (ajustar según MOD13A1)
                     maxPixels=1e9
                 )
-                # Añadir fecha y valor medio como propiedades
-                return image.set('mean_ndvi', stats.get('NDVI')).set('date', image.date().format('YYYY-MM-dd'))
-
-            # Mapear la función sobre la colección
-            ndvi_stats = collection.map(calculate_mean_ndvi)
-            
-            # Obtener los resultados (lista de diccionarios con fecha y ndvi medio)
-            # Usar aggregate_array para obtener los valores de las propiedades
-            dates = ndvi_stats.aggregate_array('date').getInfo()
-            mean_ndvis = ndvi_stats.aggregate_array('mean_ndvi').getInfo()
-
-            # Combinar resultados
-            results = [{'date': d, 'mean_ndvi': n} for d, n in zip(dates, mean_ndvis) if n is not None]
+                # Un Feature por compuesto: la fecha vuelve aunque la media sea nula
+                return ee.Feature(None, {'date': image.date().format('YYYY-MM-dd'), 'mean_ndvi': stats.get('NDVI')})
 
-            logger.info(f"Cálculo de NDVI regional completado. {len(results)} resultados.")
-            return results
+            # Fechas y medias juntas en un único getInfo() (antes eran dos aggregate_array)
+            features = ee.FeatureCollection(collection.map(calculate_mean_ndvi)).getInfo()['features']
+            return {
+                datetime.strptime(f['properties']['date'], '%Y-%m-%d').date(): f['properties'].get('mean_ndvi')
+                for f in features
+            }
             
         except ee.EEException as e:
              logger.exception(f"Error GEE en get_regional_ndvi_stats: {str(e)}")
@@ -127,13 +298,95 @@ class GEEService:
             )
 
     # Nueva función para datos históricos de incendios
-    def get_historical_fire_data(self, start_date: str, end_date: str) -> GEEHistoricalApiResponse:
-        """Obtiene datos históricos de focos de calor (MODIS) para Corrientes."""
+    async def get_historical_fire_data(self, start_date: str, end_date: str) -> GEEHistoricalApiResponse:
+        """
+        Obtiene datos históricos de focos de calor (MODIS) para Corrientes, sin límite de días.
+        Los conteos diarios ya calculados se leen de la base; los días que faltan se piden a GEE
+        en tramos anuales, en paralelo y cada uno en el pool con su propio plazo. Cada tramo se
+        guarda al terminar, así que un request que falla a mitad de camino no pierde lo hecho.
+        """
+        cached = _fire_series_cache.get((start_date, end_date))
+        if cached is not None:
+            return cached
+        return await gee_singleflight.do(
+            ('historical', start_date, end_date), lambda: self._build_fire_series(start_date, end_date)
+        )
+
+    async def _build_fire_series(self, start_date: str, end_date: str) -> GEEHistoricalApiResponse:
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        logger.info(f"Iniciando get_historical_fire_data para Corrientes, start={start_date}, end={end_date}")
+
+        stored = await asyncio.to_thread(self._load_fire_days, start, end)
+        # Días futuros no pueden tener imagen: no se piden
+        end = min(end, date.today() + timedelta(days=1))
+        with _unpublished_lock:
+            missing = [
+                day for day in (start + timedelta(days=i) for i in range((end - start).days))
+                if day not in stored and ('fuego', day) not in _unpublished
+            ]
+        if missing:
+            chunks = yearly_chunks(missing)
+            logger.info(f"Calculando {len(missing)} días de fuego en GEE ({len(chunks)} tramos anuales).")
+            semaphore = asyncio.Semaphore(settings.GEE_HISTORICAL_PARALLEL_CHUNKS)
+
+            async def compute(chunk: List[date]) -> Dict[date, Optional[int]]:
+                async with semaphore:
+                    counts = await run_gee(self._compute_fire_days, chunk)
+                await asyncio.to_thread(self._save_fire_days, counts)
+                with _unpublished_lock:
+                    for day in chunk:
+                        if day not in counts:
+                            _unpublished[('fuego', day)] = True
+                return counts
+
+            for counts in await asyncio.gather(*(compute(chunk) for chunk in chunks)):
+                stored.update(counts)
+
+        response = await asyncio.to_thread(self._summarize_fire_days, start_date, end_date, stored)
+        # Con todos los días guardados o pendientes de publicación, la serie sólo cambia al revisar los pendientes
+        _fire_series_cache[(start_date, end_date)] = response
+        return response
+
+    def _load_fire_days(self, start: date, end: date) -> Dict[date, Optional[int]]:
+        db = SessionLocal()
+        try:
+            return {
+                day: count
+                for day, count in db.query(GeeFireDay.day, GeeFireDay.fire_pixel_count).filter(
+                    GeeFireDay.region == FIRE_REGION,
+                    GeeFireDay.day >= start,
+                    GeeFireDay.day < end,
+                )
+            }
+        finally:
+            db.close()
+
+    def _save_fire_days(self, counts: Dict[date, Optional[int]]) -> None:
+        if not counts:
+            return
+        db = SessionLocal()
+        try:
+            # SQLite admite un solo escritor: los tramos que terminan a la vez se guardan de a uno
+            with _fire_days_write_lock:
+                db.execute(_insert_ignore(db, GeeFireDay.__table__), [
+                    {'region': FIRE_REGION, 'day': day, 'fire_pixel_count': count}
+                    for day, count in counts.items()
+                ])
+                db.commit()
+        finally:
+            db.close()
+
+    def _compute_fire_days(self, days: List[date]) -> Dict[date, Optional[int]]:
+        """
+        Píxeles de fuego por día de `days` (un tramo), en un solo getInfo(). Los días sin imagen
+        se devuelven como None si ya pasó GEE_FIRE_DAY_LAG_DAYS (no va a aparecer) y se omiten si
+        no, para volver a pedirlos más adelante.
+        """
         self._ensure_initialized()
         # Asegurarse que la geometría exista
         if GEEService._corrientes_geometry is None:
             raise HTTPException(status_code=500, detail="Geometría de Corrientes no está cargada.")
-        logger.info(f"Iniciando get_historical_fire_data para Corrientes, start={start_date}, end={end_date}")
 
         try:
             # Usar la geometría de Corrientes definida en la instancia
@@ -143,7 +396,9 @@ class GEEService:
             fire_collection = (
                 ee.ImageCollection('MODIS/061/MOD14A1') # ID Corregido
                 .filterBounds(geometry)
-                .filterDate(start_date, end_date)
+                .filterDate(min(days).isoformat(), (max(days) + timedelta(days=1)).isoformat())
+                # Sólo los días que faltan, no los ya guardados que caen dentro del tramo
+                .filter(ee.Filter.inList('system:time_start', [_to_millis(day) for day in days]))
                 .select('MaxFRP') # Usar MaxFRP como indicador de fuego
             )
 
@@ -159,75 +414,26 @@ class GEEService:
                     scale=1000,  # Escala MODIS
                     maxPixels=1e9
                 )
-                # Obtener el conteo (puede ser None si no hay píxeles)
-                count = stats.get('MaxFRP') 
-                
                 # Devolver un Feature con la fecha y el conteo
                 # Usamos ee.Feature(None, ...) para no requerir geometría
                 return ee.Feature(None, {
                     'date': image.date().format('YYYY-MM-dd'),
-                    # Devolver el numero directamente, sin unmask.
-                    # Si count es None (no hay imagen o region), esto sera manejado despues.
-                    'fire_pixel_count': count 
+                    'fire_pixel_count': stats.get('MaxFRP')
                 })
 
-            # Aplicar la función a cada imagen
-            daily_counts = fire_collection.map(count_fire_pixels)
+            # Un getInfo() por tramo anual (como máximo 366 días)
+            features = ee.FeatureCollection(fire_collection.map(count_fire_pixels)).getInfo()['features']
+            counts: Dict[date, Optional[int]] = {}
+            for feature in features:
+                properties = feature['properties']
+                # Sin píxeles enmascarados el conteo puede volver nulo: no hubo fuego
+                counts[datetime.strptime(properties['date'], '%Y-%m-%d').date()] = int(properties.get('fire_pixel_count') or 0)
 
-            # Obtener la información como una lista de diccionarios
-            # Esto sigue siendo una llamada a getInfo(), podría ser lenta para rangos muy largos
-            limit = 366 # Limitar a aprox un año de datos diarios
-            logger.info(f"Ejecutando getInfo() para obtener conteos diarios de fuego (límite: {limit})...")
-            result_list = daily_counts.limit(limit).getInfo()['features']
-
-            # Extraer solo las propiedades (diccionario)
-            fire_counts_data = [f['properties'] for f in result_list]
-            
-            # Calcular el resumen
-            total_days = len(fire_counts_data)
-            days_with_fires = 0
-            total_pixels = 0
-            max_pixels = 0
-            peak_date = None
-
-            # Crear lista de objetos GEEHistoricalFireDay
-            daily_data_list = []
-
-            for day_data in fire_counts_data:
-                count = day_data.get('fire_pixel_count', 0)
-                day_date_str = day_data.get('date')
-                
-                # Asegurar que el tipo sea correcto para el schema
-                try:
-                    validated_day = GEEHistoricalFireDay(date=day_date_str, fire_pixel_count=int(count))
-                    daily_data_list.append(validated_day)
-                except Exception as pydantic_error:
-                    logger.warning(f"Error de validación Pydantic para {day_data}: {pydantic_error}")
-                    continue # Saltar este día si no valida
-
-                # Acumular para el resumen
-                if validated_day.fire_pixel_count > 0:
-                    days_with_fires += 1
-                    total_pixels += validated_day.fire_pixel_count
-                    if validated_day.fire_pixel_count > max_pixels:
-                        max_pixels = validated_day.fire_pixel_count
-                        peak_date = validated_day.date
-            
-            # Ordenar daily_data_list por fecha (opcional pero recomendado)
-            daily_data_list.sort(key=lambda x: x.date)
-
-            summary = GEEHistoricalSummary(
-                start_date=start_date,
-                end_date=end_date,
-                total_days_analyzed=total_days,
-                days_with_fires=days_with_fires,
-                total_fire_pixels=total_pixels,
-                max_pixels_in_a_day=max_pixels,
-                peak_fire_date=peak_date
-            )
-
-            response = GEEHistoricalApiResponse(summary=summary, daily_data=daily_data_list) # Crear el objeto de respuesta
-            return response
+            settled = date.today() - timedelta(days=settings.GEE_FIRE_DAY_LAG_DAYS)
+            for day in days:
+                if day not in counts and day <= settled:
+                    counts[day] = None
+            return counts
 
         except ee.EEException as e:
             logger.exception(f"Error GEE en get_historical_fire_data: {str(e)}")
@@ -241,31 +447,61 @@ class GEEService:
                 status_code=500,
                 detail=f"Error interno al obtener datos históricos de incendios: {str(e)}"
             )
+
+    def _summarize_fire_days(self, start_date: str, end_date: str, counts: Dict[date, Optional[int]]) -> GEEHistoricalApiResponse:
+        """Resumen y serie diaria de los días con imagen (los None no cuentan como analizados)."""
+        # Diccionarios y una sola validación al final: un modelo por día tarda ~10x más en series de 20 años
+        daily_data = [
+            {'date': day.isoformat(), 'fire_pixel_count': count}
+            for day, count in sorted(counts.items())
+            if count is not None
+        ]
+        days_with_fires = 0
+        total_pixels = 0
+        max_pixels = 0
+        peak_date = None
+        for day_data in daily_data:
+            count = day_data['fire_pixel_count']
+            if count > 0:
+                days_with_fires += 1
+                total_pixels += count
+                if count > max_pixels:
+                    max_pixels = count
+                    peak_date = day_data['date']
+
+        summary = {
+            'start_date': start_date,
+            'end_date': end_date,
+            'total_days_analyzed': len(daily_data),
+            'days_with_fires': days_with_fires,
+            'total_fire_pixels': total_pixels,
+            'max_pixels_in_a_day': max_pixels,
+            'peak_fire_date': peak_date,
+        }
+        return GEEHistoricalApiResponse.model_validate({'summary': summary, 'daily_data': daily_data}) # Crear el objeto de respuesta
     
-    def calculate_nbr(self, pre_fire_date: str, post_fire_date: str, geometry: ee.Geometry = None):
+    def calculate_nbr(self, pre_fire_date: str, post_fire_date: str, geometry: Optional[Dict[str, Any]] = None):
         """
         Calcula el NBR (Normalized Burn Ratio) y dNBR (diferencial NBR) para un área determinada.
+        Todo se reduce del lado de GEE y vuelve en un único getInfo() de un ee.Dictionary:
+        cantidad de imágenes, media y percentiles del NBR pre, post y del dNBR, y superficie
+        por clase de severidad.
         
         Args:
             pre_fire_date (str): Fecha pre-incendio en formato 'YYYY-MM-dd'
             post_fire_date (str): Fecha post-incendio en formato 'YYYY-MM-dd'
-            geometry (ee.Geometry, opcional): Geometría del área de interés. Si es None, se usa la geometría de Corrientes.
+            geometry (dict, opcional): Geometría GeoJSON del área de interés. Si es None, se usa la de Corrientes.
             
         Returns:
             dict: Diccionario con los resultados del análisis NBR
         """
         self._ensure_initialized()
-        
-        # Usar la geometría proporcionada o la de Corrientes por defecto
-        if geometry is None:
-            if GEEService._corrientes_geometry is None:
-                raise HTTPException(status_code=500, detail="Geometría de Corrientes no está cargada.")
-            geometry = GEEService._corrientes_geometry
+        ee_geometry = self._to_ee_geometry(geometry)
         
         try:
             # Definir la colección de imágenes Landsat 8 Surface Reflectance
             # Nota: Podríamos hacer que el satélite sea configurable (Landsat 7, 8, 9, Sentinel-2, etc.)
-            collection = ee.ImageCollection('LANDSAT/LC08/C02/T1_L2')
+            collection = ee.ImageCollection('LANDSAT/LC08/C02/T1_L2').filterBounds(ee_geometry)
             
             # Función para calcular el NBR a partir de una imagen Landsat
             def calculate_nbr_for_image(image):
@@ -275,66 +511,45 @@ class GEEService:
                 swir2 = image.select('SR_B7').multiply(0.0000275).add(-0.2)  # Escalado a reflectancia
                 
                 # Calcular NBR = (NIR - SWIR2) / (NIR + SWIR2)
-                nbr = nir.subtract(swir2).divide(nir.add(swir2)).rename('NBR')
-                
-                # Añadir fecha como propiedad
-                return nbr.set('system:time_start', image.get('system:time_start'))
-            
-            # Obtener imágenes pre y post incendio
-            # Usamos un rango de fechas para asegurarnos de tener imágenes sin nubes
-            pre_fire_start = (datetime.strptime(pre_fire_date, '%Y-%m-%d') - datetime.timedelta(days=30)).strftime('%Y-%m-%d')
-            pre_fire_end = (datetime.strptime(pre_fire_date, '%Y-%m-%d') + datetime.timedelta(days=30)).strftime('%Y-%m-%d')
+                return nir.subtract(swir2).divide(nir.add(swir2))
             
-            post_fire_start = (datetime.strptime(post_fire_date, '%Y-%m-%d') - datetime.timedelta(days=30)).strftime('%Y-%m-%d')
-            post_fire_end = (datetime.strptime(post_fire_date, '%Y-%m-%d') + datetime.timedelta(days=30)).strftime('%Y-%m-%d')
+            # La imagen menos nublada a ±30 días de cada fecha
+            def least_cloudy(day: str):
+                center = datetime.strptime(day, '%Y-%m-%d')
+                return (collection
+                        .filterDate((center - timedelta(days=30)).strftime('%Y-%m-%d'), (center + timedelta(days=30)).strftime('%Y-%m-%d'))
+                        .sort('CLOUD_COVER')
+                        .limit(1))
             
-            # Obtener imágenes pre y post incendio
-            pre_fire_collection = (collection.filterBounds(geometry)
-                                          .filterDate(pre_fire_start, pre_fire_end)
-                                          .sort('CLOUD_COVER')
-                                          .limit(1))
-            
-            post_fire_collection = (collection.filterBounds(geometry)
-                                           .filterDate(post_fire_start, post_fire_end)
-                                           .sort('CLOUD_COVER')
-                                           .limit(1))
-            
-            # Verificar que tengamos imágenes
-            pre_fire_count = pre_fire_collection.size().getInfo()
-            post_fire_count = post_fire_collection.size().getInfo()
-            
-            if pre_fire_count == 0 or post_fire_count == 0:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"No se encontraron imágenes para las fechas especificadas. Pre-incendio: {pre_fire_count}, Post-incendio: {post_fire_count}"
-                )
-            
-            # Calcular NBR para las imágenes seleccionadas
-            pre_fire_nbr = calculate_nbr_for_image(pre_fire_collection.first())
-            post_fire_nbr = calculate_nbr_for_image(post_fire_collection.first())
+            pre_fire_collection = least_cloudy(pre_fire_date)
+            post_fire_collection = least_cloudy(post_fire_date)
             
+            pre_nbr = calculate_nbr_for_image(ee.Image(pre_fire_collection.first())).rename('pre')
+            post_nbr = calculate_nbr_for_image(ee.Image(post_fire_collection.first())).rename('post')
             # Calcular dNBR (diferencia entre NBR pre y post incendio)
-            dnbr = pre_fire_nbr.subtract(post_fire_nbr).rename('dNBR')
-            
-            # Clasificar la severidad del incendio basada en dNBR
-            severity = dnbr.remap(
-                fromList=[-float('inf'), 0.1, 0.27, 0.44, 0.66, float('inf')],
-                toList=[0, 1, 2, 3, 4],  # 0: Aumento, 1-4: Severidad baja a alta
-                defaultValue=0
-            ).rename('severity')
+            dnbr = pre_nbr.subtract(post_nbr).rename('dnbr')
+            # Clase de severidad 0-4: cuántos umbrales supera el dNBR
+            severity = ee.Image(0)
+            for threshold in NBR_SEVERITY_THRESHOLDS:
+                severity = severity.add(dnbr.gte(threshold))
             
-            # Crear un diccionario con los resultados
-            results = {
-                'pre_fire_date': pre_fire_date,
-                'post_fire_date': post_fire_date,
-                'pre_fire_nbr': pre_fire_nbr.getInfo(),
-                'post_fire_nbr': post_fire_nbr.getInfo(),
-                'dnbr': dnbr.getInfo(),
-                'severity': severity.getInfo(),
-                'geometry': geometry.getInfo() if geometry else None
-            }
-            
-            return results
+            region = {'geometry': ee_geometry, 'scale': NBR_SCALE, 'maxPixels': 1e10, 'tileScale': 4}
+            stats = pre_nbr.addBands(post_nbr).addBands(dnbr).reduceRegion(
+                reducer=ee.Reducer.mean().combine(ee.Reducer.percentile(NBR_PERCENTILES), sharedInputs=True),
+                **region
+            )
+            areas = ee.Image.pixelArea().divide(10000).addBands(severity.rename('severity')).updateMask(dnbr.mask()).reduceRegion(
+                reducer=ee.Reducer.sum().group(groupField=1, groupName='severity'),
+                **region
+            )
+            both = pre_fire_collection.size().gt(0).And(post_fire_collection.size().gt(0))
+            # Un único round trip; sin imágenes no se evalúan las reducciones
+            info = ee.Dictionary({
+                'pre_count': pre_fire_collection.size(),
+                'post_count': post_fire_collection.size(),
+                'stats': ee.Algorithms.If(both, stats, None),
+                'areas': ee.Algorithms.If(both, areas, None),
+            }).getInfo()
             
         except ee.EEException as e:
             logger.exception(f"Error GEE en calculate_nbr: {str(e)}")
@@ -347,4 +562,173 @@ class GEEService:
             raise HTTPException(
                 status_code=500,
                 detail=f"Error interno al calcular el NBR: {str(e)}"
-            )
\ No newline at end of file
+            )
+        
+        if not info.get('pre_count') or not info.get('post_count'):
+            raise HTTPException(
+                status_code=404,
+                detail=f"No se encontraron imágenes para las fechas especificadas. Pre-incendio: {info.get('pre_count')}, Post-incendio: {info.get('post_count')}"
+            )
+        stats = info.get('stats') or {}
+        if stats.get('dnbr_mean') is None:
+            raise HTTPException(status_code=404, detail="No hay píxeles válidos (sin nubes) en la geometría para las fechas especificadas.")
+        
+        def percentiles(band: str) -> Dict[str, float]:
+            return {f'p{p}': stats.get(f'{band}_p{p}') for p in NBR_PERCENTILES if stats.get(f'{band}_p{p}') is not None}
+        
+        groups = (info.get('areas') or {}).get('groups', [])
+        total_ha = sum(group['sum'] for group in groups) or 1.0
+        histogram = [
+            {
+                'severity_class': int(group['severity']),
+                'label': NBR_SEVERITY_LABELS[int(group['severity'])],
+                'area_ha': round(group['sum'], 2),
+                'percent': round(group['sum'] * 100 / total_ha, 2),
+            }
+            for group in sorted(groups, key=lambda group: group['severity'])
+        ]
+        severity_class = classify_dnbr(stats['dnbr_mean'])
+        return {
+            'pre_fire_date': pre_fire_date,
+            'post_fire_date': post_fire_date,
+            'pre_fire_nbr': stats['pre_mean'],
+            'post_fire_nbr': stats['post_mean'],
+            'dnbr': stats['dnbr_mean'],
+            'severity_class': severity_class,
+            'severity': NBR_SEVERITY_LABELS[severity_class],
+            'pre_percentiles': percentiles('pre'),
+            'post_percentiles': percentiles('post'),
+            'dnbr_percentiles': percentiles('dnbr'),
+            'severity_histogram': histogram,
+            # La geometría ya se conoce localmente: no hace falta pedírsela a GEE
+            'geometry': geometry or CORRIENTES_GEOJSON,
+        }
+
+    def _to_ee_geometry(self, geometry: Optional[Dict[str, Any]]):
+        """Geometría de ee a partir de GeoJSON (la de Corrientes si es None). Requiere GEE inicializado."""
+        if geometry is None:
+            if GEEService._corrientes_geometry is None:
+                raise HTTPException(status_code=500, detail="Geometría de Corrientes no está cargada.")
+            return GEEService._corrientes_geometry
+        try:
+            # Crear geometría de Earth Engine a partir de GeoJSON
+            if geometry['type'].lower() == 'polygon':
+                return ee.Geometry.Polygon(geometry['coordinates'])
+            if geometry['type'].lower() == 'point':
+                # Para un punto, creamos un buffer de 1km
+                point = geometry['coordinates']
+                return ee.Geometry.Point(point[0], point[1]).buffer(1000)  # 1km de radio
+            # Para otros tipos de geometría, intentamos crear un polígono delimitador
+            return ee.Geometry(geometry).bounds()
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error al procesar la geometría: {str(e)}"
+            )
+
+
+gee_service = GEEService()
+gee_executor = BoundedExecutor(
+    settings.GEE_MAX_WORKERS, settings.GEE_MAX_QUEUED, "gee",
+    initializer=_set_ee_deadline, initargs=(settings.GEE_CALL_TIMEOUT,),
+)
+# Los trabajos encolados tienen hilos y plazo propios: un trabajo largo no le quita lugar a los endpoints sincrónicos
+gee_job_executor = BoundedExecutor(
+    settings.GEE_JOB_THREADS, settings.GEE_JOB_MAX_QUEUED, "gee-jobs",
+    initializer=_set_ee_deadline, initargs=(settings.GEE_JOB_TIMEOUT,),
+)
+# Pool y plazo de las llamadas a GEE de la tarea actual (las tareas que crea lo heredan)
+_current_pool: ContextVar[Optional[Tuple[BoundedExecutor, float]]] = ContextVar("gee_pool", default=None)
+
+def use_job_pool() -> None:
+    """Las llamadas a GEE de la tarea actual van al pool de trabajos, con GEE_JOB_TIMEOUT."""
+    _current_pool.set((gee_job_executor, settings.GEE_JOB_TIMEOUT))
+
+async def run_gee(func: Callable[..., T], *args, timeout: Optional[float] = None, **kwargs) -> T:
+    """
+    Ejecuta una llamada bloqueante a Earth Engine (getInfo) en el pool dedicado, para
+    que no ocupe el event loop ni el threadpool compartido con FIRMS y auth.
+    """
+    executor, default_timeout = _current_pool.get() or (gee_executor, settings.GEE_CALL_TIMEOUT)
+    try:
+        return await executor.run(func, *args, timeout=timeout or default_timeout, **kwargs)
+    except ExecutorSaturated:
+        raise HTTPException(status_code=503, detail="Earth Engine está saturado; reintentar en unos minutos.")
+    except asyncio.TimeoutError:
+        logger.warning(f"Llamada a Earth Engine vencida: {getattr(func, '__name__', func)}")
+        raise HTTPException(status_code=504, detail="Earth Engine no respondió a tiempo.")
+
+def validate_nbr_request(pre_fire_date: str, post_fire_date: str, geometry: Optional[Dict[str, Any]]) -> None:
+    """Fechas y geometría de un análisis NBR; 400 si no sirven (antes de ocupar GEE o encolar un trabajo)."""
+    try:
+        pre_date = datetime.strptime(pre_fire_date, '%Y-%m-%d').date()
+        post_date = datetime.strptime(post_fire_date, '%Y-%m-%d').date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Formato de fecha inválido. Usar YYYY-MM-DD")
+    if pre_date >= post_date:
+        raise HTTPException(status_code=400, detail="La fecha pre-incendio debe ser anterior a la fecha post-incendio")
+    # Asegurarse de que las fechas no estén en el futuro
+    today = date.today()
+    if pre_date > today or post_date > today:
+        raise HTTPException(status_code=400, detail="Las fechas no pueden estar en el futuro")
+    # La conversión a ee ocurre en el pool; acá sólo se valida que sea un GeoJSON
+    if geometry and ('type' not in geometry or 'coordinates' not in geometry):
+        raise HTTPException(
+            status_code=400,
+            detail="Error al procesar la geometría: Formato GeoJSON inválido. Se requiere 'type' y 'coordinates'"
+        )
+
+def build_nbr_response(pre_fire_date: str, post_fire_date: str, geometry: Optional[Dict[str, Any]], results: Dict[str, Any]) -> Dict[str, Any]:
+    """Respuesta con la forma de NBRAnalysisResponse a partir del resultado de calculate_nbr."""
+    return {
+        'pre_fire_date': pre_fire_date,
+        'post_fire_date': post_fire_date,
+        'results': [
+            {
+                'date': pre_fire_date,
+                'nbr_value': results['pre_fire_nbr'],
+                'dNBR': None,
+                'severity': None,
+                'percentiles': results['pre_percentiles'],
+            },
+            {
+                'date': post_fire_date,
+                'nbr_value': results['post_fire_nbr'],
+                'dNBR': results['dnbr'],
+                'severity': results['severity'],
+                'percentiles': results['post_percentiles'],
+                'dNBR_percentiles': results['dnbr_percentiles'],
+            }
+        ],
+        'severity_histogram': results['severity_histogram'],
+        'geometry': geometry or results['geometry'],
+        'metadata': {
+            'description': 'Análisis NBR para evaluación de severidad de incendios',
+            'satellite': 'Landsat 8',
+            'processing_date': datetime.now().isoformat(),
+            'severity_scale': {str(i): label for i, label in enumerate(NBR_SEVERITY_LABELS)}
+        }
+    }
+
+async def analyze_nbr(pre_fire_date: str, post_fire_date: str, geometry: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Análisis NBR completo; con las mismas fechas y geometría sale del cache sin ocupar el pool de GEE."""
+    cache_key = nbr_cache_key(pre_fire_date, post_fire_date, geometry)
+    results = nbr_cache.get(cache_key)
+    if results is None:
+        # Los requests equivalentes que llegan mientras se calcula esperan el mismo getInfo()
+        results = await gee_singleflight.do(
+            ('nbr', *cache_key), lambda: _compute_nbr(cache_key, pre_fire_date, post_fire_date, geometry)
+        )
+    return build_nbr_response(pre_fire_date, post_fire_date, geometry, results)
+
+async def _compute_nbr(cache_key: Tuple[str, str, str], pre_fire_date: str, post_fire_date: str, geometry: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    results = await run_gee(gee_service.calculate_nbr, pre_fire_date, post_fire_date, geometry)
+    nbr_cache[cache_key] = results
+    return results
+
+async def warm_up_gee() -> None:
+    """Inicializa GEE al arrancar. Si falla, se reintenta en el primer request que lo use."""
+    try:
+        await run_gee(gee_service._ensure_initialized, timeout=settings.GEE_INIT_TIMEOUT)
+    except HTTPException as e:
+        logger.warning(f"No se pudo inicializar GEE al arrancar: {e.detail}")
@@ -0,0 +1,397 @@
+"""
+Cola persistente de trabajos de Earth Engine: los análisis largos (NBR sobre polígonos
+grandes, series NDVI o de fuego de varios años) se encolan en la tabla gee_jobs y los
+ejecutan GEE_JOB_WORKERS tareas de fondo sobre su propio pool acotado de GEE, en lugar de
+ocupar un request HTTP durante todo el cálculo. El cliente recibe el id del trabajo al
+instante y consulta (o sigue por SSE) su estado hasta que el resultado está listo.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, or_, update
+
+from app.core.config import settings
+from app.db.models.gee import GeeJob
+from app.db.session import SessionLocal
+from app.schemas.external.gee import NBRAnalysisResponse
+from app.services.gee import analyze_nbr, gee_service, nbr_cache_key, run_gee, use_job_pool
+
+logger = logging.getLogger(__name__)
+
+JOB_KINDS = ('nbr', 'ndvi', 'historical')
+PENDING, RUNNING, SUCCEEDED, FAILED = 'pending', 'running', 'succeeded', 'failed'
+FINAL_STATUSES = (SUCCEEDED, FAILED)
+JOB_MAX_ATTEMPTS = 5  # Veces que se reencola un trabajo rechazado porque el pool de GEE estaba lleno
+
+def job_dedup_key(kind: str, params: Dict[str, Any]) -> str:
+    """Clave de deduplicación: el mismo análisis con los mismos parámetros normalizados."""
+    if kind == 'nbr':
+        geometry_key, pre_fire_date, post_fire_date = nbr_cache_key(
+            params['pre_fire_date'], params['post_fire_date'], params.get('geometry')
+        )
+        return f"nbr:{geometry_key}:{pre_fire_date}:{post_fire_date}"
+    return f"{kind}:{params['start_date']}:{params['end_date']}"
+
+# Los handlers corren en los workers, que mandan sus llamadas a GEE al pool de trabajos (use_job_pool)
+async def _run_nbr(params: Dict[str, Any]) -> Any:
+    results = await analyze_nbr(params['pre_fire_date'], params['post_fire_date'], params.get('geometry'))
+    # Con los mismos campos que agrega el response_model del endpoint sincrónico
+    return NBRAnalysisResponse.model_validate(results).model_dump(mode='json')
+
+async def _run_ndvi(params: Dict[str, Any]) -> Any:
+    return await run_gee(gee_service.get_regional_ndvi_stats, params['start_date'], params['end_date'])
+
+async def _run_historical(params: Dict[str, Any]) -> Any:
+    # Cada tramo anual ya tiene su propio plazo en el pool; el trabajo sólo evita el timeout HTTP
+    response = await gee_service.get_historical_fire_data(params['start_date'], params['end_date'])
+    return response.model_dump()
+
+# Cada tipo de trabajo devuelve lo mismo que su endpoint sincrónico
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {
+    'nbr': _run_nbr,
+    'ndvi': _run_ndvi,
+    'historical': _run_historical,
+}
+
+def _job_to_dict(job: GeeJob) -> Dict[str, Any]:
+    return {
+        'job_id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'params': json.loads(job.params),
+        'attempts': job.attempts,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+        'expires_at': job.expires_at,
+        'error_status': job.error_status,
+        'error': job.error,
+    }
+
+class GEEJobQueue:
+    """
+    Cola de trabajos guardada en la base, compartida por todos los procesos que usan la misma.
+    Cada trabajo en ejecución tiene dueño (worker_id) y un lease que su worker renueva: si el
+    proceso muere, el lease vence y cualquier worker devuelve el trabajo a la cola, sin tocar
+    los que otro proceso sigue ejecutando. Un trabajo idéntico a otro pendiente, en ejecución
+    o terminado y vigente no se vuelve a encolar: se devuelve el existente.
+    """
+
+    def __init__(self, workers: int, result_ttl: int, poll_seconds: float, lease_seconds: float):
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: List[asyncio.Task] = []
+        # Primitivas de asyncio: se crean en start(), dentro del event loop que las va a usar
+        self._wakeup: Optional[asyncio.Event] = None  # Hay trabajos nuevos
+        self._changed: Optional[asyncio.Condition] = None  # Algún trabajo cambió de estado
+        self._submit_lock: Optional[asyncio.Lock] = None  # Búsqueda del duplicado e inserción, sin intercalarse
+        self._write_lock = threading.Lock()  # SQLite admite un solo escritor
+        self._last_purge = 0.0
+        self.submitted = {kind: 0 for kind in JOB_KINDS}
+        self.deduplicated = {kind: 0 for kind in JOB_KINDS}
+        self.finished = {(kind, status): 0 for kind in JOB_KINDS for status in FINAL_STATUSES}
+        self.requeued = 0
+        # Tiempo en ejecución y en cola por tipo: cantidad, suma y máximo (segundos)
+        self.runtime = {kind: [0, 0.0, 0.0] for kind in JOB_KINDS}
+        self.wait = {kind: [0, 0.0, 0.0] for kind in JOB_KINDS}
+
+    async def start(self, run_workers: bool = True) -> None:
+        """
+        Prepara la cola en el event loop actual (se llama desde el lifespan) y, con `run_workers`,
+        arranca los workers. Sin workers el proceso igual encola y consulta trabajos que
+        ejecuta otro proceso.
+        """
+        self._wakeup = asyncio.Event()
+        self._changed = asyncio.Condition()
+        self._submit_lock = asyncio.Lock()
+        if not run_workers:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._tasks:
+            # Los trabajos cortados vuelven a la cola ya, sin esperar a que venza su lease
+            released = await asyncio.to_thread(self._release_own)
+            if released:
+                logger.info(f"{released} trabajos de GEE interrumpidos vuelven a la cola.")
+        self._tasks = []
+
+    async def submit(self, kind: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Encola un análisis. Devuelve el trabajo y si es nuevo (False: se reutilizó uno idéntico)."""
+        dedup_key = job_dedup_key(kind, params)
+        self._require_started()
+        async with self._submit_lock:
+            job = await asyncio.to_thread(self._find_reusable, dedup_key)
+            if job is not None:
+                self.deduplicated[kind] += 1
+                return job, False
+            job = await asyncio.to_thread(self._insert, kind, dedup_key, params)
+        self.submitted[kind] += 1
+        self._wakeup.set()
+        return job, True
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """El trabajo, o None si no existe o su resultado ya venció."""
+        return (await asyncio.to_thread(self._load, job_id, False))[0]
+
+    async def get_result(self, job_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """El trabajo y su resultado (JSON tal como se guardó, para no volver a serializarlo)."""
+        return await asyncio.to_thread(self._load, job_id, True)
+
+    async def wait_for_change(self, timeout: float) -> None:
+        """Espera hasta que algún trabajo cambie de estado o pasen `timeout` segundos."""
+        self._require_started()
+        async with self._changed:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _require_started(self) -> None:
+        if self._submit_lock is None:
+            raise RuntimeError("La cola de trabajos de GEE no está iniciada: llamar a gee_jobs.start() en el lifespan.")
+
+    def depth(self) -> Dict[str, int]:
+        """Trabajos pendientes y en ejecución (también los de otros procesos)."""
+        db = SessionLocal()
+        try:
+            counts = dict(
+                db.query(GeeJob.status, func.count(GeeJob.id))
+                .filter(GeeJob.status.in_((PENDING, RUNNING)))
+                .group_by(GeeJob.status)
+            )
+        finally:
+            db.close()
+        return {status: counts.get(status, 0) for status in (PENDING, RUNNING)}
+
+    async def _notify(self) -> None:
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def _worker(self) -> None:
+        # Esta tarea (y las que creen los handlers) usa el pool de trabajos, no el de los endpoints
+        use_job_pool()
+        while True:
+            try:
+                if time.monotonic() - self._last_purge > self.poll_seconds:
+                    self._last_purge = time.monotonic()
+                    await asyncio.to_thread(self._purge)
+                    recovered = await asyncio.to_thread(self._recover)
+                    if recovered:
+                        logger.info(f"{recovered} trabajos de GEE con el lease vencido vuelven a la cola.")
+                self._wakeup.clear()
+                job = await asyncio.to_thread(self._claim)
+                if job is None:
+                    # Sin trabajos: se despierta con el próximo submit o revisa la cola cada poll_seconds.
+                    # asyncio.wait y no wait_for: wait_for pierde la cancelación de stop() si el evento
+                    # se activa en el mismo momento, y el worker no termina nunca
+                    wakeup = asyncio.ensure_future(self._wakeup.wait())
+                    try:
+                        await asyncio.wait({wakeup}, timeout=self.poll_seconds)
+                    finally:
+                        wakeup.cancel()
+                    continue
+                await self._execute(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Un error de la base no debe matar al worker
+                logger.exception(f"Error en el worker de trabajos de GEE: {str(e)}")
+                await asyncio.sleep(self.poll_seconds)
+
+    async def _execute(self, job: Dict[str, Any]) -> None:
+        kind = job['kind']
+        self._observe(self.wait[kind], (job['started_at'] - job['created_at']).total_seconds())
+        await self._notify()
+        logger.info(f"Ejecutando trabajo de GEE {job['job_id']} ({kind}, intento {job['attempts']}).")
+        started = time.perf_counter()
+        result = error = error_status = None
+        heartbeat = asyncio.create_task(self._heartbeat(job['job_id']))
+        try:
+            result = json.dumps(await JOB_HANDLERS[kind](job['params']))
+        except HTTPException as e:
+            if e.status_code == 503 and job['attempts'] < JOB_MAX_ATTEMPTS:
+                # Pool de GEE lleno (o GEE sin inicializar): vuelve a la cola después de una pausa
+                heartbeat.cancel()
+                await asyncio.to_thread(self._requeue, job['job_id'])
+                self.requeued += 1
+                await self._notify()
+                await asyncio.sleep(self.poll_seconds)
+                return
+            error_status, error = e.status_code, str(e.detail)
+        except Exception as e:
+            logger.exception(f"Error en el trabajo de GEE {job['job_id']}: {str(e)}")
+            error_status, error = 500, f"Error interno del análisis: {str(e)}"
+        finally:
+            heartbeat.cancel()
+        status = FAILED if error_status else SUCCEEDED
+        self._observe(self.runtime[kind], time.perf_counter() - started)
+        self.finished[(kind, status)] += 1
+        if not await asyncio.to_thread(self._finish, job['job_id'], status, result, error_status, error):
+            logger.warning(f"El trabajo de GEE {job['job_id']} perdió el lease antes de terminar; se descarta su resultado.")
+        await self._notify()
+
+    async def _heartbeat(self, job_id: str) -> None:
+        """Renueva el lease del trabajo mientras se ejecuta."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self._renew_lease, job_id)
+            except Exception as e:
+                logger.warning(f"No se pudo renovar el lease del trabajo de GEE {job_id}: {str(e)}")
+
+    @staticmethod
+    def _observe(summary: List[float], seconds: float) -> None:
+        summary[0] += 1
+        summary[1] += seconds
+        summary[2] = max(summary[2], seconds)
+
+    def _find_reusable(self, dedup_key: str) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            job = (
+                db.query(GeeJob)
+                .filter(
+                    GeeJob.dedup_key == dedup_key,
+                    or_(GeeJob.status.in_((PENDING, RUNNING)), (GeeJob.status == SUCCEEDED) & (GeeJob.expires_at > now)),
+                )
+                .order_by(GeeJob.created_at.desc())
+                .first()
+            )
+            return _job_to_dict(job) if job else None
+        finally:
+            db.close()
+
+    def _insert(self, kind: str, dedup_key: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        job = GeeJob(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            dedup_key=dedup_key,
+            params=json.dumps(params),
+            status=PENDING,
+            attempts=0,
+            created_at=datetime.utcnow(),
+        )
+        db = SessionLocal()
+        try:
+            with self._write_lock:
+                db.add(job)
+                db.commit()
+            return _job_to_dict(job)
+        finally:
+            db.close()
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Toma el trabajo pendiente más antiguo. El UPDATE condicional evita que dos workers (o procesos) tomen el mismo."""
+        db = SessionLocal()
+        try:
+            with self._write_lock:
+                while True:
+                    job_id = (
+                        db.query(GeeJob.id).filter(GeeJob.status == PENDING)
+                        .order_by(GeeJob.created_at).limit(1).scalar()
+                    )
+                    if job_id is None:
+                        return None
+                    now = datetime.utcnow()
+                    claimed = db.execute(
+                        update(GeeJob)
+                        .where(GeeJob.id == job_id, GeeJob.status == PENDING)
+                        .values(
+                            status=RUNNING, started_at=now, attempts=GeeJob.attempts + 1,
+                            worker_id=self.worker_id, lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                        )
+                    ).rowcount
+                    db.commit()
+                    if claimed:
+                        return _job_to_dict(db.get(GeeJob, job_id))
+        finally:
+            db.close()
+
+    def _owned(self, job_id: str):
+        """UPDATE del trabajo sólo si sigue en ejecución a cargo de este proceso."""
+        return update(GeeJob).where(GeeJob.id == job_id, GeeJob.status == RUNNING, GeeJob.worker_id == self.worker_id)
+
+    def _finish(self, job_id: str, status: str, result: Optional[str], error_status: Optional[int], error: Optional[str]) -> bool:
+        """Guarda el resultado. False si el trabajo ya no es de este proceso (lease vencido y retomado)."""
+        now = datetime.utcnow()
+        return bool(self._write(
+            self._owned(job_id).values(
+                status=status, result=result, error_status=error_status, error=error,
+                finished_at=now, expires_at=now + timedelta(seconds=self.result_ttl),
+                worker_id=None, lease_expires_at=None,
+            )
+        ))
+
+    def _requeue(self, job_id: str) -> None:
+        self._write(self._owned(job_id).values(status=PENDING, started_at=None, worker_id=None, lease_expires_at=None))
+
+    def _renew_lease(self, job_id: str) -> None:
+        self._write(self._owned(job_id).values(lease_expires_at=datetime.utcnow() + timedelta(seconds=self.lease_seconds)))
+
+    def _recover(self) -> int:
+        """Devuelve a la cola los trabajos en ejecución cuyo lease venció (su proceso murió), de cualquier proceso."""
+        return self._write(
+            update(GeeJob)
+            .where(GeeJob.status == RUNNING, or_(GeeJob.lease_expires_at.is_(None), GeeJob.lease_expires_at <= datetime.utcnow()))
+            .values(status=PENDING, started_at=None, worker_id=None, lease_expires_at=None)
+        )
+
+    def _release_own(self) -> int:
+        """Devuelve a la cola los trabajos en ejecución de este proceso (al detener los workers)."""
+        return self._write(
+            update(GeeJob)
+            .where(GeeJob.status == RUNNING, GeeJob.worker_id == self.worker_id)
+            .values(status=PENDING, started_at=None, worker_id=None, lease_expires_at=None)
+        )
+
+    def _purge(self) -> int:
+        db = SessionLocal()
+        try:
+            with self._write_lock:
+                deleted = db.query(GeeJob).filter(GeeJob.expires_at <= datetime.utcnow()).delete(synchronize_session=False)
+                db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def _write(self, statement) -> int:
+        db = SessionLocal()
+        try:
+            with self._write_lock:
+                rowcount = db.execute(statement).rowcount
+                db.commit()
+            return rowcount
+        finally:
+            db.close()
+
+    def _load(self, job_id: str, with_result: bool) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        db = SessionLocal()
+        try:
+            job = db.get(GeeJob, job_id)
+            if job is None or (job.expires_at is not None and job.expires_at <= datetime.utcnow()):
+                return None, None
+            return _job_to_dict(job), job.result if with_result else None
+        finally:
+            db.close()
+
+
+gee_jobs = GEEJobQueue(
+    settings.GEE_JOB_WORKERS, settings.GEE_JOB_RESULT_TTL_SECONDS, settings.GEE_JOB_POLL_SECONDS, settings.GEE_JOB_LEASE_SECONDS
+)
@@ -0,0 +1,55 @@
+from typing import Dict, List, Tuple
+
+from app.services.gee import gee_executor, gee_job_executor, gee_singleflight
+from app.services.gee_jobs import GEEJobQueue
+from app.utils.metrics import Sample, format_prometheus
+
+def render_gee_metrics(queue: GEEJobQueue) -> str:
+    """
+    Métricas de Earth Engine en formato de texto de Prometheus: profundidad de la cola de
+    trabajos (leída de la base, incluye otros procesos), trabajos por tipo y resultado,
+    tiempos en cola y en ejecución, y ocupación de los pools de llamadas bloqueantes
+    (el de los endpoints y el de los trabajos).
+    Consulta la base: llamarla fuera del event loop.
+    """
+    depth = queue.depth()
+
+    def per_kind(counters: Dict[str, int]) -> List[Sample]:
+        return [({"kind": kind}, count) for kind, count in counters.items()]
+
+    def summary(name: str, help_text: str, values: Dict[str, List[float]]) -> List[Tuple[str, str, str, List[Sample]]]:
+        return [
+            (f"{name}_count", "counter", f"{help_text}: cantidad", [({"kind": kind}, v[0]) for kind, v in values.items()]),
+            (f"{name}_sum", "counter", f"{help_text}: suma", [({"kind": kind}, v[1]) for kind, v in values.items()]),
+            (f"{name}_max", "gauge", f"{help_text}: máximo", [({"kind": kind}, v[2]) for kind, v in values.items()]),
+        ]
+
+    pools = {"sync": gee_executor.stats(), "jobs": gee_job_executor.stats()}
+
+    def per_pool(key: str) -> List[Sample]:
+        return [({"pool": pool}, stats[key]) for pool, stats in pools.items()]
+
+    metrics: List[Tuple[str, str, str, List[Sample]]] = [
+        ("gee_jobs_queue_depth", "gauge", "Trabajos pendientes y en ejecución", [
+            ({"status": status}, count) for status, count in depth.items()
+        ]),
+        ("gee_jobs_submitted_total", "counter", "Trabajos encolados", per_kind(queue.submitted)),
+        ("gee_jobs_deduplicated_total", "counter", "Envíos resueltos con un trabajo idéntico existente", per_kind(queue.deduplicated)),
+        ("gee_jobs_finished_total", "counter", "Trabajos terminados por resultado", [
+            ({"kind": kind, "status": status}, count) for (kind, status), count in queue.finished.items()
+        ]),
+        ("gee_jobs_requeued_total", "counter", "Trabajos devueltos a la cola con el pool de GEE lleno", [({}, queue.requeued)]),
+        *summary("gee_jobs_wait_seconds", "Tiempo en cola hasta que un worker toma el trabajo", queue.wait),
+        *summary("gee_jobs_runtime_seconds", "Tiempo de ejecución de los trabajos terminados", queue.runtime),
+        ("gee_singleflight_leaders_total", "counter", "Cálculos de GEE ejecutados (series históricas, NBR)", [({}, gee_singleflight.leaders)]),
+        ("gee_singleflight_coalesced_total", "counter", "Requests que esperaron un cálculo idéntico en curso", [({}, gee_singleflight.coalesced)]),
+        # sync: endpoints; jobs: trabajos encolados
+        ("gee_executor_workers", "gauge", "Hilos del pool de GEE", per_pool("hilos")),
+        ("gee_executor_pending", "gauge", "Llamadas a GEE encoladas o en ejecución", per_pool("pendientes")),
+        ("gee_executor_calls_total", "counter", "Llamadas a GEE por resultado", [
+            ({"pool": pool, "outcome": outcome}, stats[key])
+            for pool, stats in pools.items()
+            for outcome, key in (("submitted", "enviadas"), ("rejected", "rechazadas"), ("timeout", "vencidas"), ("failed", "fallidas"))
+        ]),
+    ]
+    return format_prometheus(metrics)
@@ -0,0 +1,117 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Coalescencia de requests ("single-flight"): para cada clave hay como máximo
+    una ejecución en curso y el resto de los llamadores espera su resultado.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0  # Llamadas que ejecutaron el trabajo
+        self.coalesced = 0  # Llamadas que esperaron el resultado de otra
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        return await asyncio.shield(self.start(key, func))
+
+    def start(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> asyncio.Task:
+        """Devuelve la tarea en curso para `key`, o la crea si no hay ninguna."""
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            # Se ejecuta como tarea propia: si el líder se cancela (cliente desconectado),
+            # los demás llamadores siguen recibiendo el resultado
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return task
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Evita el aviso de "exception was never retrieved"
+
+    def is_in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lideres": self.leaders,
+            "coalescidas": self.coalesced,
+            "en_curso": self.in_flight(),
+        }
+
+
+class ExecutorSaturated(Exception):
+    """No hay lugar en el pool ni en su cola de espera."""
+
+class BoundedExecutor:
+    """
+    Pool de hilos de tamaño fijo para trabajo bloqueante, con cola acotada y plazo por
+    llamada. El plazo cuenta desde que se encola: si vence, el llamador recibe
+    asyncio.TimeoutError, pero el hilo sigue ocupado hasta que la función termine,
+    así que su lugar recién se libera entonces (la cola nunca crece sin límite).
+    """
+
+    def __init__(self, max_workers: int, max_queued: int, name: str,
+                 initializer: Optional[Callable[..., None]] = None, initargs: Tuple = ()):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        # `initializer` corre una vez en cada hilo nuevo (p. ej. para fijar estado por hilo)
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name, initializer=initializer, initargs=initargs
+        )
+        self._lock = threading.Lock()
+        self.pending = 0  # Llamadas encoladas o en ejecución
+        self.submitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failed = 0
+
+    async def run(self, func: Callable[..., T], *args, timeout: float, **kwargs) -> T:
+        with self._lock:
+            if self.pending >= self.max_workers + self.max_queued:
+                self.rejected += 1
+                raise ExecutorSaturated()
+            self.pending += 1
+            self.submitted += 1
+        future = self._pool.submit(functools.partial(func, *args, **kwargs))
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        # No espera a las llamadas en curso: terminan solas al vencer su propio plazo
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hilos": self.max_workers,
+            "pendientes": self.pending,
+            "enviadas": self.submitted,
+            "rechazadas": self.rejected,
+            "vencidas": self.timeouts,
+            "fallidas": self.failed,
+        }
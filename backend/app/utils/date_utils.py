@@ -0,0 +1,35 @@
+from datetime import date, timedelta
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+def acquisition_timestamps(acq_date: pd.Series, acq_time: pd.Series) -> np.ndarray:
+    """
+    Combina acq_date (YYYY-MM-DD) y acq_time (HHMM) en un arreglo datetime64[s] (UTC).
+    Los valores inválidos quedan como NaT.
+    """
+    # Solo se parsean las fechas distintas (a lo sumo una por día del período)
+    codes, uniques = pd.factorize(acq_date)
+    days = pd.to_datetime(uniques.astype(str), format="%Y-%m-%d", errors="coerce").to_numpy(dtype="datetime64[s]")
+    days = np.append(days, np.datetime64("NaT", "s"))[codes]
+    times = pd.to_numeric(acq_time, errors="coerce").to_numpy(dtype="float64")
+    hours, minutes = np.divmod(times, 100)
+    invalid = np.isnan(times) | (hours > 23) | (minutes > 59)
+    offsets = np.where(invalid, 0, hours * 3600 + minutes * 60).astype("int64")
+    values = days + offsets.astype("timedelta64[s]")
+    values[invalid] = np.datetime64("NaT")
+    return values
+
+def plan_windows(start: date, end: date, max_days: int) -> List[Tuple[date, int]]:
+    """
+    Divide el rango [start, end] (ambos inclusive) en ventanas consecutivas de
+    a lo sumo `max_days` días. Devuelve (día inicial, cantidad de días) por ventana.
+    """
+    windows = []
+    day = start
+    while day <= end:
+        days = min(max_days, (end - day).days + 1)
+        windows.append((day, days))
+        day += timedelta(days=days)
+    return windows
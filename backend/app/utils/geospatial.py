@@ -0,0 +1,352 @@
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.geometry import shape
+from shapely.strtree import STRtree
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ProtectedAreaIndex:
+    """
+    Índice espacial (STRtree) de polígonos preparados de áreas protegidas.
+    Etiqueta lotes completos de puntos con operaciones vectorizadas: el STRtree descarta
+    las áreas fuera de la envolvente del lote y cada área candidata se evalúa con
+    `intersects_xy` solo sobre los puntos dentro de su bounding box (un punto sobre el
+    borde pertenece al área). Si un punto cae en varias áreas, gana la de menor superficie
+    (la más específica, p. ej. un parque nacional dentro de una reserva provincial).
+    """
+
+    def __init__(self, features: List[Dict[str, Any]]):
+        areas = [(shape(feature["geometry"]), feature["properties"]["nombre"]) for feature in features]
+        areas.sort(key=lambda area: area[0].area)
+        self.geometries = np.array([geometry for geometry, _ in areas], dtype=object)
+        self.names = np.array([name for _, name in areas] + [None], dtype=object)
+        shapely.prepare(self.geometries)
+        self._tree = STRtree(self.geometries)
+
+    @classmethod
+    def from_geojson(cls, path: str | Path) -> "ProtectedAreaIndex":
+        with open(path, encoding="utf-8") as f:
+            collection = json.load(f)
+        index = cls(collection["features"])
+        logger.info(f"Áreas protegidas cargadas desde {path}: {len(index.geometries)} polígonos")
+        return index
+
+    def tag(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Devuelve, para cada punto, el nombre del área protegida que lo contiene o None."""
+        lat = np.asarray(lat, dtype="float64")
+        lon = np.asarray(lon, dtype="float64")
+        # Índice de área por punto; len(names) - 1 apunta a None (sin área)
+        best = np.full(len(lat), len(self.names) - 1, dtype="int64")
+        if len(lat) == 0:
+            return self.names[best]
+        envelope = shapely.box(np.nanmin(lon), np.nanmin(lat), np.nanmax(lon), np.nanmax(lat))
+        # Las áreas están ordenadas por superficie: se recorren de mayor a menor
+        # para que la más específica sobrescriba a las que la contienen
+        for area_idx in sorted(self._tree.query(envelope), reverse=True):
+            geometry = self.geometries[area_idx]
+            min_x, min_y, max_x, max_y = geometry.bounds
+            candidates = np.flatnonzero((lon >= min_x) & (lon <= max_x) & (lat >= min_y) & (lat <= max_y))
+            inside = shapely.intersects_xy(geometry, lon[candidates], lat[candidates])
+            best[candidates[inside]] = area_idx
+        return self.names[best]
+
+    def name_at(self, lat: float, lon: float) -> Optional[str]:
+        return self.tag(np.array([lat]), np.array([lon]))[0]
+
+@lru_cache(maxsize=1)
+def get_protected_areas() -> Optional[ProtectedAreaIndex]:
+    """
+    Índice de áreas protegidas, cargado una sola vez por proceso, o None si no se configuró
+    PROTECTED_AREAS_GEOJSON: los límites oficiales no se distribuyen con el repositorio y,
+    sin ellos, los focos no se etiquetan.
+    """
+    if not settings.PROTECTED_AREAS_GEOJSON:
+        return None
+    return ProtectedAreaIndex.from_geojson(settings.PROTECTED_AREAS_GEOJSON)
+
+@lru_cache(maxsize=1)
+def get_departments() -> Optional[ProtectedAreaIndex]:
+    """
+    Índice de departamentos (mismo formato GeoJSON que las áreas protegidas), o None si
+    no se configuró FIRMS_DEPARTMENTS_GEOJSON: no se distribuye con el repositorio.
+    """
+    if not settings.FIRMS_DEPARTMENTS_GEOJSON:
+        return None
+    return ProtectedAreaIndex.from_geojson(settings.FIRMS_DEPARTMENTS_GEOJSON)
+
+class GridIndex:
+    """
+    Índice de grilla uniforme sobre puntos (lat, lon) para consultas por bbox.
+    Los puntos se ordenan por celda; una consulta busca por fila de la grilla con
+    `searchsorted` en lugar de recorrer todos los puntos.
+    """
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, cell_size: float = 0.1):
+        self.lat = np.asarray(lat, dtype="float64")
+        self.lon = np.asarray(lon, dtype="float64")
+        self.cell_size = cell_size
+        if len(self.lat) == 0:
+            self.origin_x = self.origin_y = 0.0
+            self.ncols = self.nrows = 1
+            self.order = self.keys = np.empty(0, dtype="int64")
+            return
+        self.origin_x = np.floor(self.lon.min())
+        self.origin_y = np.floor(self.lat.min())
+        cols = ((self.lon - self.origin_x) // cell_size).astype("int64")
+        rows = ((self.lat - self.origin_y) // cell_size).astype("int64")
+        self.ncols = int(cols.max()) + 1
+        self.nrows = int(rows.max()) + 1
+        keys = rows * self.ncols + cols
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+
+    def query(self, west: float, south: float, east: float, north: float) -> np.ndarray:
+        """Índices (en el orden original) de los puntos dentro del bbox."""
+        if len(self.keys) == 0:
+            return self.keys
+        col0 = max(int((west - self.origin_x) // self.cell_size), 0)
+        col1 = min(int((east - self.origin_x) // self.cell_size), self.ncols - 1)
+        row0 = max(int((south - self.origin_y) // self.cell_size), 0)
+        row1 = min(int((north - self.origin_y) // self.cell_size), self.nrows - 1)
+        if col0 > col1 or row0 > row1:
+            return np.empty(0, dtype="int64")
+        rows = np.arange(row0, row1 + 1)
+        starts = np.searchsorted(self.keys, rows * self.ncols + col0, side="left")
+        ends = np.searchsorted(self.keys, rows * self.ncols + col1, side="right")
+        candidates = np.concatenate([self.order[start:end] for start, end in zip(starts, ends)])
+        # Las celdas del borde pueden tener puntos fuera del bbox
+        inside = (
+            (self.lon[candidates] >= west) & (self.lon[candidates] <= east)
+            & (self.lat[candidates] >= south) & (self.lat[candidates] <= north)
+        )
+        return np.sort(candidates[inside])
+
+class ClusterPyramid:
+    """
+    Clusters de grilla precalculados para cada nivel de zoom del mapa (0 a max_zoom).
+    Cada nivel agrega los clusters del nivel inmediato más fino (celdas del doble de tamaño),
+    con cantidad, FRP máximo y centroide ponderado, e indexa el resultado con un GridIndex.
+    """
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, frp: np.ndarray, max_zoom: int, cells_per_tile: int = 4):
+        self.max_zoom = max_zoom
+        self.levels: Dict[int, Tuple[pd.DataFrame, GridIndex]] = {}
+        current = pd.DataFrame({
+            "latitud": np.asarray(lat, dtype="float64"),
+            "longitud": np.asarray(lon, dtype="float64"),
+            "cantidad": np.ones(len(lat), dtype="int64"),
+            "frp_max": np.asarray(frp, dtype="float64"),
+        })
+        for zoom in range(max_zoom, -1, -1):
+            cell_size = 360.0 / (2 ** zoom * cells_per_tile)
+            grouped = current.assign(
+                fila=np.floor(current["latitud"] / cell_size),
+                columna=np.floor(current["longitud"] / cell_size),
+                lat_ponderada=current["latitud"] * current["cantidad"],
+                lon_ponderada=current["longitud"] * current["cantidad"],
+            ).groupby(["fila", "columna"], sort=False).agg(
+                cantidad=("cantidad", "sum"),
+                frp_max=("frp_max", "max"),
+                lat_ponderada=("lat_ponderada", "sum"),
+                lon_ponderada=("lon_ponderada", "sum"),
+            )
+            current = pd.DataFrame({
+                "latitud": (grouped["lat_ponderada"] / grouped["cantidad"]).to_numpy(),
+                "longitud": (grouped["lon_ponderada"] / grouped["cantidad"]).to_numpy(),
+                "cantidad": grouped["cantidad"].to_numpy(),
+                "frp_max": grouped["frp_max"].to_numpy(),
+            })
+            self.levels[zoom] = (current, GridIndex(current["latitud"], current["longitud"], cell_size))
+
+    def query(self, zoom: int, bbox: Tuple[float, float, float, float] | None) -> pd.DataFrame:
+        clusters, index = self.levels[min(zoom, self.max_zoom)]
+        if bbox is None:
+            return clusters
+        # Se amplía una celda por lado: los clusters del borde tienen el centroide fuera de la vista
+        west, south, east, north = bbox
+        pad = index.cell_size
+        return clusters.iloc[index.query(west - pad, south - pad, east + pad, north + pad)]
+
+KM_PER_DEGREE = 111.32
+
+# Desplazamientos (fila, columna, tiempo) hacia la mitad "positiva" de las 26 celdas vecinas:
+# cada par de celdas adyacentes se enlaza una sola vez
+_FORWARD_NEIGHBORS = [
+    (d_row, d_col, d_time)
+    for d_row in (-1, 0, 1) for d_col in (-1, 0, 1) for d_time in (-1, 0, 1)
+    if (d_row, d_col, d_time) > (0, 0, 0)
+]
+
+def cluster_events(
+    lat: np.ndarray,
+    lon: np.ndarray,
+    hours: np.ndarray,
+    distance_km: float,
+    gap_hours: float,
+) -> np.ndarray:
+    """
+    Agrupa detecciones en eventos de fuego con un DBSCAN por grilla sobre (lat, lon, tiempo).
+    Cada detección cae en una celda de distance_km x distance_km x gap_hours; las celdas ocupadas
+    que se tocan (26-vecindad) forman un mismo evento. Todo es vectorizado y O(n): un hash por
+    celda, búsquedas ordenadas de los vecinos y propagación de etiquetas con salto de punteros.
+    Devuelve la etiqueta de evento (0..k-1) de cada detección.
+    """
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    hours = np.asarray(hours, dtype="float64")
+    if len(lat) == 0:
+        return np.empty(0, dtype="int64")
+
+    lat_step = distance_km / KM_PER_DEGREE
+    lon_step = distance_km / (KM_PER_DEGREE * np.cos(np.radians(np.nanmean(lat))))
+    rows = np.floor((lat - lat.min()) / lat_step).astype("int64") + 1
+    cols = np.floor((lon - lon.min()) / lon_step).astype("int64") + 1
+    times = np.floor((hours - hours.min()) / gap_hours).astype("int64") + 1
+    # El margen de una celda por eje evita que los vecinos de los bordes se solapen al codificar
+    n_cols, n_times = int(cols.max()) + 2, int(times.max()) + 2
+    keys = (rows * n_cols + cols) * n_times + times
+
+    cells, point_cell = np.unique(keys, return_inverse=True)
+    sources, targets = [], []
+    for d_row, d_col, d_time in _FORWARD_NEIGHBORS:
+        neighbor = cells + (d_row * n_cols + d_col) * n_times + d_time
+        position = np.minimum(np.searchsorted(cells, neighbor), len(cells) - 1)
+        found = cells[position] == neighbor
+        sources.append(np.flatnonzero(found))
+        targets.append(position[found])
+    sources = np.concatenate(sources)
+    targets = np.concatenate(targets)
+
+    # Componentes conexas: cada celda toma la menor etiqueta de sus vecinas hasta estabilizarse
+    labels = np.arange(len(cells))
+    while True:
+        previous = labels.copy()
+        np.minimum.at(labels, sources, labels[targets])
+        np.minimum.at(labels, targets, labels[sources])
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            break
+    _, event = np.unique(labels, return_inverse=True)
+    return event[point_cell]
+
+def match_nearby(
+    anchor_lat: np.ndarray,
+    anchor_lon: np.ndarray,
+    anchor_minutes: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    minutes: np.ndarray,
+    distance_km: float,
+    tolerance_minutes: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Empareja cada punto con el ancla más cercana a menos de distance_km y tolerance_minutes.
+    Usa un hash por celdas (distance_km x distance_km x tolerance_minutes): solo se comparan
+    los pares de celdas vecinas, nunca todos contra todos. El emparejamiento es uno a uno y
+    goloso sobre los pares candidatos ordenados por distancia normalizada: se toma el par más
+    cercano cuyo punto y ancla sigan libres, así un punto cuya mejor ancla ya fue tomada pasa
+    a la siguiente ancla libre dentro del radio.
+    Devuelve los índices de los puntos emparejados y de sus anclas.
+    """
+    empty = np.empty(0, dtype="int64")
+    if len(anchor_lat) == 0 or len(lat) == 0:
+        return empty, empty
+    all_lat = np.concatenate([anchor_lat, lat])
+    all_lon = np.concatenate([anchor_lon, lon])
+    all_minutes = np.concatenate([anchor_minutes, minutes])
+    cos_lat = np.cos(np.radians(np.mean(all_lat)))
+    lat_step = distance_km / KM_PER_DEGREE
+    lon_step = distance_km / (KM_PER_DEGREE * cos_lat)
+    origin = (all_lat.min(), all_lon.min(), all_minutes.min())
+    n_cols = int((all_lon.max() - origin[1]) // lon_step) + 3
+    n_times = int((all_minutes.max() - origin[2]) // tolerance_minutes) + 3
+
+    def cell_keys(lat_values, lon_values, minute_values):
+        rows = ((lat_values - origin[0]) // lat_step).astype("int64") + 1
+        cols = ((lon_values - origin[1]) // lon_step).astype("int64") + 1
+        times = ((minute_values - origin[2]) // tolerance_minutes).astype("int64") + 1
+        return (rows * n_cols + cols) * n_times + times
+
+    anchor_keys = cell_keys(anchor_lat, anchor_lon, anchor_minutes)
+    order = np.argsort(anchor_keys, kind="stable")
+    sorted_keys = anchor_keys[order]
+    # Las claves buscadas también se ordenan: searchsorted es mucho más rápido con agujas ordenadas
+    point_keys = cell_keys(lat, lon, minutes)
+    point_order = np.argsort(point_keys, kind="stable")
+    point_keys = point_keys[point_order]
+
+    points, anchors = [], []
+    for d_row in (-1, 0, 1):
+        for d_col in (-1, 0, 1):
+            for d_time in (-1, 0, 1):
+                neighbor = point_keys + (d_row * n_cols + d_col) * n_times + d_time
+                starts = np.searchsorted(sorted_keys, neighbor, side="left")
+                counts = np.searchsorted(sorted_keys, neighbor, side="right") - starts
+                total = int(counts.sum())
+                if total == 0:
+                    continue
+                # Expande cada rango [start, start + count) sin recorrerlo en Python
+                offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                points.append(np.repeat(point_order, counts))
+                anchors.append(order[np.repeat(starts, counts) + offsets])
+    if not points:
+        return empty, empty
+    points = np.concatenate(points)
+    anchors = np.concatenate(anchors)
+
+    distance = KM_PER_DEGREE * np.hypot(lat[points] - anchor_lat[anchors], (lon[points] - anchor_lon[anchors]) * cos_lat)
+    gap = np.abs(minutes[points] - anchor_minutes[anchors])
+    close = (distance <= distance_km) & (gap <= tolerance_minutes)
+    points, anchors = points[close], anchors[close]
+    score = distance[close] / distance_km + gap[close] / tolerance_minutes
+    by_score = np.argsort(score, kind="stable")
+    points, anchors = points[by_score], anchors[by_score]
+
+    # Goloso por rondas: un par que es el primero (el más cercano) tanto de su punto como de su
+    # ancla es el que tomaría el recorrido secuencial de la lista ordenada. Se toman todos esos
+    # pares a la vez, se descartan los que quedaron con un extremo ocupado y se repite. El primer
+    # par restante siempre califica, así que cada ronda avanza; en la práctica son pocas
+    matched_points, matched_anchors = [], []
+    while len(points):
+        _, point_first = np.unique(points, return_index=True)
+        _, anchor_first = np.unique(anchors, return_index=True)
+        take = np.intersect1d(point_first, anchor_first, assume_unique=True)
+        matched_points.append(points[take])
+        matched_anchors.append(anchors[take])
+        free = ~np.isin(points, points[take]) & ~np.isin(anchors, anchors[take])
+        points, anchors = points[free], anchors[free]
+    if not matched_points:
+        return empty, empty
+    return np.concatenate(matched_points), np.concatenate(matched_anchors)
+
+def density_grid(
+    lat: np.ndarray,
+    lon: np.ndarray,
+    weights: np.ndarray | None,
+    bbox: Tuple[float, float, float, float],
+    resolution: float,
+) -> np.ndarray:
+    """
+    Histograma 2D de los puntos sobre una grilla lat/lon de `resolution` grados que cubre el bbox.
+    Las filas van de norte a sur (orden de imagen) y las columnas de oeste a este.
+    """
+    west, south, east, north = bbox
+    n_rows = max(int(np.ceil(round((north - south) / resolution, 9))), 1)
+    n_cols = max(int(np.ceil(round((east - west) / resolution, 9))), 1)
+    grid, _, _ = np.histogram2d(
+        np.asarray(lat, dtype="float64"),
+        np.asarray(lon, dtype="float64"),
+        bins=(n_rows, n_cols),
+        range=((south, south + n_rows * resolution), (west, west + n_cols * resolution)),
+        weights=weights,
+    )
+    return grid[::-1]
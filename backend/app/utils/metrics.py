@@ -0,0 +1,87 @@
+import time
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+
+from cachetools import Cache, TTLCache
+
+# Muestra de una métrica: etiquetas y valor
+Sample = Tuple[Dict[str, str], float]
+# Content-Type del formato de texto de Prometheus (endpoints /metrics)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class InstrumentedTTLCache(TTLCache):
+    """
+    TTLCache que cuenta aciertos y fallos de `get` y las entradas descartadas,
+    separando las vencidas por TTL de las desalojadas por tamaño.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, **kwargs):
+        super().__init__(maxsize=maxsize, ttl=ttl, **kwargs)
+        self.hits = 0
+        self.stale_hits = 0  # Aciertos servidos obsoletos mientras se refrescan (los cuenta quien usa el cache)
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = super().get(key, self)
+        if value is self:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def expire(self, time: float | None = None):
+        before = Cache.__len__(self)
+        result = super().expire(time)
+        self.expirations += before - Cache.__len__(self)
+        return result
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "aciertos": self.hits,
+            "aciertos_obsoletos": self.stale_hits,
+            "fallos": self.misses,
+            "tasa_aciertos": round(self.hits / lookups, 3) if lookups else None,
+            "vencidas": self.expirations,
+            "desalojadas": self.evictions,
+        }
+
+class Stopwatch:
+    """Mide fases consecutivas: cada `lap` guarda el tiempo desde el lap anterior."""
+
+    def __init__(self):
+        self.laps: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def lap(self, name: str) -> float:
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self.laps[name] = self.laps.get(name, 0.0) + elapsed
+        self._last = now
+        return elapsed
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_prometheus(metrics: Iterable[Tuple[str, str, str, List[Sample]]]) -> str:
+    """
+    Formato de texto de exposición de Prometheus (0.0.4) para métricas
+    (nombre, tipo, ayuda, muestras). Las muestras con valor None se omiten.
+    """
+    lines: List[str] = []
+    for name, kind, help_text, samples in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            if value is None:
+                continue
+            label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+            # repr conserva todos los dígitos (los timestamps se truncarían con :g)
+            lines.append(f"{name}{{{label_text}}} {float(value)!r}" if label_text else f"{name} {float(value)!r}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,44 @@
+"""
+Codificación mínima de PNG (paleta de 8 bits) para las grillas de densidad de focos.
+Alcanza con zlib de la biblioteca estándar: no hace falta una dependencia de imágenes.
+"""
+import struct
+import zlib
+from typing import List, Tuple
+
+import numpy as np
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def heat_palette() -> List[Tuple[int, int, int]]:
+    """256 colores de amarillo claro a rojo oscuro; el índice 0 (sin focos) es transparente."""
+    stops = np.array([
+        [255, 255, 178],
+        [254, 204, 92],
+        [253, 141, 60],
+        [240, 59, 32],
+        [189, 0, 38],
+    ], dtype="float64")
+    positions = np.linspace(0, 1, len(stops))
+    t = np.linspace(0, 1, 256)
+    channels = [np.interp(t, positions, stops[:, channel]) for channel in range(3)]
+    return [tuple(int(round(channel[i])) for channel in channels) for i in range(256)]
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+def encode_png(indices: np.ndarray, palette: List[Tuple[int, int, int]], transparent_zero: bool = True) -> bytes:
+    """Codifica una matriz de índices de paleta (uint8, filas de arriba hacia abajo) como PNG."""
+    indices = np.ascontiguousarray(indices, dtype="uint8")
+    height, width = indices.shape
+    # Cada fila lleva un byte de filtro (0 = sin filtro) delante de los píxeles
+    raw = np.hstack([np.zeros((height, 1), dtype="uint8"), indices]).tobytes()
+    header = struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)  # 8 bits, color indexado
+    chunks = [
+        _chunk(b"IHDR", header),
+        _chunk(b"PLTE", b"".join(bytes(color) for color in palette)),
+    ]
+    if transparent_zero:
+        chunks.append(_chunk(b"tRNS", b"\x00"))  # Solo el índice 0 es transparente
+    chunks += [_chunk(b"IDAT", zlib.compress(raw, 6)), _chunk(b"IEND", b"")]
+    return PNG_SIGNATURE + b"".join(chunks)
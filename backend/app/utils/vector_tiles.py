@@ -0,0 +1,123 @@
+"""
+Codificación mínima de Mapbox Vector Tiles (especificación MVT 2.1) para capas de puntos.
+Escribe el protobuf a mano: los focos son solo puntos con unos pocos atributos,
+así que no hace falta una dependencia de geometrías completa.
+"""
+import math
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+MVT_EXTENT = 4096
+MVT_CONTENT_TYPE = "application/vnd.mapbox-vector-tile"
+
+_WIRE_VARINT = 0
+_WIRE_64BIT = 1
+_WIRE_LENGTH = 2
+
+_GEOM_POINT = 1
+_MOVE_TO_ONE = (1 & 0x7) | (1 << 3)  # Comando MoveTo con un solo punto
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+# Varints precalculados para los enteros chicos (coordenadas del tile, índices de la tabla de valores)
+_SMALL_VARINTS = [_varint(value) for value in range(1 << 14)]
+
+def _small_varint(value: int) -> bytes:
+    return _SMALL_VARINTS[value] if value < (1 << 14) else _varint(value)
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+def _length_delimited(field: int, payload: bytes) -> bytes:
+    return _key(field, _WIRE_LENGTH) + _varint(len(payload)) + payload
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+def _encode_value(value: Any) -> bytes:
+    """Mensaje Value de MVT (string_value = 1, double_value = 3, sint_value = 6, bool_value = 7)."""
+    if isinstance(value, str):
+        return _length_delimited(1, value.encode("utf-8"))
+    if isinstance(value, (bool, np.bool_)):
+        return _key(7, _WIRE_VARINT) + _varint(int(value))
+    if isinstance(value, (int, np.integer)):
+        return _key(6, _WIRE_VARINT) + _varint(_zigzag(int(value)))
+    return _key(3, _WIRE_64BIT) + np.float64(value).tobytes()
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """Bbox (oeste, sur, este, norte) en grados de un tile XYZ en Web Mercator."""
+    n = 2 ** z
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return west, south, east, north
+
+def project_to_tile(lat: np.ndarray, lon: np.ndarray, z: int, x: int, y: int, extent: int = MVT_EXTENT) -> Tuple[np.ndarray, np.ndarray]:
+    """Coordenadas enteras (0..extent) de los puntos dentro del tile, vectorizado."""
+    n = 2 ** z
+    lat_rad = np.radians(np.asarray(lat, dtype="float64"))
+    world_x = (np.asarray(lon, dtype="float64") + 180.0) / 360.0 * n
+    world_y = (1.0 - np.log(np.tan(lat_rad) + 1.0 / np.cos(lat_rad)) / np.pi) / 2.0 * n
+    tile_x = np.floor((world_x - x) * extent).astype("int64")
+    tile_y = np.floor((world_y - y) * extent).astype("int64")
+    return tile_x, tile_y
+
+def encode_point_layer(
+    name: str,
+    tile_x: np.ndarray,
+    tile_y: np.ndarray,
+    properties: Dict[str, Sequence[Any]],
+    extent: int = MVT_EXTENT,
+) -> bytes:
+    """
+    Codifica un tile con una sola capa de puntos. `properties` mapea cada atributo a
+    una secuencia alineada con los puntos; los valores None/NaN se omiten del feature.
+    """
+    keys = list(properties)
+    values: List[bytes] = []
+    # La tabla de valores se comparte entre features: se factoriza cada atributo de una vez
+    codes = []
+    for column in properties.values():
+        column_codes, uniques = pd.factorize(pd.Series(list(column), dtype=object), use_na_sentinel=True)
+        codes.append(np.where(column_codes >= 0, column_codes + len(values), -1))
+        values += [_encode_value(value) for value in uniques]
+    codes_by_feature = np.column_stack(codes).tolist() if codes else [[] for _ in range(len(tile_x))]
+
+    varint = _small_varint
+    geometry_header = _key(4, _WIRE_LENGTH)
+    point_type = _key(3, _WIRE_VARINT) + _varint(_GEOM_POINT)
+    tags_header = _key(2, _WIRE_LENGTH)
+    feature_header = _key(2, _WIRE_LENGTH)
+    move_to = varint(_MOVE_TO_ONE)
+    features = []
+    for px, py, feature_codes in zip(tile_x.tolist(), tile_y.tolist(), codes_by_feature):
+        tags = b"".join(
+            varint(key_id) + varint(value_id)
+            for key_id, value_id in enumerate(feature_codes) if value_id >= 0
+        )
+        geometry = move_to + varint(_zigzag(px)) + varint(_zigzag(py))
+        feature = b"".join([
+            tags_header, varint(len(tags)), tags,
+            point_type,
+            geometry_header, varint(len(geometry)), geometry,
+        ])
+        features += (feature_header, varint(len(feature)), feature)
+
+    layer = b"".join([
+        _key(15, _WIRE_VARINT) + _varint(2),
+        _length_delimited(1, name.encode("utf-8")),
+        *features,
+        *(_length_delimited(3, key.encode("utf-8")) for key in keys),
+        *(_length_delimited(4, value) for value in values),
+        _key(5, _WIRE_VARINT) + _varint(extent),
+    ])
+    return _length_delimited(3, layer)
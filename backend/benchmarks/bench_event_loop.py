@@ -0,0 +1,68 @@
+"""
+Muestra que una descarga lenta de FIRMS ya no bloquea el event loop: mientras el cliente
+async espera a un servidor FIRMS local con latencia, se mide la latencia de otras rutas.
+Como referencia se repite la medición con la descarga síncrona (`requests`) original.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_event_loop [latencia_upstream_segundos]
+"""
+import asyncio
+import os
+import sys
+import time
+from datetime import date
+
+from benchmarks.firms_standin import start_standin
+
+UPSTREAM_LATENCY = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+standin, base_url = start_standin(latency=UPSTREAM_LATENCY)
+
+os.environ["FIRMS_BASE_URL"] = base_url
+for _var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+    os.environ.setdefault(_var, "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+import httpx
+import requests
+
+from app.main import app
+from app.services.firms import FIRMSService
+
+async def _probe_other_route(client: httpx.AsyncClient, stop: asyncio.Event) -> list:
+    """Consulta `/` cada 20 ms y devuelve el instante en que terminó cada request."""
+    finished = [time.perf_counter()]
+    while not stop.is_set():
+        await client.get("/")
+        finished.append(time.perf_counter())
+        await asyncio.sleep(0.02)
+    finished.append(time.perf_counter())
+    return finished
+
+async def _run(fetch) -> list:
+    stop = asyncio.Event()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        probe = asyncio.create_task(_probe_other_route(client, stop))
+        await asyncio.sleep(0.1)
+        await fetch()
+        stop.set()
+        return await probe
+
+async def main():
+    service = FIRMSService()
+    start = date(2024, 1, 1)
+
+    async def async_fetch():
+        await service.fetch_window("VIIRS_SNPP_NRT", start, 10)
+
+    async def blocking_fetch():
+        requests.get(f"{base_url}/key/VIIRS_SNPP_NRT/-60,-31,-57,-26/10/{start.isoformat()}", timeout=30)
+
+    print(f"Latencia upstream simulada: {UPSTREAM_LATENCY:.1f} s")
+    for name, fetch in (("requests (bloqueante)", blocking_fetch), ("httpx async", async_fetch)):
+        finished = await _run(fetch)
+        # El mayor hueco entre respuestas es el tiempo que el loop estuvo sin atender otras rutas
+        worst_gap = max(later - earlier for earlier, later in zip(finished, finished[1:]))
+        print(f"{name:>22}: {len(finished) - 2} requests a '/', peor espera {worst_gap * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+"""
+Tiempo de descarga de un año de datos FIRMS contra un servidor local con latencia por request:
+ventanas secuenciales (como el poller original) vs. el planificador con concurrencia acotada.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_firms_chunked [latencia_por_request_segundos]
+"""
+import asyncio
+import os
+import sys
+import time
+from datetime import date
+
+from benchmarks.firms_standin import start_standin
+
+LATENCY = float(sys.argv[1]) if len(sys.argv) > 1 else 0.3
+standin, base_url = start_standin(latency=LATENCY, rows_per_day=100)
+
+os.environ["FIRMS_BASE_URL"] = base_url
+os.environ["FIRMS_MAX_CONNECTIONS"] = "16"
+for _var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+    os.environ.setdefault(_var, "benchmark")
+
+from app.core.config import settings
+from app.services.firms import FIRMSService, merge_detection_chunks
+from app.services.firms_client import firms_client
+from app.utils.date_utils import plan_windows
+
+START, END = date(2023, 1, 1), date(2023, 12, 31)
+
+async def sequential(service: FIRMSService):
+    chunks = []
+    for day, days in plan_windows(START, END, settings.FIRMS_MAX_DAY_RANGE):
+        chunks.append(await service.fetch_window("MODIS_SP", day, days))
+    return merge_detection_chunks(chunks)
+
+async def concurrent(service: FIRMSService, limit: int):
+    settings.FIRMS_MAX_CONCURRENT_WINDOWS = limit
+    return await service.fetch_range("MODIS_SP", START, END)
+
+async def main():
+    service = FIRMSService()
+    windows = len(plan_windows(START, END, settings.FIRMS_MAX_DAY_RANGE))
+    print(f"Rango {START} a {END}: {windows} ventanas, latencia {LATENCY:.2f} s por request")
+    runs = [("secuencial", lambda: sequential(service))]
+    runs += [(f"concurrente x{limit}", lambda limit=limit: concurrent(service, limit)) for limit in (4, 8, 16)]
+    for name, run in runs:
+        start = time.perf_counter()
+        df = await run()
+        print(f"{name:>16}: {time.perf_counter() - start:6.2f} s, {len(df)} detecciones")
+    await firms_client.aclose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""
+Fusión multi-satélite: VIIRS S-NPP, NOAA-20, NOAA-21 y MODIS con N detecciones por fuente.
+Cada fuente secundaria vuelve a ver una parte de los fuegos de S-NPP (posición con ruido
+y una pasada posterior) y agrega detecciones propias. Mide fuse_sources y compara los
+duplicados colapsados con los simulados.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_firms_fusion [detecciones_por_fuente]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+for _var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+    os.environ.setdefault(_var, "benchmark")
+
+from app.services.firms import fuse_sources
+from benchmarks.synthetic_firms import generate_modis, generate_viirs
+
+# Fuente, minutos de diferencia con la pasada de S-NPP, fracción de fuegos compartidos
+SECONDARY = [
+    ("VIIRS_NOAA20_NRT", 50, 0.7),
+    ("VIIRS_NOAA21_NRT", 25, 0.6),
+    ("MODIS_NRT", 15, 0.3),
+]
+
+def revisit(base: pd.DataFrame, rows: int, minutes: int, shared: float, seed: int, modis: bool) -> pd.DataFrame:
+    """Detecciones de otra fuente: una parte son los mismos fuegos de `base` un rato después."""
+    rng = np.random.default_rng(seed)
+    n_shared = int(rows * shared)
+    seen = base.sample(n=n_shared, random_state=seed).reset_index(drop=True)
+    # Ruido de ~150 m en la posición (otro píxel, otra geometría de observación)
+    seen["latitude"] = seen["latitude"] + rng.normal(0, 0.0014, n_shared)
+    seen["longitude"] = seen["longitude"] + rng.normal(0, 0.0014, n_shared)
+    acquired = pd.to_datetime(seen["acq_date"]) + pd.to_timedelta(
+        seen["acq_time"] // 100 * 60 + seen["acq_time"] % 100 + minutes, unit="m"
+    )
+    seen["acq_date"] = acquired.dt.strftime("%Y-%m-%d")
+    seen["acq_time"] = acquired.dt.hour * 100 + acquired.dt.minute
+    generator = generate_modis if modis else generate_viirs
+    own = generator(rows - n_shared, seed=seed, start=pd.Timestamp(base["acq_date"].min()).date())
+    return pd.concat([seen, own], ignore_index=True)
+
+def main(rows: int):
+    snpp = generate_viirs(rows, seed=0)
+    frames = [("VIIRS_SNPP_NRT", snpp)] + [
+        (source, revisit(snpp, rows, minutes, shared, seed, source.startswith("MODIS")))
+        for seed, (source, minutes, shared) in enumerate(SECONDARY, start=1)
+    ]
+    total = sum(len(df) for _, df in frames)
+    expected_shared = sum(int(rows * shared) for _, _, shared in SECONDARY)
+
+    start = time.perf_counter()
+    fused = fuse_sources(frames)
+    elapsed = time.perf_counter() - start
+
+    sensor_counts = fused["sensores"].map(len).value_counts().sort_index()
+    print(f"{len(frames)} fuentes x {rows} detecciones = {total} filas")
+    print(f"  fuse_sources: {elapsed * 1000:9.1f} ms -> {len(fused)} focos ({total - len(fused)} duplicados entre sensores, {expected_shared} simulados)")
+    for count, focos in sensor_counts.items():
+        print(f"    {focos:7d} focos vistos por {count} sensor(es)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
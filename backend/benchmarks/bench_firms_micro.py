@@ -0,0 +1,139 @@
+"""
+Microbenchmarks de las etapas de /firms/ sobre CSVs sintéticos VIIRS y MODIS de 1k a 1M filas:
+
+    parseo          pd.read_csv del CSV de la API de área
+    helpers         _map_confidence, _combine_datetime y _kelvin_to_celsius fila por fila
+    transformacion  _transform_detections (versión vectorizada de los helpers)
+    validacion      un FocoCalorResponse validado por fila (el camino original)
+    construccion    FirmsDataset.to_api_response (model_construct por columnas, sin validar)
+    json            FirmsDataset.to_json (cuerpo completo de /firms/)
+    ndjson          iter_ndjson (respuesta por partes)
+
+Cada caso se repite y se toma el mejor tiempo. Los casos fila por fila (helpers y
+validacion) se limitan a --max-fila-a-fila filas para que la corrida termine en minutos.
+Con --save se guarda la corrida como línea base (JSON); con --baseline se compara contra
+ella y el proceso termina con código 1 si algún caso es más lento que --tolerance.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_firms_micro [--sizes 1000 10000 100000 1000000]
+        [--only json] [--save base.json] [--baseline base.json] [--tolerance 0.3]
+
+tests/bench_firms_micro.py corre los mismos casos con pytest contra la línea base de
+tests/baselines/firms_micro.json (se excluye con -m "not benchmark").
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from io import StringIO
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+for _var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+    os.environ.setdefault(_var, "benchmark")
+
+from app.schemas.responses import FocoCalorResponse, ResumenResponse
+from app.services.firms import (
+    FirmsDataset,
+    _combine_datetime,
+    _kelvin_to_celsius,
+    _map_confidence,
+    _transform_detections,
+    iter_ndjson,
+)
+from benchmarks.synthetic_firms import generate_modis, generate_viirs, to_csv
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+GENERATORS = {"viirs": generate_viirs, "modis": generate_modis}
+
+def _resumen(cantidad: int) -> ResumenResponse:
+    return ResumenResponse(cantidad_focos=cantidad, periodo="current", fuente_datos="Satélite VIIRS", mensaje="-")
+
+def scalar_helpers(raw: pd.DataFrame) -> None:
+    """Los helpers escalares aplicados fila por fila, como en el camino original."""
+    temperature = "bright_ti4" if "bright_ti4" in raw.columns else "brightness"
+    for confidence, acq_date, acq_time, kelvin in zip(raw["confidence"], raw["acq_date"], raw["acq_time"], raw[temperature]):
+        _map_confidence(confidence)
+        _combine_datetime(acq_date, acq_time)
+        _kelvin_to_celsius(kelvin)
+
+def validate_rows(focos: pd.DataFrame) -> None:
+    """Un FocoCalorResponse validado por foco."""
+    for record in focos.replace({float("nan"): None}).to_dict("records"):
+        FocoCalorResponse(**record)
+
+def cases(text: str, raw: pd.DataFrame, focos: pd.DataFrame) -> Dict[str, Callable[[], object]]:
+    dataset = FirmsDataset(resumen=_resumen(len(focos)), focos=focos)
+    return {
+        "parseo": lambda: pd.read_csv(StringIO(text)),
+        "helpers": lambda: scalar_helpers(raw),
+        "transformacion": lambda: _transform_detections(raw),
+        "validacion": lambda: validate_rows(focos),
+        "construccion": lambda: dataset.to_api_response(),
+        "json": lambda: dataset.to_json(),
+        "ndjson": lambda: sum(len(part) for part in iter_ndjson(dataset.resumen, focos)),
+    }
+
+def best_time(func: Callable[[], object], rows: int) -> float:
+    """Mejor de varias repeticiones (más repeticiones en los tamaños chicos)."""
+    repeats = max(1, min(7, 100_000 // rows))
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(sizes: List[int], max_row_by_row: int, only: str | None) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'caso':32s} {'ms':>10s} {'ns/fila':>10s}")
+    for instrument, generator in GENERATORS.items():
+        for rows in sizes:
+            raw_generated = generator(rows, seed=rows)
+            text = to_csv(raw_generated)
+            raw = pd.read_csv(StringIO(text))  # Los mismos tipos que devuelve el cliente
+            focos = _transform_detections(raw)
+            for case, func in cases(text, raw, focos).items():
+                name = f"{instrument}/{case}/{rows}"
+                if only and only not in name:
+                    continue
+                if case in ("helpers", "validacion") and rows > max_row_by_row:
+                    continue
+                elapsed = best_time(func, rows)
+                results[name] = {"ms": round(elapsed * 1000, 3), "ns_por_fila": round(elapsed / rows * 1e9, 1)}
+                print(f"{name:32s} {elapsed * 1000:10.2f} {elapsed / rows * 1e9:10.1f}")
+    return results
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """Casos más lentos que la línea base por encima de la tolerancia."""
+    return [
+        f"{name}: {baseline[name]['ms']} -> {result['ms']} ms"
+        for name, result in results.items()
+        if name in baseline and result["ms"] > baseline[name]["ms"] * (1 + tolerance)
+    ]
+
+def main(args) -> int:
+    results = run(args.sizes, args.max_fila_a_fila, args.only)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Línea base guardada en {args.save}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESIÓN {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks de las etapas de /firms/")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--max-fila-a-fila", type=int, default=100_000, help="Tope de filas de los casos fila por fila")
+    parser.add_argument("--only", help="Corre solo los casos que contienen este texto (p. ej. viirs/json)")
+    parser.add_argument("--save", help="Guarda los resultados como línea base (JSON)")
+    parser.add_argument("--baseline", help="Compara contra una línea base y falla si hay regresiones")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Empeoramiento tolerado (fracción)")
+    sys.exit(main(parser.parse_args()))
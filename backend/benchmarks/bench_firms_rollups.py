@@ -0,0 +1,81 @@
+"""
+Estadísticas de varios años: agregados diarios (firms_daily_rollups) vs. recalcular desde
+las detecciones. Carga N detecciones sintéticas por año en un store SQLite temporal,
+calcula los agregados como lo hace el poller y compara /firms/stats agrupado por región
+y por área protegida (total del rango y serie diaria) con leer, fusionar y agrupar las
+detecciones crudas del mismo rango. Las áreas protegidas son 20 polígonos sintéticos.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_firms_rollups [detecciones_por_año] [años]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+from benchmarks.synthetic_firms import generate_viirs, synthetic_areas
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}"
+_areas = os.path.join(_tmp.name, "areas_protegidas.geojson")
+with open(_areas, "w", encoding="utf-8") as f:
+    json.dump({"type": "FeatureCollection", "features": synthetic_areas(20)}, f)
+os.environ["PROTECTED_AREAS_GEOJSON"] = _areas
+for _var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+    os.environ.setdefault(_var, "benchmark")
+
+import app.db.models  # noqa: F401  (registra las tablas en Base.metadata)
+from app.db.base_class import Base
+from app.db.session import SessionLocal, engine
+from app.services.firms import _transform_detections, fuse_sources
+from app.services.firms_rollups import firms_rollups
+from app.services.firms_store import firms_store
+
+SOURCE = "VIIRS_SNPP_NRT"
+
+def raw_scan(db, start: date, end: date):
+    """Lo que había que hacer sin agregados: leer todas las detecciones del rango y agrupar."""
+    frames = [(SOURCE, firms_store.get_detections(db, SOURCE, datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time())))]
+    return firms_rollups.aggregate(_transform_detections(fuse_sources(frames)))
+
+def _time_ms(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main(rows_per_year: int, years: int):
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    first_year = 2024 - years + 1
+    start_day, end_day = date(first_year, 1, 1), date(2024, 12, 31)
+
+    start = time.perf_counter()
+    for seed, year in enumerate(range(first_year, 2025)):
+        firms_store.save_detections(db, generate_viirs(rows_per_year, seed=seed, start=date(year, 1, 1)), SOURCE)
+    print(f"{rows_per_year * years} detecciones ({years} años) guardadas en {time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    days = firms_rollups.refresh_days(db, firms_rollups.pending_days(db))
+    print(f"  agregados iniciales: {days} días en {time.perf_counter() - start:.1f} s")
+    start = time.perf_counter()
+    firms_rollups.refresh_days(db, [date(2024, 6, 1)])
+    print(f"  recalcular un día (corrida del poller): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for group in ("region", "area_protegida"):
+        for by_day in (False, True):
+            computed, rows = firms_rollups.query(db, start_day, end_day, group, by_day)
+            elapsed = _time_ms(lambda: firms_rollups.query(db, start_day, end_day, group, by_day))
+            label = f"{group}{' por día' if by_day else ''}"
+            print(f"  stats {label:22s} {elapsed:8.2f} ms ({len(rows)} filas, {computed} días)")
+    elapsed = _time_ms(lambda: raw_scan(db, start_day, end_day), repeat=1)
+    print(f"  recalculando desde detecciones: {elapsed:8.1f} ms")
+    db.close()
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [100_000, 3][len(args):]))
@@ -0,0 +1,76 @@
+"""
+Memoria pico al serializar un año de focos: respuesta armada en memoria vs. envío por partes.
+Cada modo corre en un proceso propio que solo carga los focos ya transformados (Parquet),
+así el pico de RSS medido corresponde a la serialización (+0 MB: la serialización
+no superó el pico que ya había dejado la carga del Parquet).
+
+Modos:
+    pydantic  lista de FocoCalorResponse + model_dump_json (el camino anterior de get_active_fires)
+    json      cuerpo JSON completo con el encoder de pandas (FirmsDataset.to_json)
+    ndjson    iter_ndjson, consumiendo las partes a medida que se generan
+    geojson   iter_geojson, ídem
+
+Uso (desde backend/):
+    python -m benchmarks.bench_firms_streaming [detecciones]
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+for _var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+    os.environ.setdefault(_var, "benchmark")
+
+MODES = ["pydantic", "json", "ndjson", "geojson"]
+
+def _max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB en Linux
+
+def run_mode(mode: str, path: str) -> None:
+    """Corre un modo en este proceso e imprime: bytes, ms, RSS base y RSS pico (MB)."""
+    import pandas as pd
+    from app.schemas.responses import ResumenResponse
+    from app.services.firms import FirmsDataset, iter_geojson, iter_ndjson
+
+    focos = pd.read_parquet(path)
+    # Como FirmsArchive.load: Parquet devuelve las listas de sensores como arrays de NumPy
+    focos["sensores"] = focos["sensores"].map(list)
+    resumen = ResumenResponse(cantidad_focos=len(focos), periodo="current", fuente_datos="Satélite VIIRS", mensaje="-")
+    dataset = FirmsDataset(resumen=resumen, focos=focos)
+    base = _max_rss_mb()
+
+    start = time.perf_counter()
+    if mode == "pydantic":
+        size = len(dataset.to_api_response().model_dump_json())
+    elif mode == "json":
+        size = len(dataset.to_json())
+    else:
+        stream = iter_ndjson if mode == "ndjson" else iter_geojson
+        size = sum(len(part) for part in stream(resumen, focos))
+    elapsed = time.perf_counter() - start
+    print(size, elapsed * 1000, base, _max_rss_mb())
+
+def main(rows: int):
+    from app.services.firms import _transform_detections
+    from benchmarks.synthetic_firms import generate_viirs
+
+    focos = _transform_detections(generate_viirs(rows, days=365))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "focos.parquet")
+        focos.to_parquet(path)
+        print(f"{len(focos)} focos (un año)")
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_firms_streaming", "--mode", mode, path],
+                capture_output=True, text=True, check=True,
+            ).stdout.split()
+            size, elapsed, base, peak = int(output[0]), *map(float, output[1:])
+            print(f"  {mode:8s} {size / 1e6:7.1f} MB de salida, {elapsed:8.1f} ms, pico RSS +{peak - base:7.1f} MB")
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--mode"]:
+        run_mode(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 150_000)
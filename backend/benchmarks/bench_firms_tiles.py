@@ -0,0 +1,61 @@
+"""
+Vector tiles de focos: genera la pirámide completa (z0..zmax) de los tiles que cubren
+Corrientes para un año de detecciones sintéticas y luego la vuelve a pedir desde el LRU.
+Reporta el tiempo de generación por tile y la tasa de aciertos del cache.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_firms_tiles [detecciones] [zoom_maximo]
+"""
+import math
+import os
+import sys
+import time
+
+for _var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+    os.environ.setdefault(_var, "benchmark")
+
+from app.core.config import settings
+from app.schemas.firms import TimePeriod
+from app.services.firms import FIRMSService, _transform_detections
+from app.services.firms_tiles import FIRMSTileService
+from benchmarks.synthetic_firms import CORRIENTES_BOUNDS, generate_viirs
+
+def tiles_covering(z: int):
+    """Tiles XYZ que cubren el bbox de Corrientes en el zoom z."""
+    west, south, east, north = CORRIENTES_BOUNDS
+    n = 2 ** z
+
+    def tile_x(lon):
+        return min(int((lon + 180.0) / 360.0 * n), n - 1)
+
+    def tile_y(lat):
+        lat_rad = math.radians(lat)
+        return min(int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n), n - 1)
+
+    for x in range(tile_x(west), tile_x(east) + 1):
+        for y in range(tile_y(north), tile_y(south) + 1):
+            yield x, y
+
+def main(rows: int, max_zoom: int):
+    service = FIRMSService()
+    focos = _transform_detections(generate_viirs(rows, days=365))
+    # Como get_dataset: el dataset del período y la vista de la región por defecto que sirve el endpoint
+    period_dataset = service._make_dataset(TimePeriod.CURRENT, ["VIIRS_SNPP_NRT"], focos)
+    dataset = service._region_view(TimePeriod.CURRENT, period_dataset, settings.FIRMS_DEFAULT_REGION)
+    tiles = FIRMSTileService(maxsize=100_000)
+    pyramid = [(z, x, y) for z in range(max_zoom + 1) for x, y in tiles_covering(z)]
+
+    print(f"{len(focos)} focos, {len(pyramid)} tiles (z0..z{max_zoom})")
+    for label in ("primera pasada (genera)", "segunda pasada (LRU)"):
+        start = time.perf_counter()
+        size = sum(len(tiles.get_tile(TimePeriod.CURRENT, dataset, z, x, y)) for z, x, y in pyramid)
+        elapsed = time.perf_counter() - start
+        print(f"  {label}: {elapsed * 1000:9.1f} ms, {elapsed / len(pyramid) * 1000:.2f} ms/tile, {size / 1e6:.1f} MB")
+
+    stats = tiles.stats()
+    print(f"  render promedio: {stats['render_promedio_ms']} ms/tile, máximo: {stats['render_maximo_ms']} ms")
+    print(f"  tasa de aciertos: {stats['tasa_aciertos']}")
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [60_000, 10][len(args):]))
@@ -0,0 +1,78 @@
+"""
+Compara la transformación fila por fila original de FIRMS (dicts + FocoCalorResponse
+por fila) contra la transformación vectorizada de `_transform_detections`.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_firms_transform [filas ...]
+"""
+import os
+import sys
+import time
+
+for _var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+    os.environ.setdefault(_var, "benchmark")
+
+from app.schemas.responses import APIResponse, FocoCalorResponse, ResumenResponse
+from app.services.firms import (
+    FirmsDataset,
+    _transform_detections,
+    _kelvin_to_celsius,
+    _map_confidence,
+    _combine_datetime,
+    _confidence_text,
+    _temp_text,
+    _intensidad_text,
+)
+from benchmarks.synthetic_firms import generate_viirs
+
+SIZES = [1_000, 50_000, 500_000]
+
+def _resumen(cantidad: int) -> ResumenResponse:
+    return ResumenResponse(cantidad_focos=cantidad, periodo="current", fuente_datos="Satélite VIIRS", mensaje="")
+
+def _legacy_area_protegida(lat: float, lon: float) -> str | None:
+    # Chequeo por bounding box que usaba el camino original
+    if -28.7 <= lat <= -28.0 and -57.8 <= lon <= -57.0:
+        return "Parque Nacional Iberá"
+    return None
+
+def row_by_row(df) -> bytes:
+    """Reproduce el camino original: un FocoCalorResponse validado por fila."""
+    focos = []
+    for fire in df.to_dict("records"):
+        temp_c = _kelvin_to_celsius(fire.get("bright_ti4"))
+        conf = _map_confidence(fire.get("confidence"))
+        frp = fire.get("frp")
+        focos.append(FocoCalorResponse(
+            latitud=fire["latitude"],
+            longitud=fire["longitude"],
+            fecha_hora=_combine_datetime(fire.get("acq_date"), fire.get("acq_time")) or "",
+            temperatura_celsius=temp_c,
+            temperatura_texto=_temp_text(temp_c),
+            confianza=conf,
+            confianza_texto=_confidence_text(conf),
+            frp=frp,
+            intensidad_texto=_intensidad_text(frp),
+            area_protegida=_legacy_area_protegida(fire["latitude"], fire["longitude"]),
+        ))
+    return APIResponse(resumen=_resumen(len(focos)), focos=focos).model_dump_json().encode("utf-8")
+
+def vectorized(df) -> bytes:
+    focos = _transform_detections(df)
+    return FirmsDataset(resumen=_resumen(len(focos)), focos=focos).to_json()
+
+def _time(func, df) -> float:
+    start = time.perf_counter()
+    func(df)
+    return time.perf_counter() - start
+
+def main(sizes):
+    print(f"{'filas':>10} {'fila a fila (s)':>16} {'vectorizado (s)':>16} {'mejora':>8}")
+    for rows in sizes:
+        df = generate_viirs(rows)
+        legacy = _time(row_by_row, df)
+        fast = _time(vectorized, df)
+        print(f"{rows:>10} {legacy:>16.3f} {fast:>16.3f} {legacy / fast:>7.1f}x")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
@@ -0,0 +1,168 @@
+"""
+Prueba de concurrencia de los endpoints de Earth Engine contra un módulo `ee` simulado
+(no hace falta cuenta de servicio ni red). Cada getInfo() del stub bloquea --gee-latency
+segundos, como un round trip real. Levanta la API en este proceso (uvicorn, SQLite temporal)
+y verifica que:
+
+    1. Mientras hay análisis NBR/NDVI/históricos en curso, /firms/status y /auth/me siguen
+       respondiendo con su latencia normal (p95 con carga <= --max-slowdown x p95 sin carga).
+    2. GEE se inicializa una sola vez, en el arranque, aunque lleguen requests en paralelo.
+    3. Con el pool y su cola llenos, los requests sobrantes reciben 503 en lugar de encolarse.
+    4. Una llamada que supera GEE_CALL_TIMEOUT recibe 504.
+
+Termina con código 1 si alguna verificación falla.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_gee_concurrency [--gee-latency 0.5] [--gee-requests 24] [--probes 200]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import httpx
+import numpy as np
+
+from benchmarks import gee_stub
+
+API = "/api/v1"
+USER = {"email": "gee@example.com", "password": "benchmark-123", "full_name": "Prueba GEE"}
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    p50, p95 = np.percentile(np.array(latencies) * 1000, [50, 95])
+    return {"p50_ms": round(float(p50), 1), "p95_ms": round(float(p95), 1)}
+
+async def probe(client: httpx.AsyncClient, token: str, total: int) -> Dict[str, Dict[str, float]]:
+    """Latencias de /firms/status y /auth/me, de a un request por vez."""
+    results = {}
+    for name, path, headers in (
+        ("GET /firms/status", f"{API}/firms/status", {}),
+        ("GET /auth/me", f"{API}/auth/me", {"Authorization": f"Bearer {token}"}),
+    ):
+        latencies = []
+        for _ in range(total):
+            start = time.perf_counter()
+            (await client.get(path, headers=headers)).raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        results[name] = _percentiles(latencies)
+    return results
+
+def gee_requests(client: httpx.AsyncClient, count: int) -> List[Any]:
+    """Mezcla de los tres endpoints de GEE."""
+    builders = [
+        lambda: client.get(f"{API}/gee/ndvi-stats", params={"start_date": "2024-01-01", "end_date": "2024-06-30"}),
+        lambda: client.get(f"{API}/gee/historical-fires", params={"start_date": "2024-01-01", "end_date": "2024-06-30"}),
+        lambda: client.post(f"{API}/gee/nbr-analysis", params={"pre_fire_date": "2024-01-01", "post_fire_date": "2024-03-01"}),
+    ]
+    return [builders[i % len(builders)]() for i in range(count)]
+
+def uncached_requests(client: httpx.AsyncClient, count: int) -> List[Any]:
+    """Análisis NBR con fechas distintas: ninguno se resuelve desde un cache."""
+    return [
+        client.post(f"{API}/gee/nbr-analysis", params={"pre_fire_date": f"2023-01-{i % 28 + 1:02d}", "post_fire_date": f"2023-{i // 28 + 3:02d}-01"})
+        for i in range(count)
+    ]
+
+async def main(args) -> int:
+    stub = gee_stub.install()
+    stub.latency = args.gee_latency
+    stub.slow_latency = args.call_timeout + 1
+
+    tmp = tempfile.mkdtemp()
+    credentials = os.path.join(tmp, "service-account.json")
+    with open(credentials, "w") as f:
+        f.write("{}")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'gee.db')}",
+        "FIRMS_ARCHIVE_DIR": os.path.join(tmp, "archivo"),
+        "FIRMS_POLLER_ENABLED": "false",
+        "GEE_CREDENTIAL_PATH": credentials,
+        "GEE_MAX_WORKERS": str(args.workers),
+        "GEE_MAX_QUEUED": str(args.queued),
+        "GEE_CALL_TIMEOUT": str(args.call_timeout),
+    })
+    for var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+        os.environ.setdefault(var, "benchmark")
+
+    import uvicorn
+    from app.main import app
+    from app.services.gee import gee_executor
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    failures: List[str] = []
+    limits = httpx.Limits(max_connections=200, max_keepalive_connections=200)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60.0) as client:
+        await client.post(f"{API}/auth/register", json=USER)
+        response = await client.post(f"{API}/auth/login", data={"username": USER["email"], "password": USER["password"]})
+        token = response.json()["access_token"]
+
+        idle = await probe(client, token, args.probes)
+
+        # Una tanda que cabe en el pool y su cola: todos deben responder 200
+        batch = min(args.gee_requests, args.workers + args.queued)
+        start = time.perf_counter()
+        gee_tasks = [asyncio.ensure_future(request) for request in gee_requests(client, batch)]
+        await asyncio.sleep(args.gee_latency / 2)  # Que los análisis ya estén ocupando el pool
+        loaded = await probe(client, token, args.probes)
+        statuses = [response.status_code for response in await asyncio.gather(*gee_tasks)]
+        gee_elapsed = time.perf_counter() - start
+
+        print(f"{'sonda':20s} {'p50 ms':>10s} {'p95 ms':>10s} {'p50 c/GEE':>10s} {'p95 c/GEE':>10s}")
+        for name in idle:
+            print(f"{name:20s} {idle[name]['p50_ms']:10.1f} {idle[name]['p95_ms']:10.1f} {loaded[name]['p50_ms']:10.1f} {loaded[name]['p95_ms']:10.1f}")
+            allowed = max(idle[name]["p95_ms"] * args.max_slowdown, args.min_budget_ms)
+            if loaded[name]["p95_ms"] > allowed:
+                failures.append(f"{name}: p95 {idle[name]['p95_ms']} -> {loaded[name]['p95_ms']} ms con GEE en curso")
+        print(f"{batch} requests GEE en {gee_elapsed:.1f} s, estados {sorted(set(statuses))}")
+        if any(status != 200 for status in statuses):
+            failures.append(f"requests GEE dentro de la capacidad con estados {statuses}")
+        if stub.counters["initialize"] != 1:
+            failures.append(f"ee.Initialize se llamó {stub.counters['initialize']} veces")
+
+        # Más requests que hilos + cola: los sobrantes reciben 503 de inmediato
+        overflow = args.workers + args.queued + args.overflow
+        statuses = [response.status_code for response in await asyncio.gather(*uncached_requests(client, overflow))]
+        rejected = statuses.count(503)
+        print(f"{overflow} requests GEE simultáneos: {statuses.count(200)} x 200, {rejected} x 503")
+        if rejected < args.overflow:
+            failures.append(f"se esperaban al menos {args.overflow} respuestas 503 y hubo {rejected}")
+
+        # Una llamada sincrónica más lenta que GEE_CALL_TIMEOUT recibe 504 (sin asincronico=false el rango se encolaría)
+        response = await client.get(f"{API}/gee/ndvi-stats", params={"start_date": gee_stub.SLOW_DATE, "end_date": "2024-06-30", "asincronico": "false"})
+        print(f"Llamada lenta: {response.status_code}")
+        if response.status_code != 504:
+            failures.append(f"la llamada lenta respondió {response.status_code} en lugar de 504")
+        print(f"Pool GEE: {gee_executor.stats()}")
+
+    server.should_exit = True
+    await serve_task
+    for failure in failures:
+        print(f"FALLA {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrencia de los endpoints de GEE con un ee simulado")
+    parser.add_argument("--gee-latency", type=float, default=0.5, help="Segundos que bloquea cada getInfo() simulado")
+    parser.add_argument("--gee-requests", type=int, default=12, help="Requests GEE simultáneos durante la sonda")
+    parser.add_argument("--workers", type=int, default=4, help="GEE_MAX_WORKERS")
+    parser.add_argument("--queued", type=int, default=8, help="GEE_MAX_QUEUED")
+    parser.add_argument("--overflow", type=int, default=4, help="Requests por encima de la capacidad del pool")
+    parser.add_argument("--call-timeout", type=float, default=15.0, help="GEE_CALL_TIMEOUT")
+    parser.add_argument("--probes", type=int, default=50, help="Requests por sonda")
+    parser.add_argument("--max-slowdown", type=float, default=3.0, help="Empeoramiento tolerado del p95 de las sondas")
+    parser.add_argument("--min-budget-ms", type=float, default=50.0, help="p95 tolerado mínimo, para sondas muy rápidas")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,87 @@
+"""
+Benchmark de get_historical_fire_data contra el `ee` simulado (benchmarks.gee_stub,
+--gee-latency segundos por getInfo) y una base SQLite temporal:
+
+    frio        serie 2001-hoy sin nada guardado: un getInfo por año, --parallel tramos a la vez
+    caliente    la misma serie: la primera vez se arma desde la base, después sale de memoria
+    solapada    el rango empieza un mes antes: sólo se calculan los días nuevos
+    reciente    vencido GEE_UNPUBLISHED_RECHECK_SECONDS, se piden de nuevo los días recientes
+                que no tenían imagen (y ahora sí)
+
+Antes la consulta se cortaba en 366 días (daily_counts.limit(366)) y se recalculaba entera.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_gee_historical [--gee-latency 0.5] [--parallel 3] [--since 2001]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks import gee_stub
+
+async def main(args) -> int:
+    stub = gee_stub.install()
+    stub.latency = args.gee_latency
+    tmp = tempfile.mkdtemp()
+    credentials = os.path.join(tmp, "service-account.json")
+    with open(credentials, "w") as f:
+        f.write("{}")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'historico.db')}",
+        "GEE_CREDENTIAL_PATH": credentials,
+        "GEE_HISTORICAL_PARALLEL_CHUNKS": str(args.parallel),
+    })
+    for var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+        os.environ.setdefault(var, "benchmark")
+
+    import app.db.models  # noqa: F401  Registra los modelos en Base
+    from app.db.base_class import Base
+    from app.db.session import engine
+    from app.services.gee import _fire_series_cache, _unpublished, gee_executor, gee_service
+
+    Base.metadata.create_all(bind=engine)
+    gee_service._ensure_initialized()
+
+    today = date.today()
+    stub.published_until = (today - timedelta(days=3)).isoformat()  # Los últimos días aún no tienen imagen
+    start = date(args.since, 1, 1)
+
+    async def run(name: str, first: date, last: date, max_round_trips: int) -> bool:
+        before = dict(stub.counters)
+        started = time.perf_counter()
+        response = await gee_service.get_historical_fire_data(first.isoformat(), last.isoformat())
+        elapsed = time.perf_counter() - started
+        round_trips = stub.counters["getInfo"] - before["getInfo"]
+        days = stub.counters["composites"] - before["composites"]
+        ok = round_trips <= max_round_trips
+        print(f"{name:10s} {elapsed * 1000:10.1f} {round_trips:8d} {days:10d} {response.summary.total_days_analyzed:10d} {'' if ok else 'FALLA'}")
+        return ok
+
+    years = today.year - args.since + 1
+    print(f"{'escenario':10s} {'ms':>10s} {'getInfo':>8s} {'dias GEE':>10s} {'dias serie':>10s}")
+    checks = [
+        await run("frio", start, today, years),
+    ]
+    _fire_series_cache.clear()  # Como después de reiniciar la API: la serie se arma desde la base
+    checks += [
+        await run("caliente", start, today, 0),
+        await run("caliente", start, today, 0),
+        await run("solapada", start - timedelta(days=31), today, 1),
+    ]
+    stub.published_until = today.isoformat()
+    _unpublished.clear()
+    _fire_series_cache.clear()
+    checks.append(await run("reciente", start, today, 1))
+    gee_executor.shutdown()
+    return 0 if all(checks) else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serie histórica de fuego por tramos con un ee simulado")
+    parser.add_argument("--gee-latency", type=float, default=0.5, help="Segundos que bloquea cada getInfo() simulado")
+    parser.add_argument("--parallel", type=int, default=3, help="GEE_HISTORICAL_PARALLEL_CHUNKS")
+    parser.add_argument("--since", type=int, default=2001, help="Primer año de la serie")
+    sys.exit(asyncio.run(main(parser.parse_args())))
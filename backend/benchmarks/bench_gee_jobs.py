@@ -0,0 +1,187 @@
+"""
+Prueba de la cola de trabajos de GEE contra el `ee` simulado (benchmarks.gee_stub, cada
+getInfo() bloquea --gee-latency segundos). Levanta la API en este proceso (uvicorn, SQLite
+temporal) y verifica que:
+
+    1. POST /gee/nbr-analysis?asincronico=true responde 202 con el trabajo en milisegundos,
+       mientras que el mismo análisis sincrónico ocupa el request todo el cálculo.
+    2. --duplicates envíos idénticos simultáneos resultan en un solo trabajo y un solo getInfo().
+    3. El stream /gee/jobs/{id}/events emite los cambios de estado hasta 'succeeded'.
+    4. /gee/jobs/{id}/result responde 202 mientras el trabajo no termina y después el mismo
+       cuerpo que el endpoint sincrónico.
+    5. Un rango histórico de más de GEE_JOB_SYNC_MAX_DAYS días se encola solo.
+    6. Con los workers detenidos el trabajo queda pendiente en la base (visible en
+       /gee/jobs/metrics) y se ejecuta al volver a arrancarlos, como tras un reinicio.
+    7. Vencido GEE_JOB_RESULT_TTL_SECONDS el trabajo da 404 y un envío igual crea otro.
+
+Termina con código 1 si alguna verificación falla.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_gee_jobs [--gee-latency 1.0] [--duplicates 20] [--result-ttl 10]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks import gee_stub
+from benchmarks.bench_gee_nbr import polygon
+
+API = "/api/v1"
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def nbr_params(day: int) -> Dict[str, Any]:
+    return {"pre_fire_date": f"2024-08-{day:02d}", "post_fire_date": "2024-10-01", "asincronico": "true"}
+
+async def wait_result(client: httpx.AsyncClient, job: Dict[str, Any], interval: float = 0.1) -> httpx.Response:
+    """Consulta el resultado hasta que deja de ser 202. Devuelve la respuesta final."""
+    while True:
+        response = await client.get(job["result_url"])
+        if response.status_code != 202:
+            return response
+        await asyncio.sleep(interval)
+
+async def read_events(client: httpx.AsyncClient, url: str) -> List[Dict[str, Any]]:
+    """Estados recibidos por SSE, con el tiempo de llegada de cada uno."""
+    events = []
+    started = time.perf_counter()
+    async with client.stream("GET", url) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("data: "):
+                events.append({"status": json.loads(line[6:])["status"], "ms": (time.perf_counter() - started) * 1000})
+    return events
+
+async def main(args) -> int:
+    stub = gee_stub.install()
+    stub.latency = args.gee_latency
+    tmp = tempfile.mkdtemp()
+    credentials = os.path.join(tmp, "service-account.json")
+    with open(credentials, "w") as f:
+        f.write("{}")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'jobs.db')}",
+        "FIRMS_POLLER_ENABLED": "false",
+        "GEE_CREDENTIAL_PATH": credentials,
+        "GEE_JOB_RESULT_TTL_SECONDS": str(args.result_ttl),
+        "GEE_JOB_POLL_SECONDS": "0.5",
+    })
+    for var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+        os.environ.setdefault(var, "benchmark")
+
+    import uvicorn
+    from app.main import app
+    from app.services.gee_jobs import gee_jobs
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    failures: List[str] = []
+    area = polygon(args.vertices)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120.0) as client:
+        # 1. Sincrónico contra encolado, sobre el mismo polígono con otras fechas
+        started = time.perf_counter()
+        response = await client.post(f"{API}/gee/nbr-analysis", params={**nbr_params(2), "asincronico": "false"}, json=area)
+        sync_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        response = await client.post(f"{API}/gee/nbr-analysis", params=nbr_params(1), json=area)
+        submit_ms = (time.perf_counter() - started) * 1000
+        job = response.json()
+        print(f"NBR sincrónico {sync_ms:.1f} ms; encolado {submit_ms:.1f} ms (estado {response.status_code}, Location {response.headers.get('location')})")
+        if response.status_code != 202 or submit_ms > args.max_submit_ms:
+            failures.append(f"envío asincrónico: estado {response.status_code} en {submit_ms:.1f} ms")
+
+        # 2 y 3. Envíos idénticos mientras corre, y stream de estados del trabajo
+        before = stub.counters["getInfo"]
+        events_task = asyncio.create_task(read_events(client, job["events_url"]))
+        duplicates = await asyncio.gather(*(
+            client.post(f"{API}/gee/nbr-analysis", params=nbr_params(1), json=area) for _ in range(args.duplicates)
+        ))
+        job_ids = {r.json()["job_id"] for r in duplicates}
+        events = await events_task
+        result = await wait_result(client, job)
+        round_trips = stub.counters["getInfo"] - before
+        print(f"{args.duplicates} envíos idénticos: {len(job_ids)} trabajo(s), {round_trips} getInfo")
+        print("SSE: " + ", ".join(f"{e['status']} ({e['ms']:.0f} ms)" for e in events))
+        if job_ids != {job["job_id"]} or round_trips > 1:
+            failures.append(f"deduplicación: trabajos {job_ids}, {round_trips} getInfo")
+        if not events or events[-1]["status"] != "succeeded":
+            failures.append(f"el stream terminó en {events[-1]['status'] if events else 'nada'}")
+
+        # 4. El resultado tiene la forma de la respuesta sincrónica
+        keys = set(result.json()) if result.status_code == 200 else set()
+        print(f"Resultado NBR: {result.status_code}, {len(result.content) / 1024:.1f} KB")
+        if result.status_code != 200 or keys != {"pre_fire_date", "post_fire_date", "results", "severity_histogram", "geometry", "metadata"}:
+            failures.append(f"resultado NBR: estado {result.status_code}, claves {sorted(keys)}")
+
+        # 5. Un rango de décadas se encola sin pedirlo
+        params = {"start_date": "2001-01-01", "end_date": datetime.utcnow().strftime("%Y-%m-%d")}
+        started = time.perf_counter()
+        response = await client.get(f"{API}/gee/historical-fires", params=params)
+        submit_ms = (time.perf_counter() - started) * 1000
+        if response.status_code != 202:
+            failures.append(f"rango largo respondió {response.status_code} en lugar de 202")
+        else:
+            result = await wait_result(client, response.json(), interval=0.25)
+            elapsed = time.perf_counter() - started
+            days = len(result.json().get("daily_data", [])) if result.status_code == 200 else 0
+            print(f"Históricos {params['start_date']}..{params['end_date']}: 202 en {submit_ms:.1f} ms, resultado {result.status_code} con {days} días en {elapsed:.1f} s")
+            if result.status_code != 200 or not days:
+                failures.append(f"resultado histórico: estado {result.status_code}")
+
+        # 6. Trabajo pendiente con los workers detenidos: queda en la base y se retoma
+        await gee_jobs.stop()
+        response = await client.get(f"{API}/gee/ndvi-stats", params={"start_date": "2020-01-01", "end_date": "2023-12-31", "asincronico": "true"})
+        pending_job = response.json()
+        metrics = (await client.get(f"{API}/gee/jobs/metrics")).text
+        depth = next((line for line in metrics.splitlines() if line.startswith('gee_jobs_queue_depth{status="pending"}')), "")
+        print(f"Workers detenidos: {depth}")
+        if not depth or float(depth.split()[-1]) != 1:
+            failures.append(f"profundidad de cola con un trabajo pendiente: {depth!r}")
+        await gee_jobs.start()
+        result = await wait_result(client, pending_job)
+        print(f"Trabajo retomado al arrancar los workers: {result.status_code}")
+        if result.status_code != 200:
+            failures.append(f"trabajo pendiente retomado con estado {result.status_code}")
+
+        # 7. Vencido el TTL el trabajo deja de existir y el mismo envío crea otro
+        status = (await client.get(job["status_url"])).json()
+        expires_at = datetime.fromisoformat(status["expires_at"])
+        await asyncio.sleep(max(0.0, (expires_at - datetime.utcnow()).total_seconds()) + 0.5)
+        gone = (await client.get(job["status_url"])).status_code
+        again = (await client.post(f"{API}/gee/nbr-analysis", params=nbr_params(1), json=area)).json()
+        print(f"Pasado el TTL: estado {gone}; nuevo envío {'crea otro trabajo' if again['job_id'] != job['job_id'] else 'reutiliza el vencido'}")
+        if gone != 404 or again["job_id"] == job["job_id"]:
+            failures.append(f"TTL: estado {gone}, mismo trabajo {again['job_id'] == job['job_id']}")
+
+        print()
+        print("\n".join(line for line in (await client.get(f"{API}/gee/jobs/metrics")).text.splitlines() if line.startswith("gee_jobs_")))
+
+    server.should_exit = True
+    await serve_task
+    for failure in failures:
+        print(f"FALLA {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cola de trabajos de GEE con un ee simulado")
+    parser.add_argument("--gee-latency", type=float, default=1.0, help="Segundos que bloquea cada getInfo() simulado")
+    parser.add_argument("--duplicates", type=int, default=20, help="Envíos idénticos simultáneos")
+    parser.add_argument("--vertices", type=int, default=2000, help="Vértices del polígono analizado")
+    parser.add_argument("--result-ttl", type=int, default=15, help="GEE_JOB_RESULT_TTL_SECONDS")
+    parser.add_argument("--max-submit-ms", type=float, default=250.0, help="Latencia tolerada del envío de un trabajo")
+    sys.exit(asyncio.run(main(parser.parse_args())))
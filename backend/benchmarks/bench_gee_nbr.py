@@ -0,0 +1,133 @@
+"""
+Benchmark de POST /gee/nbr-analysis contra el `ee` simulado (benchmarks.gee_stub), que
+responde con respuestas de referencia con la forma de las de GEE y bloquea --gee-latency
+segundos por getInfo. Compara, para la geometría por defecto y para un polígono de
+--vertices vértices:
+
+    anterior    la secuencia de antes: dos size().getInfo(), getInfo() de las imágenes de
+                NBR pre, post, dNBR y severidad, y de la geometría (7 round trips); la
+                respuesta repetía la geometría en cada resultado
+    frio        un único getInfo() de un ee.Dictionary con medias, percentiles y superficie
+                por clase de severidad
+    cache       la misma consulta con la geometría re-serializada (otro orden de claves,
+                más decimales): sale del cache sin round trips
+
+Uso (desde backend/):
+    python -m benchmarks.bench_gee_nbr [--gee-latency 0.5] [--vertices 500]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks import gee_stub
+
+API = "/api/v1"
+PARAMS = {"pre_fire_date": "2024-08-01", "post_fire_date": "2024-10-01"}
+
+def polygon(vertices: int) -> Dict[str, Any]:
+    """Polígono irregular alrededor de un incendio en los Esteros del Iberá."""
+    ring = [
+        [round(-57.2 + 0.15 * math.cos(2 * math.pi * i / vertices) * (1 + 0.2 * math.sin(7 * i)), 6),
+         round(-28.5 + 0.1 * math.sin(2 * math.pi * i / vertices) * (1 + 0.2 * math.cos(5 * i)), 6)]
+        for i in range(vertices)
+    ]
+    return {"type": "Polygon", "coordinates": [ring + [ring[0]]]}
+
+def reserialized(geometry: Dict[str, Any]) -> Dict[str, Any]:
+    """La misma geometría como la mandaría otro cliente: claves en otro orden y ruido en el 9no decimal."""
+    ring = [[x + 1e-9, y - 1e-9] for x, y in geometry["coordinates"][0]]
+    return {"coordinates": [ring], "type": geometry["type"]}
+
+def legacy_payloads(geometry: Dict[str, Any]) -> List[Any]:
+    """Lo que devolvían los 7 getInfo() de antes (descripciones de imagen de una banda, no números)."""
+    def image_info(band: str) -> Dict[str, Any]:
+        return {
+            "type": "Image",
+            "bands": [{
+                "id": band,
+                "data_type": {"type": "PixelType", "precision": "double"},
+                "dimensions": [7701, 7821],
+                "crs": "EPSG:32621",
+                "crs_transform": [30.0, 0.0, 399885.0, 0.0, -30.0, -2999985.0],
+            }],
+            "properties": {"system:time_start": 1727740800000, "system:index": "LC08_225079_20241001"},
+        }
+    return [1, 1, image_info("NBR"), image_info("NBR"), image_info("dNBR"), image_info("severity"), geometry]
+
+def legacy_response_size(response: Dict[str, Any], geometry: Dict[str, Any]) -> int:
+    """Tamaño que tendría la respuesta con la forma anterior (geometría repetida en cada resultado)."""
+    legacy = {key: response[key] for key in ("pre_fire_date", "post_fire_date", "metadata")}
+    legacy["results"] = [
+        {"date": result["date"], "nbr_value": result["nbr_value"], "dNBR": result["dNBR"], "severity": result["severity"], "geometry": geometry}
+        for result in response["results"]
+    ]
+    return len(json.dumps(legacy))
+
+async def main(args) -> int:
+    stub = gee_stub.install()
+    stub.latency = args.gee_latency
+    tmp = tempfile.mkdtemp()
+    credentials = os.path.join(tmp, "service-account.json")
+    with open(credentials, "w") as f:
+        f.write("{}")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'nbr.db')}",
+        "FIRMS_POLLER_ENABLED": "false",
+        "GEE_CREDENTIAL_PATH": credentials,
+    })
+    for var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+        os.environ.setdefault(var, "benchmark")
+
+    from app.main import app
+    from app.services.gee import gee_executor, gee_service
+
+    gee_service._ensure_initialized()
+    failures = []
+    print(f"{'geometría':12s} {'escenario':10s} {'ms':>9s} {'getInfo':>8s} {'KB de GEE':>10s} {'KB resp.':>9s}")
+    async with httpx.AsyncClient(app=app, base_url="http://test", timeout=60.0) as client:
+        for name, geometry in (("corrientes", None), (f"{args.vertices} vért.", polygon(args.vertices))):
+            echoed = geometry or gee_stub.GEOMETRY
+            payloads = legacy_payloads(echoed)
+            legacy_ms = len(payloads) * args.gee_latency * 1000
+            legacy_kb = sum(len(json.dumps(payload)) for payload in payloads) / 1024
+
+            results = {}
+            for scenario, body in (("frio", geometry), ("cache", reserialized(geometry) if geometry else None)):
+                before = dict(stub.counters)
+                started = time.perf_counter()
+                response = await client.post(f"{API}/gee/nbr-analysis", params=PARAMS, json=body)
+                elapsed = (time.perf_counter() - started) * 1000
+                if response.status_code != 200:
+                    failures.append(f"{name}/{scenario}: estado {response.status_code} {response.text[:200]}")
+                    continue
+                results[scenario] = response.json()
+                round_trips = stub.counters["getInfo"] - before["getInfo"]
+                received = (stub.counters["bytes"] - before["bytes"]) / 1024
+                if round_trips > (1 if scenario == "frio" else 0):
+                    failures.append(f"{name}/{scenario}: {round_trips} getInfo")
+                if scenario == "frio":
+                    legacy_size = legacy_response_size(results["frio"], echoed) / 1024
+                    print(f"{name:12s} {'anterior':10s} {legacy_ms:9.1f} {len(payloads):8d} {legacy_kb:10.2f} {legacy_size:9.2f}")
+                print(f"{name:12s} {scenario:10s} {elapsed:9.1f} {round_trips:8d} {received:10.2f} {len(response.content) / 1024:9.2f}")
+            if "frio" in results:
+                histogram = results["frio"]["severity_histogram"]
+                print(f"{'':12s} severidad: {results['frio']['results'][1]['severity']}; " + ", ".join(f"{c['severity_class']}={c['percent']}%" for c in histogram))
+
+    gee_executor.shutdown()
+    for failure in failures:
+        print(f"FALLA {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NBR en un solo round trip y cacheado, con un ee simulado")
+    parser.add_argument("--gee-latency", type=float, default=0.5, help="Segundos que bloquea cada getInfo() simulado")
+    parser.add_argument("--vertices", type=int, default=500, help="Vértices del polígono de prueba")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,74 @@
+"""
+Benchmark del cache por compuesto de get_regional_ndvi_stats contra el `ee` simulado
+(benchmarks.gee_stub, --gee-latency segundos por getInfo) y una base SQLite temporal.
+Cuenta los round trips y los compuestos calculados en GEE en cada escenario:
+
+    frio        primera consulta del año por defecto: todos los compuestos, un solo getInfo()
+    caliente    la misma consulta: lectura local, sin GEE
+    nuevo       se publica un compuesto más y el rango avanza: se calcula sólo ese
+    pendiente   el rango incluye un compuesto aún no publicado: se pide una vez y después
+                no se vuelve a pedir hasta GEE_UNPUBLISHED_RECHECK_SECONDS
+
+Antes cada consulta eran dos getInfo() sobre el año completo (~23 compuestos cada uno).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_gee_ndvi [--gee-latency 0.5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks import gee_stub
+
+def main(args) -> int:
+    stub = gee_stub.install()
+    stub.latency = args.gee_latency
+    tmp = tempfile.mkdtemp()
+    credentials = os.path.join(tmp, "service-account.json")
+    with open(credentials, "w") as f:
+        f.write("{}")
+    os.environ.update({"DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'ndvi.db')}", "GEE_CREDENTIAL_PATH": credentials})
+    for var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+        os.environ.setdefault(var, "benchmark")
+
+    import app.db.models  # noqa: F401  Registra los modelos en Base
+    from app.db.base_class import Base
+    from app.db.session import engine
+    from app.services.gee import gee_service
+
+    Base.metadata.create_all(bind=engine)
+    gee_service._ensure_initialized()
+
+    today = date(2024, 9, 20)
+    year_ago = today - timedelta(days=365)
+    stub.published_until = "2024-09-13"  # El compuesto del 13/9 ya está; el del 29/9 no
+
+    def run(name: str, start: date, end: date, expected_round_trips: int) -> bool:
+        before = dict(stub.counters)
+        started = time.perf_counter()
+        results = gee_service.get_regional_ndvi_stats(start.isoformat(), end.isoformat())
+        elapsed = time.perf_counter() - started
+        round_trips = stub.counters["getInfo"] - before["getInfo"]
+        composites = stub.counters["composites"] - before["composites"]
+        ok = round_trips <= expected_round_trips
+        print(f"{name:10s} {elapsed * 1000:10.1f} {round_trips:8d} {composites:12d} {len(results):10d} {'' if ok else 'FALLA'}")
+        return ok
+
+    print(f"{'escenario':10s} {'ms':>10s} {'getInfo':>8s} {'compuestos':>12s} {'resultados':>10s}")
+    checks = [
+        run("frio", year_ago, today, 1),
+        run("caliente", year_ago, today, 0),
+    ]
+    stub.published_until = "2024-09-29"
+    checks.append(run("nuevo", year_ago + timedelta(days=16), today + timedelta(days=16), 1))
+    checks.append(run("pendiente", year_ago + timedelta(days=32), today + timedelta(days=32), 1))
+    checks.append(run("pendiente", year_ago + timedelta(days=32), today + timedelta(days=32), 0))
+    return 0 if all(checks) else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cache por compuesto del NDVI regional con un ee simulado")
+    parser.add_argument("--gee-latency", type=float, default=0.5, help="Segundos que bloquea cada getInfo() simulado")
+    sys.exit(main(parser.parse_args()))
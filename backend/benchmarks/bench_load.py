@@ -0,0 +1,220 @@
+"""
+Prueba de carga de punta a punta, sin red externa. Levanta el stand-in de FIRMS y la API
+(uvicorn en un proceso aparte, con SQLite y archivo Parquet temporales), espera a que el
+poller sincronice el store contra el stand-in y lanza clientes concurrentes por escenario:
+/firms/ para cada TimePeriod, /auth/login y POST /reports/. Reporta throughput y latencias
+p50/p95/p99 (después de un request de calentamiento por escenario).
+
+Con --save se guarda la corrida como línea base; con --baseline se compara contra ella y el
+proceso termina con código 1 si algún escenario empeora más que --tolerance (p95 o req/s)
+o tiene más errores, para usarlo como control antes de desplegar.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_load [--concurrency 16] [--requests 200] [--latency 0.05]
+        [--error-rate 0.0] [--rows-per-day 50] [--replay-dir grabaciones/]
+        [--only /firms/] [--save base.json] [--baseline base.json] [--tolerance 0.25]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+import httpx
+import numpy as np
+
+from benchmarks.firms_standin import start_standin
+
+API = "/api/v1"
+PERIODS = ["24h", "48h", "week", "month", "current", "previous", "2023", "2022", "2021"]
+USER = {"email": "carga@example.com", "password": "benchmark-123", "full_name": "Prueba de carga"}
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_api(tmp: str, firms_url: str) -> tuple:
+    """Inicia uvicorn en un subproceso apuntando al stand-in. Devuelve (proceso, base_url)."""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'load.db')}",
+        "FIRMS_ARCHIVE_DIR": os.path.join(tmp, "archivo"),
+        "FIRMS_BASE_URL": firms_url,
+        "FIRMS_POLLER_ENABLED": "true",
+        "FIRMS_POLL_INTERVAL_MINUTES": "1440",  # Una sola sincronización durante la prueba
+    }
+    for var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+        env.setdefault(var, "benchmark")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float) -> float:
+    """Espera a que la API responda y a que el poller termine su primera corrida."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            status = (await client.get(f"{API}/firms/status")).json()
+            if status.get("ultima_actualizacion"):
+                return time.perf_counter() - start
+        except (httpx.HTTPError, ValueError):
+            pass
+        await asyncio.sleep(0.5)
+    raise TimeoutError("La API no terminó la sincronización inicial con el stand-in")
+
+async def login_token(client: httpx.AsyncClient) -> str:
+    await client.post(f"{API}/auth/register", json=USER)
+    response = await client.post(f"{API}/auth/login", data={"username": USER["email"], "password": USER["password"]})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+def scenarios(token: str) -> Dict[str, Callable[[httpx.AsyncClient], httpx.Request]]:
+    """Nombre -> función que arma un request del escenario."""
+    result: Dict[str, Callable[[httpx.AsyncClient], httpx.Request]] = {}
+    for period in PERIODS:
+        result[f"GET /firms/?period={period}"] = lambda client, period=period: client.build_request(
+            "GET", f"{API}/firms/", params={"period": period}, headers={"Accept-Encoding": "br, gzip"}
+        )
+    result["POST /auth/login"] = lambda client: client.build_request(
+        "POST", f"{API}/auth/login", data={"username": USER["email"], "password": USER["password"]}
+    )
+    result["POST /reports/"] = lambda client: client.build_request(
+        "POST",
+        f"{API}/reports/",
+        json={"latitude": -28.5, "longitude": -57.5, "description": "Columna de humo (prueba de carga)"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    return result
+
+async def send(client: httpx.AsyncClient, request: httpx.Request) -> tuple:
+    """
+    Envía el request y lee el cuerpo sin descomprimirlo: descomprimir brotli en el mismo
+    proceso que genera la carga le sumaría CPU del cliente a la latencia medida.
+    Devuelve (estado, bytes recibidos).
+    """
+    response = await client.send(request, stream=True)
+    try:
+        size = 0
+        async for chunk in response.aiter_raw():
+            size += len(chunk)
+        return response.status_code, size
+    finally:
+        await response.aclose()
+
+async def run_scenario(client: httpx.AsyncClient, build: Callable, total: int, concurrency: int) -> Dict[str, Any]:
+    """Ejecuta `total` requests con `concurrency` clientes en paralelo."""
+    await send(client, build(client))  # Calentamiento: el primer request de un período construye su dataset
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}  # Por estado HTTP o tipo de excepción
+    received = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, received
+        while remaining > 0:
+            remaining -= 1
+            request = build(client)
+            start = time.perf_counter()
+            try:
+                status, size = await send(client, request)
+                received += size
+                if status >= 400:
+                    errors[str(status)] = errors.get(str(status), 0) + 1
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {
+        "requests": total,
+        "errores": sum(errors.values()),
+        "errores_por_tipo": errors,
+        "req_s": round(total / elapsed, 1),
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+        "p99_ms": round(float(p99), 1),
+        "kb_por_request": round(received / total / 1024, 1),
+    }
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Escenarios que empeoraron respecto de la línea base."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']} -> {result['p95_ms']} ms")
+        if result["req_s"] < base["req_s"] * (1 - tolerance):
+            regressions.append(f"{name}: {base['req_s']} -> {result['req_s']} req/s")
+        if result["errores"] > base["errores"]:
+            regressions.append(f"{name}: errores {base['errores']} -> {result['errores']}")
+    return regressions
+
+async def main(args) -> int:
+    standin, firms_url = start_standin(
+        latency=args.latency,
+        rows_per_day=args.rows_per_day,
+        error_rate=args.error_rate,
+        jitter=args.latency / 2,
+        replay_dir=args.replay_dir,
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        process, base_url = start_api(tmp, firms_url)
+        try:
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+                synced = await wait_ready(client, args.timeout)
+                print(f"Sincronización inicial: {synced:.1f} s, {standin.request_count} requests al stand-in ({standin.error_count} con error)")
+                token = await login_token(client)
+                results = {}
+                print(f"{'escenario':32s} {'req/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'KB':>8s} {'errores':>8s}")
+                for name, request in scenarios(token).items():
+                    if args.only and args.only not in name:
+                        continue
+                    result = await run_scenario(client, request, args.requests, args.concurrency)
+                    results[name] = result
+                    print(f"{name:32s} {result['req_s']:8.1f} {result['p50_ms']:8.1f} {result['p95_ms']:8.1f} {result['p99_ms']:8.1f} {result['kb_por_request']:8.1f} {result['errores']:8d} {result['errores_por_tipo'] or ''}")
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+            standin.shutdown()
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Línea base guardada en {args.save}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESIÓN {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Requests medidos por escenario")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latencia del stand-in de FIRMS (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de respuestas 5xx del stand-in")
+    parser.add_argument("--rows-per-day", type=int, default=50, help="Detecciones sintéticas por día y fuente")
+    parser.add_argument("--replay-dir", help="CSVs grabados con `python -m benchmarks.firms_standin record`")
+    parser.add_argument("--only", help="Corre solo los escenarios que contienen este texto")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Espera máxima de la sincronización inicial (s)")
+    parser.add_argument("--save", help="Guarda los resultados como línea base (JSON)")
+    parser.add_argument("--baseline", help="Compara contra una línea base y falla si hay regresiones")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Empeoramiento tolerado (fracción)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,60 @@
+"""
+Etiquetado de áreas protegidas: 100k puntos contra ~20 polígonos.
+Compara la consulta vectorizada del STRtree con un recorrido punto por punto
+sobre los polígonos preparados.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_protected_areas [puntos] [poligonos]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import shapely
+
+for _var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+    os.environ.setdefault(_var, "benchmark")
+
+from app.utils.geospatial import ProtectedAreaIndex
+from benchmarks.synthetic_firms import CORRIENTES_BOUNDS, synthetic_areas
+
+def point_by_point(index: ProtectedAreaIndex, lat: np.ndarray, lon: np.ndarray) -> list:
+    result = []
+    for y, x in zip(lat, lon):
+        point = shapely.Point(x, y)
+        name = None
+        for geometry, area_name in zip(index.geometries, index.names):
+            if geometry.intersects(point):
+                name = area_name
+                break
+        result.append(name)
+    return result
+
+def main(points: int, polygons: int):
+    rng = np.random.default_rng(1)
+    west, south, east, north = CORRIENTES_BOUNDS
+    lat, lon = rng.uniform(south, north, points), rng.uniform(west, east, points)
+
+    start = time.perf_counter()
+    index = ProtectedAreaIndex(synthetic_areas(polygons))
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tagged = index.tag(lat, lon)
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = point_by_point(index, lat, lon)
+    loop = time.perf_counter() - start
+
+    assert list(tagged) == expected
+    inside = sum(name is not None for name in expected)
+    print(f"{points} puntos, {polygons} polígonos ({inside} puntos dentro de algún área)")
+    print(f"  construcción del índice: {build * 1000:8.1f} ms")
+    print(f"  STRtree vectorizado:     {vectorized * 1000:8.1f} ms")
+    print(f"  punto por punto:         {loop * 1000:8.1f} ms ({loop / vectorized:.0f}x)")
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [100_000, 20][len(args):]))
@@ -0,0 +1,186 @@
+"""
+Servidor local que imita la API de área de FIRMS (`/{key}/{source}/{bbox}/{days}/{date}`)
+devolviendo CSVs sintéticos o grabados, con latencia, tasa de errores y tamaño de
+respuesta configurables. Permite probar el cliente, el poller y la API completa sin
+usar la API real ni FIRMS_API_KEY.
+
+Grabados: `record` descarga una vez de FIRMS un CSV por fuente (`{fuente}.csv`); con
+`--replay-dir` el servidor responde cada ventana filtrando esas filas por acq_date.
+Las fuentes sin grabación se responden con datos sintéticos.
+
+Uso (desde backend/):
+    python -m benchmarks.firms_standin [--port 8001] [--latency 0.2] [--jitter 0.1]
+        [--error-rate 0.05] [--rows-per-day 50] [--replay-dir grabaciones/]
+    FIRMS_API_KEY=... python -m benchmarks.firms_standin record grabaciones/ FUENTE DESDE HASTA
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+import pandas as pd
+
+from benchmarks.synthetic_firms import generate_modis, generate_viirs, to_csv
+
+SATELLITES = {"VIIRS_NOAA20_NRT": "N20", "VIIRS_NOAA21_NRT": "N21"}
+
+# Estados con los que responde un error simulado (los que devuelve FIRMS bajo carga)
+ERROR_STATUSES = [500, 502, 503]
+
+class FIRMSStandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, como la API real
+
+    def do_GET(self):
+        server = self.server
+        server.request_count += 1
+        parts = self.path.strip("/").split("/")
+        try:
+            _key, source, _bbox, days = parts[-5], parts[-4], parts[-3], int(parts[-2])
+            start = date.fromisoformat(parts[-1])
+        except (IndexError, ValueError):
+            self._reply(400, "Invalid request")
+            return
+        if not 1 <= days <= server.max_day_range:
+            self._reply(400, "Invalid day range. Expects [1..10].")
+            return
+        time.sleep(max(server.latency + server.rng.uniform(-server.jitter, server.jitter), 0.0))
+        if server.rng.random() < server.error_rate:
+            server.error_count += 1
+            self._reply(server.rng.choice(ERROR_STATUSES), "Service temporarily unavailable")
+            return
+        self._reply(200, to_csv(server.window(source, start, days)))
+
+    def _reply(self, status: int, body: str):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+class FIRMSStandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        latency: float = 0.0,
+        rows_per_day: int = 50,
+        max_day_range: int = 10,
+        error_rate: float = 0.0,
+        jitter: float = 0.0,
+        replay_dir: str | None = None,
+        seed: int = 0,
+    ):
+        super().__init__(address, FIRMSStandinHandler)
+        self.latency = latency
+        self.rows_per_day = rows_per_day
+        self.max_day_range = max_day_range
+        self.error_rate = error_rate
+        self.jitter = jitter
+        self.rng = random.Random(seed)  # Errores y latencias reproducibles entre corridas
+        self.request_count = 0
+        self.error_count = 0
+        self.recordings: Dict[str, pd.DataFrame] = load_recordings(replay_dir) if replay_dir else {}
+
+    def window(self, source: str, start: date, days: int) -> pd.DataFrame:
+        """Detecciones de `source` entre `start` y `start + days - 1`: grabadas o sintéticas."""
+        recording = self.recordings.get(source)
+        if recording is not None:
+            end = (start + timedelta(days=days - 1)).isoformat()
+            return recording[(recording["acq_date"] >= start.isoformat()) & (recording["acq_date"] <= end)]
+        generator = generate_modis if source.startswith("MODIS") else generate_viirs
+        df = generator(self.rows_per_day * days, seed=start.toordinal(), start=start, days=days)
+        if source in SATELLITES:
+            # Los satélites VIIRS ven los mismos fuegos; el CSV real los distingue en esta columna
+            df["satellite"] = SATELLITES[source]
+        return df
+
+def load_recordings(directory: str) -> Dict[str, pd.DataFrame]:
+    """CSVs grabados por fuente (`{fuente}.csv`), con acq_date como texto para filtrar por día."""
+    recordings = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".csv"):
+            recordings[name[:-4]] = pd.read_csv(os.path.join(directory, name), dtype={"acq_date": str})
+    return recordings
+
+def start_standin(
+    latency: float = 0.0,
+    rows_per_day: int = 50,
+    port: int = 0,
+    max_day_range: int = 10,
+    error_rate: float = 0.0,
+    jitter: float = 0.0,
+    replay_dir: str | None = None,
+    seed: int = 0,
+):
+    """Inicia el servidor en un hilo. Devuelve (server, base_url)."""
+    server = FIRMSStandinServer(
+        ("127.0.0.1", port),
+        latency=latency,
+        rows_per_day=rows_per_day,
+        max_day_range=max_day_range,
+        error_rate=error_rate,
+        jitter=jitter,
+        replay_dir=replay_dir,
+        seed=seed,
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+async def record(directory: str, source: str, start: date, end: date) -> int:
+    """Descarga una vez de la API real el rango de `source` (con FIRMS_API_KEY) y lo graba para reproducirlo."""
+    from app.services.firms import FIRMSService
+    from app.services.firms_client import firms_client
+
+    try:
+        df = await FIRMSService().fetch_range(source, start, end)
+    finally:
+        await firms_client.aclose()
+    os.makedirs(directory, exist_ok=True)
+    df.to_csv(os.path.join(directory, f"{source}.csv"), index=False)
+    return len(df)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local que imita la API de área de FIRMS")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0, help="Segundos de espera por request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variación uniforme (±) de la latencia")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de requests que responden 5xx")
+    parser.add_argument("--rows-per-day", type=int, default=50, help="Tamaño de las respuestas sintéticas")
+    parser.add_argument("--replay-dir", help="Directorio con CSVs grabados ({fuente}.csv)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server, url = start_standin(
+        latency=args.latency,
+        rows_per_day=args.rows_per_day,
+        port=args.port,
+        error_rate=args.error_rate,
+        jitter=args.jitter,
+        replay_dir=args.replay_dir,
+        seed=args.seed,
+    )
+    print(f"Stand-in de FIRMS en {url} (usar FIRMS_BASE_URL={url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    import asyncio
+    import sys
+
+    if sys.argv[1:2] == ["record"]:
+        directory, source, start, end = sys.argv[2:6]
+        rows = asyncio.run(record(directory, source, date.fromisoformat(start), date.fromisoformat(end)))
+        print(f"{rows} detecciones de {source} grabadas en {directory}")
+    else:
+        main()
@@ -0,0 +1,124 @@
+"""
+Módulo `ee` simulado para probar los endpoints de Earth Engine sin cuenta de servicio ni red.
+Los objetos son encadenables (cualquier método devuelve otro que recuerda la cadena) y sólo
+getInfo() bloquea, `latency` segundos, como un round trip real; devuelve valores con la forma
+que espera app.services.gee. Hay que instalarlo antes de importar la aplicación.
+"""
+import json
+import sys
+import threading
+import time
+import types
+from datetime import datetime, timezone
+
+SLOW_DATE = "2000-01-01"  # Las consultas con esta fecha tardan `slow_latency`
+# Respuesta de referencia del ee.Dictionary de calculate_nbr (forma de la respuesta real de GEE)
+NBR_INFO = {
+    "pre_count": 1,
+    "post_count": 1,
+    "stats": {
+        "pre_mean": 0.412, "pre_p10": 0.221, "pre_p50": 0.423, "pre_p90": 0.587,
+        "post_mean": 0.198, "post_p10": -0.064, "post_p50": 0.201, "post_p90": 0.452,
+        "dnbr_mean": 0.214, "dnbr_p10": -0.021, "dnbr_p50": 0.188, "dnbr_p90": 0.533,
+    },
+    "areas": {"groups": [
+        {"severity": 0, "sum": 412803.11}, {"severity": 1, "sum": 220341.92}, {"severity": 2, "sum": 98112.40},
+        {"severity": 3, "sum": 41220.05}, {"severity": 4, "sum": 9876.33},
+    ]},
+}
+GEOMETRY = {"type": "Polygon", "coordinates": [[[-59.8, -30.7], [-55.5, -30.7], [-55.5, -27.1], [-59.8, -30.7]]]}
+
+class StubState:
+    latency = 0.5
+    slow_latency = 0.5
+    published_until = "9999-12-31"  # Compuestos posteriores todavía no existen en GEE
+    lock = threading.Lock()
+    counters = {"initialize": 0, "getInfo": 0, "composites": 0, "bytes": 0}
+
+    @classmethod
+    def count(cls, name: str, amount: int = 1) -> None:
+        with cls.lock:
+            cls.counters[name] += amount
+
+class StubObject:
+    def __init__(self, chain=(), slow: bool = False, millis=None):
+        self._chain = chain
+        self._slow = slow
+        self._millis = millis  # Fechas (epoch ms) de un filtro inList, propagadas por la cadena
+
+    def __getattr__(self, name: str):
+        return lambda *args, **kwargs: self.derive(self._chain + (name,), args)
+
+    def __call__(self, *args, **kwargs):
+        # ee.Image(x), ee.Geometry(geojson): constructores que además tienen métodos estáticos
+        return self.derive(self._chain, args)
+
+    def derive(self, chain, args) -> "StubObject":
+        """El objeto resultante hereda la lentitud y las fechas de este y de sus argumentos."""
+        slow, millis = self._slow or SLOW_DATE in args, self._millis
+        for arg in args:
+            if isinstance(arg, list) and arg and isinstance(arg[0], int):
+                millis = arg
+            elif isinstance(arg, StubObject):
+                slow = slow or arg._slow
+                millis = arg._millis if arg._millis is not None else millis
+        return StubObject(chain, slow, millis)
+
+    def getInfo(self):
+        StubState.count("getInfo")
+        time.sleep(StubState.slow_latency if self._slow else StubState.latency)
+        result = self._result()
+        StubState.count("bytes", len(json.dumps(result)))
+        return result
+
+    def _result(self):
+        last = self._chain[-1] if self._chain else ""
+        if "FeatureCollection" in self._chain:
+            return {"features": self._composites()}
+        if "Dictionary" in self._chain:
+            return NBR_INFO
+        if last == "aggregate_array":
+            return ["2024-01-01"]
+        if last == "size":
+            return 1
+        if "Geometry" in self._chain:
+            return GEOMETRY
+        return 0.5
+
+    def _composites(self):
+        """Un Feature (NDVI y píxeles de fuego) por fecha pedida que ya esté "publicada"."""
+        days = [datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d") for ms in self._millis or []]
+        features = [
+            {"properties": {"date": day, "mean_ndvi": 0.5, "fire_pixel_count": int(day[-2:]) % 7}}
+            for day in days
+            if day <= StubState.published_until
+        ]
+        StubState.count("composites", len(features))
+        return features
+
+def install() -> type:
+    """Reemplaza `ee` en sys.modules. Devuelve StubState para ajustar latencias y leer contadores."""
+
+    def initialize(*args, **kwargs):
+        time.sleep(StubState.latency)  # Credenciales + ee.Initialize también son round trips
+        StubState.count("initialize")
+
+    def factory(name):
+        return lambda *args, **kwargs: StubObject().derive((name,), args)
+
+    ee = types.ModuleType("ee")
+    ee.EEException = type("EEException", (Exception,), {})
+    ee.Initialize = initialize
+    ee.ServiceAccountCredentials = lambda *args, **kwargs: object()
+    ee.data = types.SimpleNamespace(setDeadline=lambda milliseconds: None)
+    ee.ImageCollection = factory("ImageCollection")
+    ee.FeatureCollection = factory("FeatureCollection")
+    ee.Dictionary = factory("Dictionary")
+    ee.Image = StubObject(("Image",))
+    ee.Algorithms = StubObject(("Algorithms",))
+    ee.Feature = factory("Feature")
+    ee.Reducer = StubObject(("Reducer",))
+    ee.Geometry = StubObject(("Geometry",))
+    ee.Filter = StubObject(("Filter",))
+    sys.modules["ee"] = ee
+    return StubState
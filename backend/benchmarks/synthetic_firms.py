@@ -0,0 +1,158 @@
+"""
+Generador de datos sintéticos con el formato CSV de la API de área de FIRMS.
+Se usa en los benchmarks para no depender de la API real ni de FIRMS_API_KEY.
+
+Las distribuciones imitan las de los CSVs reales de la región:
+- Focos agrupados alrededor de incendios activos (más un fondo disperso).
+- Más detecciones en la temporada seca (agosto a octubre).
+- Horarios de las pasadas diurnas y nocturnas de cada satélite (UTC).
+- Temperatura de brillo con la saturación de la banda I4 de VIIRS (~367 K).
+- FRP con cola pesada.
+- Confianza con su codificación real: l/n/h en VIIRS y 0-100 en MODIS,
+  correlacionada con el brillo.
+
+Uso (desde backend/), p. ej. para el directorio de grabaciones del stand-in:
+    python -m benchmarks.synthetic_firms {viirs|modis} FILAS SALIDA.csv [--seed 0] [--start 2024-01-01] [--days 365]
+"""
+import argparse
+from datetime import date
+import numpy as np
+import pandas as pd
+import shapely
+
+CORRIENTES_BOUNDS = (-60.0, -31.0, -57.0, -26.0)  # oeste, sur, este, norte
+
+VIIRS_COLUMNS = [
+    "latitude", "longitude", "bright_ti4", "scan", "track", "acq_date", "acq_time", "satellite",
+    "instrument", "confidence", "version", "bright_ti5", "frp", "daynight",
+]
+MODIS_COLUMNS = [
+    "latitude", "longitude", "brightness", "scan", "track", "acq_date", "acq_time", "satellite",
+    "instrument", "confidence", "version", "bright_t31", "frp", "daynight", "type",
+]
+
+# Ventanas de pasada (hora UTC de inicio, duración en minutos); Argentina es UTC-3
+VIIRS_PASSES = {"D": (16, 180), "N": (4, 180)}
+MODIS_PASSES = {
+    ("Terra", "D"): (13, 90), ("Terra", "N"): (1, 90),
+    ("Aqua", "D"): (17, 90), ("Aqua", "N"): (4, 90),
+}
+I4_SATURATION = 367.0
+HOTSPOT_SHARE = 0.85  # Fracción de detecciones que pertenecen a un incendio activo
+HOTSPOT_SPREAD_DEG = 0.02  # ~2 km alrededor del centro del incendio
+
+def _positions(rng: np.random.Generator, rows: int):
+    """Coordenadas agrupadas en incendios (normal alrededor de centros) más un fondo uniforme."""
+    west, south, east, north = CORRIENTES_BOUNDS
+    hotspots = max(5, rows // 2000)
+    centers_lat = rng.uniform(south, north, hotspots)
+    centers_lon = rng.uniform(west, east, hotspots)
+    # Pocos incendios grandes concentran la mayoría de las detecciones
+    weights = rng.pareto(1.5, hotspots) + 1
+    center = rng.choice(hotspots, rows, p=weights / weights.sum())
+    in_fire = rng.random(rows) < HOTSPOT_SHARE
+    lat = np.where(in_fire, centers_lat[center] + rng.normal(0, HOTSPOT_SPREAD_DEG, rows), rng.uniform(south, north, rows))
+    lon = np.where(in_fire, centers_lon[center] + rng.normal(0, HOTSPOT_SPREAD_DEG, rows), rng.uniform(west, east, rows))
+    return np.clip(lat, south, north).round(5), np.clip(lon, west, east).round(5)
+
+def _dates(rng: np.random.Generator, rows: int, start: date, days: int) -> pd.DatetimeIndex:
+    """Días del rango, con más peso en la temporada seca (pico alrededor del día 250 del año)."""
+    calendar = pd.date_range(start, periods=days, freq="D")
+    weights = 1 + 2.0 * np.exp(-(((calendar.dayofyear.to_numpy() - 250) / 40.0) ** 2))
+    return calendar[rng.choice(days, rows, p=weights / weights.sum())]
+
+def _pass_times(rng: np.random.Generator, windows: np.ndarray) -> np.ndarray:
+    """acq_time (HHMM) dentro de la ventana de pasada (hora de inicio, duración) de cada fila."""
+    minutes = windows[:, 0] * 60 + (rng.random(len(windows)) * windows[:, 1]).astype("int64")
+    return (minutes // 60 % 24) * 100 + minutes % 60
+
+def generate_viirs(rows: int, seed: int = 0, start: date = date(2024, 1, 1), days: int = 365) -> pd.DataFrame:
+    """Genera `rows` detecciones con las columnas de VIIRS_SNPP_NRT."""
+    rng = np.random.default_rng(seed)
+    lat, lon = _positions(rng, rows)
+    daynight = np.where(rng.random(rows) < 0.6, "D", "N")
+    windows = np.array([VIIRS_PASSES[flag] for flag in ("D", "N")])[(daynight == "N").astype(int)]
+    day = daynight == "D"
+    bright_ti4 = np.where(day, rng.normal(338, 16, rows), rng.normal(305, 9, rows))
+    bright_ti4 = np.minimum(bright_ti4, I4_SATURATION).round(2)
+    scan = rng.uniform(0.32, 0.8, rows)
+    # Confianza: saturados o muy calientes 'h'; diurnos poco contrastados a veces 'l' (reflejo solar)
+    confidence = np.where(
+        bright_ti4 >= 360, "h",
+        np.where(day & (bright_ti4 < 325) & (rng.random(rows) < 0.45), "l", "n"),
+    )
+    return pd.DataFrame({
+        "latitude": lat,
+        "longitude": lon,
+        "bright_ti4": bright_ti4,
+        "scan": scan.round(2),
+        "track": (0.36 + (scan - 0.32) * 0.875).round(2),  # El track crece con el ángulo de escaneo
+        "acq_date": _dates(rng, rows, start, days).strftime("%Y-%m-%d"),
+        "acq_time": _pass_times(rng, windows),
+        "satellite": "N",
+        "instrument": "VIIRS",
+        "confidence": confidence,
+        "version": "2.0NRT",
+        "bright_ti5": (bright_ti4 - rng.normal(32, 8, rows)).round(2),
+        "frp": rng.lognormal(1.2, 1.1, rows).round(2),
+        "daynight": daynight,
+    }, columns=VIIRS_COLUMNS)
+
+def generate_modis(rows: int, seed: int = 0, start: date = date(2023, 1, 1), days: int = 365) -> pd.DataFrame:
+    """Genera `rows` detecciones con las columnas de MODIS_SP (confianza en porcentaje)."""
+    rng = np.random.default_rng(seed + 1)
+    lat, lon = _positions(rng, rows)
+    satellite = rng.choice(["Terra", "Aqua"], rows)
+    daynight = np.where(rng.random(rows) < 0.65, "D", "N")
+    pass_table = np.array([MODIS_PASSES[key] for key in (("Terra", "D"), ("Terra", "N"), ("Aqua", "D"), ("Aqua", "N"))])
+    windows = pass_table[(satellite == "Aqua") * 2 + (daynight == "N")]
+    brightness = np.where(daynight == "D", rng.normal(322, 12, rows), rng.normal(306, 8, rows)).round(2)
+    # La confianza (0-100) crece con el contraste térmico del píxel
+    confidence = np.clip(rng.normal((brightness - 300) * 2.0 + 35, 15), 0, 100).astype(int)
+    return pd.DataFrame({
+        "latitude": lat,
+        "longitude": lon,
+        "brightness": brightness,
+        "scan": rng.uniform(1.0, 4.8, rows).round(1),
+        "track": rng.uniform(1.0, 2.0, rows).round(1),
+        "acq_date": _dates(rng, rows, start, days).strftime("%Y-%m-%d"),
+        "acq_time": _pass_times(rng, windows),
+        "satellite": satellite,
+        "instrument": "MODIS",
+        "confidence": confidence,
+        "version": "6.03",
+        "bright_t31": (brightness - rng.normal(20, 6, rows)).round(2),
+        "frp": rng.lognormal(2.0, 1.2, rows).round(1),  # Píxeles de 1 km: más FRP por detección
+        "daynight": daynight,
+        "type": np.where(rng.random(rows) < 0.02, 2, 0),  # 0: vegetación, 2: otra fuente terrestre
+    }, columns=MODIS_COLUMNS)
+
+def synthetic_areas(count: int, seed: int = 0) -> list:
+    """Features GeoJSON de polígonos irregulares de 12 vértices distribuidos en Corrientes (propiedad "nombre")."""
+    rng = np.random.default_rng(seed)
+    west, south, east, north = CORRIENTES_BOUNDS
+    features = []
+    for i in range(count):
+        cx, cy = rng.uniform(west, east), rng.uniform(south, north)
+        angles = np.sort(rng.uniform(0, 2 * np.pi, 12))
+        radii = rng.uniform(0.05, 0.4, 12)
+        ring = np.column_stack([cx + radii * np.cos(angles), cy + radii * np.sin(angles)])
+        polygon = shapely.Polygon(ring).buffer(0)
+        features.append({"geometry": shapely.geometry.mapping(polygon), "properties": {"nombre": f"Área {i}"}})
+    return features
+
+def to_csv(df: pd.DataFrame) -> str:
+    return df.to_csv(index=False)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un CSV sintético con el formato de FIRMS")
+    parser.add_argument("instrument", choices=["viirs", "modis"])
+    parser.add_argument("rows", type=int)
+    parser.add_argument("output")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", type=date.fromisoformat, default=None)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+    generator = generate_viirs if args.instrument == "viirs" else generate_modis
+    kwargs = {"start": args.start} if args.start else {}
+    generator(args.rows, seed=args.seed, days=args.days, **kwargs).to_csv(args.output, index=False)
@@ -0,0 +1,94 @@
+"""
+Microbenchmarks de /firms/ (benchmarks.bench_firms_micro) como tests: cada etapa sobre
+ROWS filas VIIRS y MODIS se compara con la línea base guardada en
+tests/baselines/firms_micro.json y falla si es más lenta que FIRMS_BENCH_TOLERANCE (por
+defecto 1.0, el doble). Las comparaciones entre etapas de una misma corrida no dependen
+de la máquina: se miden de a pares, intercaladas.
+
+La línea base es de la máquina donde se generó; para regenerarla en otra (o después de
+una mejora intencional):
+    FIRMS_BENCH_SAVE=1 python -m pytest tests/bench_firms_micro.py
+"""
+import gc
+import json
+import os
+import time
+from io import StringIO
+from pathlib import Path
+from typing import Callable, List
+
+import pandas as pd
+import pytest
+
+from app.services.firms import _transform_detections
+from benchmarks.bench_firms_micro import GENERATORS, cases, compare, run
+from benchmarks.synthetic_firms import to_csv
+
+ROWS = 5_000
+BASELINE = Path(__file__).parent / "baselines" / "firms_micro.json"
+TOLERANCE = float(os.environ.get("FIRMS_BENCH_TOLERANCE", "1.0"))
+
+pytestmark = pytest.mark.benchmark
+
+@pytest.fixture(scope="module")
+def timings():
+    return run([ROWS], ROWS, None)
+
+def test_no_stage_is_slower_than_the_baseline(timings):
+    if os.environ.get("FIRMS_BENCH_SAVE"):
+        BASELINE.write_text(json.dumps(timings, indent=2) + "\n", encoding="utf-8")
+        pytest.skip(f"Línea base guardada en {BASELINE}")
+    baseline = json.loads(BASELINE.read_text(encoding="utf-8"))
+    assert set(baseline) == set(timings), "La línea base no tiene los mismos casos: regenerarla"
+    assert compare(timings, baseline, TOLERANCE) == []
+
+@pytest.fixture(scope="module")
+def instrument_cases():
+    """Los casos del benchmark por instrumento, con los mismos datos que usa run()."""
+    result = {}
+    for instrument, generator in GENERATORS.items():
+        text = to_csv(generator(ROWS, seed=ROWS))
+        raw = pd.read_csv(StringIO(text))
+        result[instrument] = cases(text, raw, _transform_detections(raw))
+    return result
+
+def best_of_interleaved(*funcs: Callable[[], object], repeats: int = 9) -> List[float]:
+    """
+    Mejor tiempo de cada función, alternándolas y sin el recolector de basura: las dos
+    etapas comparadas sufren el mismo ruido (otros tests, hilos de fondo) y ninguna paga
+    una colección disparada por la otra.
+    """
+    best = [float("inf")] * len(funcs)
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            for i, func in enumerate(funcs):
+                start = time.perf_counter()
+                func()
+                best[i] = min(best[i], time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+def assert_faster(fast: Callable[[], object], slow: Callable[[], object], attempts: int = 3) -> None:
+    """Falla si `fast` no le gana a `slow` en ninguno de los intentos (una carga pasajera de la máquina no alcanza)."""
+    for _ in range(attempts):
+        fast_seconds, slow_seconds = best_of_interleaved(fast, slow)
+        if fast_seconds < slow_seconds:
+            return
+    pytest.fail(f"{fast_seconds * 1000:.1f} ms no es menor que {slow_seconds * 1000:.1f} ms en {attempts} intentos")
+
+@pytest.mark.parametrize("instrument", list(GENERATORS))
+def test_construction_is_faster_than_row_validation(instrument_cases, instrument):
+    # to_api_response llegó a ser más lento que validar fila por fila (to_dict("records"))
+    assert_faster(instrument_cases[instrument]["construccion"], instrument_cases[instrument]["validacion"])
+
+@pytest.mark.parametrize("instrument", list(GENERATORS))
+def test_vectorized_transform_beats_the_row_helpers(instrument_cases, instrument):
+    assert_faster(instrument_cases[instrument]["transformacion"], instrument_cases[instrument]["helpers"])
+
+@pytest.mark.parametrize("instrument", list(GENERATORS))
+def test_json_body_is_cheaper_than_building_models(instrument_cases, instrument):
+    # El cuerpo de /firms/ sale de las columnas, sin un objeto por foco
+    assert_faster(instrument_cases[instrument]["json"], instrument_cases[instrument]["construccion"])
@@ -0,0 +1,68 @@
+"""
+Entorno de los tests: una instalación de prueba (SQLite temporal, sin poller ni warm-up de
+GEE), el stand-in local de FIRMS y el `ee` simulado. Se configura al cargar este archivo,
+antes de que algún test importe `app` (la configuración se lee al importarla).
+"""
+import os
+import tempfile
+
+import pytest
+
+from benchmarks import gee_stub
+from benchmarks.firms_standin import start_standin
+
+_tmp = tempfile.mkdtemp()
+_credentials = os.path.join(_tmp, "service-account.json")
+with open(_credentials, "w") as f:
+    f.write("{}")
+_standin, _standin_url = start_standin()
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_tmp, 'tests.db')}",
+    "FIRMS_BASE_URL": _standin_url,
+    "FIRMS_ARCHIVE_DIR": os.path.join(_tmp, "archivo"),
+    "FIRMS_POLLER_ENABLED": "false",
+    "GEE_CREDENTIAL_PATH": _credentials,
+    "GEE_WARMUP_ENABLED": "false",
+})
+for _var in ("SECRET_KEY", "FIRMS_API_KEY", "GEE_SERVICE_ACCOUNT_EMAIL", "GEE_API_KEY"):
+    os.environ.setdefault(_var, "test")
+
+# Ningún test habla con Earth Engine real
+_gee_stub = gee_stub.install()
+
+@pytest.fixture
+def firms_standin():
+    """Stand-in de FIRMS compartido; cada test fija su latencia y se restablece al terminar."""
+    yield _standin
+    _standin.latency = 0.0
+
+@pytest.fixture
+def ee_stub():
+    """
+    `ee` simulado con latencia baja y contadores en cero, y GEE desde cero: sin inicializar,
+    sin caches en memoria y sin compuestos, días de fuego ni trabajos guardados.
+    """
+    from app.db.models import Base
+    from app.db.models.gee import GeeFireDay, GeeJob, GeeNdviComposite
+    from app.db.session import SessionLocal, engine
+    from app.services.gee import GEEService, _fire_series_cache, _unpublished, nbr_cache
+
+    _gee_stub.latency = 0.01
+    _gee_stub.slow_latency = 0.01
+    _gee_stub.published_until = "9999-12-31"
+    for name in _gee_stub.counters:
+        _gee_stub.counters[name] = 0
+    GEEService._initialized = False
+    GEEService._corrientes_geometry = None
+    for cache in (nbr_cache, _fire_series_cache, _unpublished):
+        cache.clear()
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for model in (GeeNdviComposite, GeeFireDay, GeeJob):
+            db.query(model).delete()
+        db.commit()
+    finally:
+        db.close()
+    return _gee_stub
@@ -0,0 +1,49 @@
+"""
+Ventanas de los períodos y chequeo de archivado en UTC: cerca de la medianoche, la hora
+local de Argentina (UTC-3) todavía está en el día anterior al del store y del poller.
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import app.services.firms as firms_module
+from app.schemas.firms import TimePeriod
+from app.services.firms import FIRMSService
+
+# 1 de enero, 01:30 UTC: en Corrientes todavía son las 22:30 del 31 de diciembre
+UTC_NOW = datetime(2025, 1, 1, 1, 30)
+LOCAL_NOW = UTC_NOW - timedelta(hours=3)
+
+class FrozenClock(datetime):
+    @classmethod
+    def utcnow(cls):
+        return UTC_NOW
+
+    @classmethod
+    def now(cls, tz=None):
+        return LOCAL_NOW
+
+@pytest.fixture
+def frozen_clock(monkeypatch):
+    monkeypatch.setattr(firms_module, "datetime", FrozenClock)
+
+def test_windows_are_computed_in_utc(frozen_clock):
+    service = FIRMSService()
+
+    assert service.get_date_range(TimePeriod.LAST_24H) == (UTC_NOW - timedelta(days=1), UTC_NOW)
+    assert service.get_date_range(TimePeriod.CURRENT) == (datetime(2025, 1, 1), UTC_NOW)
+    assert service.get_date_range(TimePeriod.PREVIOUS) == (datetime(2024, 1, 1), datetime(2024, 12, 31))
+
+def test_a_period_is_archivable_once_its_utc_day_is_over(frozen_clock, monkeypatch):
+    synced = {}
+    monkeypatch.setattr(firms_module.firms_store, "get_synced_through", lambda db, source, bbox: synced.get(source))
+    service = FIRMSService()
+    sources = service.get_sources(TimePeriod.PREVIOUS)
+    end = datetime(2024, 12, 31)
+
+    # El 31 de diciembre ya terminó en UTC, pero falta sincronizarlo
+    assert not service._is_archivable(None, sources, end)
+    synced.update({source: date(2024, 12, 31) for source in sources})
+    assert service._is_archivable(None, sources, end)
+    # El día UTC en curso nunca se archiva
+    assert not service._is_archivable(None, sources, UTC_NOW)
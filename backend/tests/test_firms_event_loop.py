@@ -0,0 +1,44 @@
+"""
+Una descarga lenta de FIRMS no debe bloquear el event loop: mientras el cliente async
+espera al stand-in, /firms/ y las demás rutas siguen respondiendo.
+"""
+import asyncio
+import time
+from datetime import date
+
+import httpx
+
+from app.main import app
+from app.services.firms import FIRMSService
+from app.services.firms_client import firms_client
+
+UPSTREAM_LATENCY = 1.0
+MAX_PROBE_LATENCY = 0.25  # Muy por debajo de la latencia de la descarga en curso
+
+async def _scenario():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        fetch = asyncio.create_task(FIRMSService().fetch_window("VIIRS_SNPP_NRT", date(2024, 1, 1), 10))
+        fires = [asyncio.create_task(client.get("/api/v1/firms/", params={"period": "24h"})) for _ in range(5)]
+        await asyncio.sleep(0.1)  # Que la descarga ya esté esperando al stand-in
+
+        probes = []
+        while not fetch.done():
+            started = time.perf_counter()
+            response = await client.get("/")
+            probes.append((response.status_code, time.perf_counter() - started))
+            await asyncio.sleep(0.02)
+        detections = await fetch
+        fire_responses = await asyncio.gather(*fires)
+    await firms_client.aclose()  # El pool de conexiones queda ligado a este event loop
+    return detections, fire_responses, probes
+
+def test_routes_answer_while_firms_fetch_in_flight(firms_standin):
+    firms_standin.latency = UPSTREAM_LATENCY
+    detections, fire_responses, probes = asyncio.run(_scenario())
+
+    assert not detections.empty
+    assert [response.status_code for response in fire_responses] == [200] * len(fire_responses)
+    # Con el loop bloqueado habría una sola sonda, que tardaría lo que la descarga
+    assert len(probes) >= 10
+    assert all(status == 200 for status, _ in probes)
+    assert max(latency for _, latency in probes) < MAX_PROBE_LATENCY
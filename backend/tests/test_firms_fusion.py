@@ -0,0 +1,126 @@
+"""
+Fusión de fuentes FIRMS: match_nearby contra un emparejamiento goloso por fuerza bruta
+sobre conjuntos sintéticos chicos, y fuse_sources sobre CSVs crudos armados a mano.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.services.firms import fuse_sources
+from app.utils.geospatial import KM_PER_DEGREE, match_nearby
+
+DISTANCE_KM = 1.0
+TOLERANCE_MINUTES = 60.0
+
+def brute_force_matches(anchor, point, distance_km, tolerance_minutes):
+    """Todos los pares dentro del radio, ordenados por distancia normalizada y tomados si ambos extremos siguen libres."""
+    cos_lat = math.cos(math.radians(np.mean(np.concatenate([anchor[0], point[0]]))))
+    candidates = []
+    for p in range(len(point[0])):
+        for a in range(len(anchor[0])):
+            distance = KM_PER_DEGREE * math.hypot(point[0][p] - anchor[0][a], (point[1][p] - anchor[1][a]) * cos_lat)
+            gap = abs(point[2][p] - anchor[2][a])
+            if distance <= distance_km and gap <= tolerance_minutes:
+                candidates.append((distance / distance_km + gap / tolerance_minutes, p, a))
+    used_points, used_anchors, pairs = set(), set(), set()
+    for _, p, a in sorted(candidates):
+        if p not in used_points and a not in used_anchors:
+            used_points.add(p)
+            used_anchors.add(a)
+            pairs.add((p, a))
+    return pairs
+
+def random_detections(rng, n):
+    # Un área chica (~5 km x 5 km, 4 horas) para que haya muchos candidatos por punto
+    return rng.uniform(-28.0, -27.95, n), rng.uniform(-58.0, -57.95, n), rng.uniform(0, 240, n)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_match_nearby_matches_the_brute_force_greedy(seed):
+    rng = np.random.default_rng(seed)
+    anchor = random_detections(rng, int(rng.integers(1, 60)))
+    point = random_detections(rng, int(rng.integers(1, 60)))
+
+    points, anchors = match_nearby(*anchor, *point, distance_km=DISTANCE_KM, tolerance_minutes=TOLERANCE_MINUTES)
+
+    assert set(zip(points.tolist(), anchors.tolist())) == brute_force_matches(anchor, point, DISTANCE_KM, TOLERANCE_MINUTES)
+    assert len(set(points.tolist())) == len(points) and len(set(anchors.tolist())) == len(anchors)
+
+def test_a_point_falls_back_to_the_next_free_anchor():
+    # Los dos puntos tienen como mejor ancla a la 0; el más lejano pasa a la 1, que también está en el radio
+    step = 0.3 / KM_PER_DEGREE  # 300 m en latitud
+    anchor = (np.array([-28.0, -28.0 + 3 * step]), np.array([-58.0, -58.0]), np.array([0.0, 0.0]))
+    point = (np.array([-28.0 + step, -28.0 + 1.6 * step]), np.array([-58.0, -58.0]), np.array([0.0, 0.0]))
+
+    points, anchors = match_nearby(*anchor, *point, distance_km=DISTANCE_KM, tolerance_minutes=TOLERANCE_MINUTES)
+
+    assert set(zip(points.tolist(), anchors.tolist())) == {(0, 0), (1, 1)}
+
+def test_match_nearby_without_candidates():
+    anchor = (np.array([-28.0]), np.array([-58.0]), np.array([0.0]))
+    far = (np.array([-27.0]), np.array([-58.0]), np.array([0.0]))
+    late = (np.array([-28.0]), np.array([-58.0]), np.array([TOLERANCE_MINUTES + 1]))
+    empty = (np.empty(0), np.empty(0), np.empty(0))
+
+    for point in (far, late, empty):
+        points, anchors = match_nearby(*anchor, *point, distance_km=DISTANCE_KM, tolerance_minutes=TOLERANCE_MINUTES)
+        assert len(points) == len(anchors) == 0
+
+def firms_csv(rows, **extra):
+    """DataFrame con las columnas del CSV de área: (lat, lon, acq_date, acq_time) por fila."""
+    lat, lon, acq_date, acq_time = zip(*rows)
+    return pd.DataFrame({"latitude": lat, "longitude": lon, "acq_date": acq_date, "acq_time": acq_time, **extra})
+
+def test_fuse_sources_collapses_the_same_fire_seen_by_other_sensors():
+    near = 0.3 / KM_PER_DEGREE
+    snpp = firms_csv([(-28.0, -58.0, "2024-09-01", 1700), (-27.0, -57.0, "2024-09-01", 1700)], bright_ti4=[330.0, 340.0])
+    noaa20 = firms_csv([
+        (-28.0 + near, -58.0, "2024-09-01", 1750),  # El primer fuego, 300 m y 50 minutos después
+        (-27.5, -57.5, "2024-09-01", 1750),         # Un fuego que S-NPP no vio
+        (-27.0, -57.0, "2024-09-02", 1700),         # Mismo lugar que el segundo, un día después
+    ], bright_ti4=[331.0, 335.0, 341.0])
+    modis = firms_csv([(-28.0, -58.0 + near, "2024-09-01", 1730)], brightness=[320.0])
+
+    fused = fuse_sources([("VIIRS_SNPP_NRT", snpp), ("VIIRS_NOAA20_NRT", noaa20), ("MODIS_NRT", modis)])
+
+    assert len(fused) == 4
+    # Se conserva la fila de la fuente de mayor prioridad y se suman los sensores que lo vieron
+    assert fused["bright_ti4"].tolist()[:2] == [330.0, 340.0]
+    assert fused["sensores"].tolist() == [
+        ["VIIRS S-NPP", "VIIRS NOAA-20", "MODIS"], ["VIIRS S-NPP"], ["VIIRS NOAA-20"], ["VIIRS NOAA-20"],
+    ]
+    # Las columnas de una fuente sin filas nuevas (brightness de MODIS) no se agregan
+    assert fused.columns.tolist() == ["latitude", "longitude", "acq_date", "acq_time", "bright_ti4", "sensores"]
+
+def test_fuse_sources_matches_each_fire_once_with_fallback():
+    # Dos detecciones de NOAA-20 cerca del primer fuego de S-NPP; la segunda está también cerca del
+    # otro fuego y se fusiona con él en lugar de quedar como un foco nuevo
+    step = 0.3 / KM_PER_DEGREE
+    snpp = firms_csv([(-28.0, -58.0, "2024-09-01", 1700), (-28.0 + 3 * step, -58.0, "2024-09-01", 1700)])
+    noaa20 = firms_csv([(-28.0 + step, -58.0, "2024-09-01", 1700), (-28.0 + 1.6 * step, -58.0, "2024-09-01", 1700)])
+
+    fused = fuse_sources([("VIIRS_SNPP_NRT", snpp), ("VIIRS_NOAA20_NRT", noaa20)])
+
+    assert fused["sensores"].tolist() == [["VIIRS S-NPP", "VIIRS NOAA-20"]] * 2
+
+def test_fuse_sources_keeps_rows_it_cannot_place():
+    snpp = firms_csv([(-28.0, -58.0, "2024-09-01", 1700)])
+    # Sin coordenadas o con una hora inválida no se pueden comparar: se agregan como focos propios
+    noaa20 = firms_csv([(np.nan, -58.0, "2024-09-01", 1700), (-28.0, -58.0, "2024-09-01", 9999)])
+
+    fused = fuse_sources([("VIIRS_SNPP_NRT", snpp), ("VIIRS_NOAA20_NRT", noaa20)])
+
+    assert fused["sensores"].tolist() == [["VIIRS S-NPP"], ["VIIRS NOAA-20"], ["VIIRS NOAA-20"]]
+
+def test_fuse_sources_skips_empty_frames():
+    snpp = firms_csv([(-28.0, -58.0, "2024-09-01", 1700)])
+
+    assert fuse_sources([]).empty
+    assert fuse_sources([("VIIRS_SNPP_NRT", pd.DataFrame()), ("MODIS_NRT", pd.DataFrame())]).empty
+    fused = fuse_sources([("VIIRS_NOAA20_NRT", pd.DataFrame()), ("VIIRS_SNPP_NRT", snpp)])
+    assert fused["sensores"].tolist() == [["VIIRS S-NPP"]]
+
+def test_fusion_settings_are_the_ones_the_tests_assume():
+    assert (settings.FIRMS_FUSION_DISTANCE_KM, settings.FIRMS_FUSION_MINUTES) == (DISTANCE_KM, TOLERANCE_MINUTES)
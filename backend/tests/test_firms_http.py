@@ -0,0 +1,145 @@
+"""
+Cabeceras HTTP de /firms/: ETag e If-None-Match (304) por codificación y en los tiles,
+Age con stale-while-revalidate (el dato obsoleto se sirve sin esperar al refresco) y la
+serialización de las vistas del mapa fuera del event loop.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+import app.services.firms as firms_module
+from app.api.v1.endpoints import firms as firms_endpoints
+from app.core.config import settings
+from app.db.base_class import Base
+from app.db.models.fire_detection import FireDetection
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.schemas.firms import TimePeriod
+from app.services.firms import FIRMSService, firms_cache
+from app.services.firms_store import firms_store
+from benchmarks.synthetic_firms import generate_viirs
+
+API = "/api/v1/firms"
+
+@pytest.fixture
+def stored_fires():
+    """Detecciones de los últimos días en el store y el cache de /firms/ vacío."""
+    Base.metadata.create_all(bind=engine)
+    source = FIRMSService.SOURCES["recent"][0]
+    db = SessionLocal()
+    try:
+        firms_store.save_detections(db, generate_viirs(500, seed=0, start=datetime.utcnow().date() - timedelta(days=5), days=5), source)
+    finally:
+        db.close()
+    firms_cache.clear()
+    yield
+    firms_cache.clear()
+    db = SessionLocal()
+    try:
+        db.query(FireDetection).delete()
+        db.commit()
+    finally:
+        db.close()
+
+def client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+def test_etag_revalidation_per_encoding(stored_fires):
+    async def scenario():
+        async with client() as http:
+            params = {"period": "week"}
+            gzip = await http.get(f"{API}/", params=params, headers={"Accept-Encoding": "gzip"})
+            identity = await http.get(f"{API}/", params=params, headers={"Accept-Encoding": "identity"})
+            revalidated = await http.get(f"{API}/", params=params, headers={"Accept-Encoding": "gzip", "If-None-Match": gzip.headers["etag"]})
+            listed = await http.get(f"{API}/", params=params, headers={"Accept-Encoding": "gzip", "If-None-Match": f'"otro", {gzip.headers["etag"]}'})
+            wildcard = await http.get(f"{API}/", params=params, headers={"If-None-Match": "*"})
+            # El ETag de gzip no valida la representación sin comprimir
+            mismatch = await http.get(f"{API}/", params=params, headers={"Accept-Encoding": "identity", "If-None-Match": gzip.headers["etag"]})
+            return gzip, identity, revalidated, listed, wildcard, mismatch
+
+    gzip, identity, revalidated, listed, wildcard, mismatch = asyncio.run(scenario())
+
+    assert gzip.status_code == 200 and gzip.headers["content-encoding"] == "gzip" and gzip.headers["vary"] == "Accept-Encoding"
+    assert gzip.json()["resumen"]["cantidad_focos"] > 0
+    assert identity.headers["etag"] != gzip.headers["etag"]
+    assert (revalidated.status_code, revalidated.content) == (304, b"")
+    assert revalidated.headers["etag"] == gzip.headers["etag"] and "age" in revalidated.headers
+    assert listed.status_code == 304 and wildcard.status_code == 304
+    assert mismatch.status_code == 200 and mismatch.content == identity.content
+
+def test_tile_etag_revalidation(stored_fires):
+    async def scenario():
+        async with client() as http:
+            url = f"{API}/tiles/week/5/10/18.mvt"
+            first = await http.get(url)
+            again = await http.get(url, headers={"If-None-Match": first.headers["etag"]})
+            return first, again
+
+    first, again = asyncio.run(scenario())
+
+    assert first.status_code == 200 and len(first.content) > 0
+    assert (again.status_code, again.content, again.headers["etag"]) == (304, b"", first.headers["etag"])
+
+def backdate(period: TimePeriod, seconds: float) -> None:
+    """Envejece el dataset cacheado del período y sus vistas por región."""
+    dataset = firms_cache[period]
+    dataset.fetched_at -= seconds
+    for view in dataset.regions.values():
+        view.fetched_at -= seconds
+
+def test_stale_data_is_served_with_its_age_while_it_refreshes(stored_fires, monkeypatch):
+    build = FIRMSService._build_dataset
+
+    def slow_build(self, period):
+        time.sleep(0.5)
+        return build(self, period)
+
+    async def scenario():
+        async with client() as http:
+            params = {"period": "week"}
+            fresh = await http.get(f"{API}/", params=params)
+            monkeypatch.setattr(FIRMSService, "_build_dataset", slow_build)
+            backdate(TimePeriod.LAST_WEEK, settings.FIRMS_CACHE_SOFT_TTL + 60)
+            stale_hits = firms_cache.stale_hits
+
+            started = time.perf_counter()
+            stale = await http.get(f"{API}/", params=params)
+            stale_elapsed = time.perf_counter() - started
+            await asyncio.gather(*firms_module._refresh_tasks)
+            refreshed = await http.get(f"{API}/", params=params)
+            return fresh, stale, stale_elapsed, firms_cache.stale_hits - stale_hits, refreshed
+
+    fresh, stale, stale_elapsed, stale_hits, refreshed = asyncio.run(scenario())
+
+    assert int(fresh.headers["age"]) < 5
+    # El dato obsoleto sale enseguida, con su antigüedad real, y el refresco corre aparte
+    assert stale.status_code == 200 and stale_elapsed < 0.4
+    assert int(stale.headers["age"]) >= settings.FIRMS_CACHE_SOFT_TTL and stale_hits == 1
+    assert stale.headers["etag"] == fresh.headers["etag"]
+    assert int(refreshed.headers["age"]) < 5
+
+def test_viewport_responses_are_serialized_off_the_event_loop(stored_fires, monkeypatch):
+    threads = []
+    serialize = firms_endpoints.firms_service.get_viewport_json
+
+    def recording(*args):
+        threads.append(threading.current_thread())
+        return serialize(*args)
+
+    monkeypatch.setattr(firms_endpoints.firms_service, "get_viewport_json", recording)
+
+    async def scenario():
+        async with client() as http:
+            focos = await http.get(f"{API}/", params={"period": "week", "bbox": "-60,-31,-55,-26"})
+            clusters = await http.get(f"{API}/", params={"period": "week", "zoom": 4})
+            return focos, clusters
+
+    focos, clusters = asyncio.run(scenario())
+
+    assert focos.status_code == 200 and len(focos.json()["focos"]) > 0
+    assert clusters.status_code == 200 and clusters.json()["zoom"] == 4 and "age" in clusters.headers
+    assert len(threads) == 2 and threading.main_thread() not in threads
@@ -0,0 +1,123 @@
+"""
+Pool de Earth Engine: run_gee ejecuta como mucho `max_workers` llamadas a la vez, encola
+hasta `max_queued` más, rechaza el resto con 503 y warm_up_gee inicializa GEE una sola vez.
+Los trabajos encolados usan un pool aparte, con su propio plazo.
+"""
+import asyncio
+import threading
+import time
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.gee import (
+    GEEService, _ee_deadline, gee_executor, gee_job_executor, gee_service, run_gee, use_job_pool, warm_up_gee,
+)
+
+CALL_SECONDS = 0.2
+
+class BlockingCall:
+    """Llamada bloqueante de duración fija que registra cuándo empieza cada ejecución y cuántas corren a la vez."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.started = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self) -> None:
+        with self._lock:
+            self.started.append(time.perf_counter())
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.seconds)
+        with self._lock:
+            self.active -= 1
+
+async def _run_concurrently(call: BlockingCall, count: int) -> list:
+    return await asyncio.gather(*(run_gee(call) for _ in range(count)), return_exceptions=True)
+
+def test_run_gee_overlaps_up_to_the_pool_size():
+    call = BlockingCall(CALL_SECONDS)
+    workers = gee_executor.max_workers
+
+    started = time.perf_counter()
+    results = asyncio.run(_run_concurrently(call, workers))
+    elapsed = time.perf_counter() - started
+
+    assert results == [None] * workers
+    assert call.peak == workers
+    # Corrieron juntas: el total es cercano a una llamada, no a `workers` en serie
+    assert elapsed < 2 * CALL_SECONDS
+    assert gee_executor.pending == 0
+
+def test_run_gee_queues_the_excess_and_rejects_past_the_queue():
+    call = BlockingCall(CALL_SECONDS)
+    workers, queued, overflow = gee_executor.max_workers, gee_executor.max_queued, 3
+    rejected_before = gee_executor.rejected
+
+    results = asyncio.run(_run_concurrently(call, workers + queued + overflow))
+
+    rejected = [r for r in results if isinstance(r, HTTPException)]
+    assert [r.status_code for r in rejected] == [503] * overflow
+    assert gee_executor.rejected - rejected_before == overflow
+    # Las encoladas se ejecutaron todas, sin pasar nunca del tamaño del pool
+    assert results.count(None) == workers + queued
+    assert len(call.started) == workers + queued
+    assert call.peak == workers
+    # y cada una empezó recién cuando se liberó un hilo
+    starts = sorted(call.started)
+    assert starts[workers - 1] - starts[0] < CALL_SECONDS / 2
+    assert starts[workers] - starts[0] >= CALL_SECONDS * 0.9
+    assert gee_executor.pending == 0
+
+def test_warm_up_gee_initializes_once(ee_stub):
+    ee_stub.latency = CALL_SECONDS  # Que los llamadores concurrentes se crucen durante ee.Initialize
+
+    async def scenario():
+        await asyncio.gather(
+            *(warm_up_gee() for _ in range(3)),
+            *(run_gee(gee_service._ensure_initialized) for _ in range(3)),
+        )
+        await warm_up_gee()
+
+    asyncio.run(scenario())
+
+    assert ee_stub.counters["initialize"] == 1
+    assert GEEService._initialized
+    assert GEEService._corrientes_geometry is not None
+
+def test_jobs_use_their_own_pool_and_deadline():
+    release = threading.Event()
+
+    def thread_deadline():
+        return threading.current_thread().name, _ee_deadline.seconds
+
+    async def scenario():
+        async def job_call(func):
+            use_job_pool()
+            return await run_gee(func)
+
+        # Pool de trabajos lleno (hilos y cola) con llamadas que no terminan hasta `release`
+        blocked = [
+            asyncio.create_task(job_call(release.wait))
+            for _ in range(gee_job_executor.max_workers + gee_job_executor.max_queued)
+        ]
+        await asyncio.sleep(0.05)
+        try:
+            rejected = await asyncio.gather(job_call(thread_deadline), return_exceptions=True)
+            # Los endpoints no compiten con los trabajos por hilos
+            sync = await asyncio.wait_for(run_gee(thread_deadline), 1.0)
+        finally:
+            release.set()
+        await asyncio.gather(*blocked)
+        job = await job_call(thread_deadline)
+        return rejected[0], sync, job
+
+    rejected, sync, job = asyncio.run(scenario())
+
+    assert isinstance(rejected, HTTPException) and rejected.status_code == 503
+    assert sync == (sync[0], settings.GEE_CALL_TIMEOUT) and sync[0].startswith("gee_")
+    assert job == (job[0], settings.GEE_JOB_TIMEOUT) and job[0].startswith("gee-jobs_")
+    assert gee_executor.pending == 0 and gee_job_executor.pending == 0
@@ -0,0 +1,57 @@
+"""
+Serie histórica de fuego: los días que faltan se piden a GEE en tramos por año calendario
+(un getInfo() por tramo), los días guardados no se vuelven a pedir y los requests
+idénticos simultáneos comparten un solo cálculo.
+"""
+import asyncio
+from datetime import date, timedelta
+
+from app.services.gee import _fire_series_cache, gee_service, gee_singleflight, yearly_chunks
+
+def _days(start: date, end: date):
+    return [start + timedelta(days=i) for i in range((end - start).days)]
+
+def test_yearly_chunks_split_on_calendar_years():
+    days = _days(date(2019, 12, 30), date(2021, 1, 3))
+    chunks = yearly_chunks(days)
+    assert [(chunk[0], chunk[-1]) for chunk in chunks] == [
+        (date(2019, 12, 30), date(2019, 12, 31)),
+        (date(2020, 1, 1), date(2020, 12, 31)),
+        (date(2021, 1, 1), date(2021, 1, 2)),
+    ]
+    assert sum(len(chunk) for chunk in chunks) == len(days)
+    # Días salteados (ya guardados en medio del rango) no abren tramos nuevos
+    assert len(yearly_chunks([date(2020, 1, 5), date(2020, 7, 1), date(2021, 3, 1)])) == 2
+
+def test_stored_days_are_not_requested_again(ee_stub):
+    first = asyncio.run(gee_service.get_historical_fire_data("2019-12-30", "2021-01-03"))
+    assert ee_stub.counters["getInfo"] == 3  # 2019, 2020 y 2021
+    assert ee_stub.counters["composites"] == 370
+    assert first.summary.total_days_analyzed == 370
+    assert first.daily_data[0].date == "2019-12-30" and first.daily_data[-1].date == "2021-01-02"
+
+    # Se superpone con el anterior: sólo los días de 2021 que faltan, en un tramo
+    second = asyncio.run(gee_service.get_historical_fire_data("2020-06-01", "2021-03-01"))
+    assert ee_stub.counters["getInfo"] == 4
+    assert ee_stub.counters["composites"] == 370 + len(_days(date(2021, 1, 3), date(2021, 3, 1)))
+    assert second.summary.total_days_analyzed == len(_days(date(2020, 6, 1), date(2021, 3, 1)))
+    overlap = {d.date: d.fire_pixel_count for d in first.daily_data if d.date >= "2020-06-01"}
+    assert {d.date: d.fire_pixel_count for d in second.daily_data if d.date in overlap} == overlap
+
+    # Todo guardado: sin round trips aunque la serie no esté en el cache en memoria
+    _fire_series_cache.clear()
+    asyncio.run(gee_service.get_historical_fire_data("2020-01-01", "2021-01-01"))
+    assert ee_stub.counters["getInfo"] == 4
+
+def test_identical_concurrent_requests_share_one_computation(ee_stub):
+    ee_stub.latency = 0.2
+    coalesced = gee_singleflight.coalesced
+
+    async def scenario():
+        return await asyncio.gather(*(gee_service.get_historical_fire_data("2018-01-01", "2020-01-01") for _ in range(5)))
+
+    responses = asyncio.run(scenario())
+
+    assert ee_stub.counters["getInfo"] == 2  # Un tramo por año, una sola vez
+    assert gee_singleflight.coalesced - coalesced == 4
+    assert all(response == responses[0] for response in responses)
@@ -0,0 +1,240 @@
+"""
+Cola de trabajos de GEE contra el `ee` simulado: deduplicación de envíos idénticos,
+endpoints de estado, resultado y eventos, reencolado con el pool saturado, vencimiento
+de resultados y recuperación de trabajos de un proceso caído (leases).
+"""
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.db.models.gee import GeeJob
+from app.db.session import SessionLocal
+from app.main import app
+from app.services.gee_jobs import (
+    FAILED, JOB_HANDLERS, JOB_MAX_ATTEMPTS, PENDING, RUNNING, SUCCEEDED, GEEJobQueue, gee_jobs,
+)
+
+API = "/api/v1/gee"
+AREA = {"type": "Polygon", "coordinates": [[[-57.3, -28.6], [-57.1, -28.6], [-57.1, -28.4], [-57.3, -28.6]]]}
+NBR_PARAMS = {"pre_fire_date": "2024-08-01", "post_fire_date": "2024-10-01", "asincronico": "true"}
+NDVI_PARAMS = {"start_date": "2020-01-01", "end_date": "2020-03-01", "asincronico": "true"}
+
+@pytest.fixture
+def queue(ee_stub, monkeypatch):
+    """La cola del módulo, con tiempos cortos para que los tests terminen rápido."""
+    monkeypatch.setattr(gee_jobs, "poll_seconds", 0.05)
+    monkeypatch.setattr(gee_jobs, "lease_seconds", 0.3)
+    monkeypatch.setattr(gee_jobs, "result_ttl", 60)
+    return gee_jobs
+
+@asynccontextmanager
+async def running(queue: GEEJobQueue, run_workers: bool = True):
+    await queue.start(run_workers=run_workers)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        await queue.stop()
+
+async def wait_for_status(client: httpx.AsyncClient, job: dict, statuses, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        current = (await client.get(job["status_url"])).json()
+        if current["status"] in statuses:
+            return current
+        assert time.monotonic() < deadline, f"el trabajo quedó en {current['status']}"
+        await asyncio.sleep(0.02)
+
+def stored_job(job_id: str) -> GeeJob:
+    db = SessionLocal()
+    try:
+        return db.get(GeeJob, job_id)
+    finally:
+        db.close()
+
+def insert_running(worker_id: str, lease_expires_at: datetime) -> str:
+    """Trabajo NDVI en ejecución a cargo de otro proceso, como lo deja un claim."""
+    job = GeeJob(
+        id=f"otro{int(time.time() * 1e6)}"[:32], kind="ndvi", dedup_key=f"ndvi:{worker_id}",
+        params=json.dumps({"start_date": "2020-01-01", "end_date": "2020-03-01"}), status=RUNNING, attempts=1,
+        created_at=datetime.utcnow(), started_at=datetime.utcnow(), worker_id=worker_id, lease_expires_at=lease_expires_at,
+    )
+    db = SessionLocal()
+    try:
+        db.add(job)
+        db.commit()
+        return job.id
+    finally:
+        db.close()
+
+def test_identical_submissions_share_one_job(queue, ee_stub):
+    ee_stub.latency = 0.2
+
+    async def scenario():
+        async with running(queue) as client:
+            submissions = await asyncio.gather(*(
+                client.post(f"{API}/nbr-analysis", params=NBR_PARAMS, json=AREA) for _ in range(10)
+            ))
+            job = submissions[0].json()
+            events = asyncio.create_task(client.get(job["events_url"]))
+            pending_result = await client.get(job["result_url"])
+            final = await wait_for_status(client, job, (SUCCEEDED,))
+            result = await client.get(job["result_url"])
+            sync = await client.post(f"{API}/nbr-analysis", params={**NBR_PARAMS, "asincronico": "false"}, json=AREA)
+            return submissions, pending_result, final, result, sync, (await events).text
+
+    submissions, pending_result, final, result, sync, events = asyncio.run(scenario())
+
+    assert {r.status_code for r in submissions} == {202}
+    assert len({r.json()["job_id"] for r in submissions}) == 1
+    assert submissions[0].headers["location"] == submissions[0].json()["status_url"]
+    assert queue.deduplicated["nbr"] >= 9
+    # Un solo ee.Dictionary.getInfo() para los diez envíos (el sincrónico sale del cache)
+    assert ee_stub.counters["getInfo"] == 1
+    assert pending_result.status_code == 202 and pending_result.json()["status"] in (PENDING, RUNNING)
+    assert final["status"] == SUCCEEDED and final["expires_at"] is not None
+    assert result.status_code == 200
+    body, expected = result.json(), sync.json()
+    body["metadata"].pop("processing_date"), expected["metadata"].pop("processing_date")
+    assert body == expected
+    statuses = [json.loads(line[6:])["status"] for line in events.splitlines() if line.startswith("data: ")]
+    assert statuses[-1] == SUCCEEDED and statuses == sorted(set(statuses), key=statuses.index)
+
+def test_unknown_job_is_404(queue):
+    async def scenario():
+        async with running(queue, run_workers=False) as client:
+            return [(await client.get(f"{API}/jobs/inexistente{suffix}")).status_code for suffix in ("", "/result", "/events")]
+
+    assert asyncio.run(scenario()) == [404, 404, 404]
+
+def test_saturated_pool_requeues_until_it_succeeds(queue, monkeypatch):
+    calls = []
+
+    async def flaky(params):
+        calls.append(time.monotonic())
+        if len(calls) < 3:
+            raise HTTPException(status_code=503, detail="Earth Engine está saturado")
+        return [{"date": "2020-01-01", "mean_ndvi": 0.5}]
+
+    monkeypatch.setitem(JOB_HANDLERS, "ndvi", flaky)
+    requeued_before = queue.requeued
+
+    async def scenario():
+        async with running(queue) as client:
+            job = (await client.get(f"{API}/ndvi-stats", params=NDVI_PARAMS)).json()
+            final = await wait_for_status(client, job, (SUCCEEDED, FAILED))
+            return final, (await client.get(job["result_url"])).json()
+
+    final, result = asyncio.run(scenario())
+
+    assert final["status"] == SUCCEEDED
+    assert result == [{"date": "2020-01-01", "mean_ndvi": 0.5}]
+    assert len(calls) == 3 and queue.requeued - requeued_before == 2
+    assert stored_job(final["job_id"]).attempts == 3
+
+def test_saturated_pool_fails_after_max_attempts(queue, monkeypatch):
+    attempts = []
+
+    async def saturated(params):
+        attempts.append(1)
+        raise HTTPException(status_code=503, detail="Earth Engine está saturado")
+
+    monkeypatch.setitem(JOB_HANDLERS, "ndvi", saturated)
+
+    async def scenario():
+        async with running(queue) as client:
+            job = (await client.get(f"{API}/ndvi-stats", params=NDVI_PARAMS)).json()
+            final = await wait_for_status(client, job, (SUCCEEDED, FAILED))
+            return final, await client.get(job["result_url"])
+
+    final, result = asyncio.run(scenario())
+
+    assert final["status"] == FAILED and len(attempts) == JOB_MAX_ATTEMPTS
+    # El resultado falla con el mismo código que el endpoint sincrónico
+    assert result.status_code == 503
+    assert stored_job(final["job_id"]).attempts == JOB_MAX_ATTEMPTS
+
+def test_expired_results_are_purged(queue, monkeypatch):
+    monkeypatch.setattr(queue, "result_ttl", 0.2)
+
+    async def scenario():
+        async with running(queue) as client:
+            job = (await client.get(f"{API}/ndvi-stats", params=NDVI_PARAMS)).json()
+            await wait_for_status(client, job, (SUCCEEDED,))
+            await asyncio.sleep(0.4)  # Vence el TTL y pasa al menos un ciclo de purga
+            gone = [(await client.get(job[url])).status_code for url in ("status_url", "result_url")]
+            again = (await client.get(f"{API}/ndvi-stats", params=NDVI_PARAMS)).json()
+            return job, gone, again
+
+    job, gone, again = asyncio.run(scenario())
+
+    assert gone == [404, 404]
+    assert stored_job(job["job_id"]) is None
+    # Un envío igual después del vencimiento crea otro trabajo
+    assert again["job_id"] != job["job_id"]
+
+def test_only_jobs_with_an_expired_lease_are_recovered(queue):
+    now = datetime.utcnow()
+    alive = insert_running("otro-proceso-vivo", now + timedelta(hours=1))
+    crashed = insert_running("otro-proceso-caido", now - timedelta(seconds=1))
+
+    async def scenario():
+        async with running(queue) as client:
+            return await wait_for_status(client, {"status_url": f"{API}/jobs/{crashed}"}, (SUCCEEDED,))
+
+    recovered = asyncio.run(scenario())
+
+    assert recovered["status"] == SUCCEEDED and stored_job(crashed).attempts == 2
+    # El trabajo que otro proceso sigue ejecutando (lease vigente) no se toca
+    untouched = stored_job(alive)
+    assert (untouched.status, untouched.worker_id, untouched.attempts) == (RUNNING, "otro-proceso-vivo", 1)
+
+def test_a_renewed_lease_keeps_other_processes_away(queue, monkeypatch):
+    # Otro proceso con la misma base: sólo tomaría el trabajo si el lease venciera
+    other = GEEJobQueue(workers=1, result_ttl=60, poll_seconds=0.05, lease_seconds=0.3)
+    runs = []
+
+    async def slow(params):
+        runs.append(1)
+        await asyncio.sleep(1.0)  # Más de tres leases: el heartbeat lo renueva
+        return []
+
+    monkeypatch.setitem(JOB_HANDLERS, "ndvi", slow)
+
+    async def scenario():
+        async with running(queue) as client:
+            job = (await client.get(f"{API}/ndvi-stats", params=NDVI_PARAMS)).json()
+            await wait_for_status(client, job, (RUNNING,))
+            await other.start()
+            try:
+                final = await wait_for_status(client, job, (SUCCEEDED, FAILED))
+            finally:
+                await other.stop()
+            return final
+
+    final = asyncio.run(scenario())
+
+    assert final["status"] == SUCCEEDED and len(runs) == 1
+
+def test_stop_hands_running_jobs_back(queue, monkeypatch):
+    async def never_ends(params):
+        await asyncio.Event().wait()
+
+    monkeypatch.setitem(JOB_HANDLERS, "ndvi", never_ends)
+
+    async def scenario():
+        async with running(queue) as client:
+            job = (await client.get(f"{API}/ndvi-stats", params=NDVI_PARAMS)).json()
+            await wait_for_status(client, job, (RUNNING,))
+        return job
+
+    job = asyncio.run(scenario())
+
+    stored = stored_job(job["job_id"])
+    assert (stored.status, stored.worker_id, stored.lease_expires_at) == (PENDING, None, None)
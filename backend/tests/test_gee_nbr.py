@@ -0,0 +1,50 @@
+"""
+Análisis NBR: una sola reducción (un ee.Dictionary, un getInfo()) por análisis, cache por
+geometría normalizada y un solo cálculo para los requests equivalentes simultáneos.
+"""
+import asyncio
+
+from app.services.gee import NBR_SEVERITY_LABELS, analyze_nbr, gee_singleflight, nbr_cache_key
+from benchmarks.bench_gee_nbr import polygon, reserialized
+
+PRE, POST = "2024-08-01", "2024-10-01"
+
+def test_cache_key_normalizes_the_geometry():
+    area = polygon(50)
+    assert nbr_cache_key(PRE, POST, reserialized(area)) == nbr_cache_key(PRE, POST, area)
+    assert nbr_cache_key(PRE, POST, polygon(51)) != nbr_cache_key(PRE, POST, area)
+    assert nbr_cache_key(PRE, "2024-10-02", area) != nbr_cache_key(PRE, POST, area)
+    assert nbr_cache_key(PRE, POST, None)[0] == "corrientes"
+
+def test_one_reduction_and_a_cache_hit_for_an_equivalent_geometry(ee_stub):
+    area = polygon(200)
+    response = asyncio.run(analyze_nbr(PRE, POST, area))
+
+    # Estadísticas, percentiles y superficie por clase en el mismo getInfo()
+    assert ee_stub.counters["getInfo"] == 1
+    pre, post = response["results"]
+    assert pre["percentiles"] == {"p10": 0.221, "p50": 0.423, "p90": 0.587}
+    assert post["dNBR"] == 0.214 and post["severity"] == NBR_SEVERITY_LABELS[1]
+    assert [c["severity_class"] for c in response["severity_histogram"]] == [0, 1, 2, 3, 4]
+    assert round(sum(c["percent"] for c in response["severity_histogram"])) == 100
+
+    # El mismo polígono serializado por otro cliente sale del cache, con su propia geometría
+    again = asyncio.run(analyze_nbr(PRE, POST, reserialized(area)))
+    assert ee_stub.counters["getInfo"] == 1
+    assert again["results"] == response["results"]
+    assert again["geometry"] == reserialized(area)
+
+def test_equivalent_concurrent_requests_share_one_getinfo(ee_stub):
+    ee_stub.latency = 0.2
+    area = polygon(200)
+    coalesced = gee_singleflight.coalesced
+
+    async def scenario():
+        geometries = [area, reserialized(area)] * 3
+        return await asyncio.gather(*(analyze_nbr(PRE, POST, geometry) for geometry in geometries))
+
+    responses = asyncio.run(scenario())
+
+    assert ee_stub.counters["getInfo"] == 1
+    assert gee_singleflight.coalesced - coalesced == 5
+    assert all(r["results"] == responses[0]["results"] for r in responses)
@@ -0,0 +1,36 @@
+"""
+Compuestos NDVI guardados: cada request pide a GEE sólo los compuestos que no vio, en un
+único getInfo(), y los rangos ya cubiertos salen de la base sin round trips.
+"""
+from datetime import date
+
+from app.services.gee import gee_service, ndvi_composite_dates
+
+def test_overlapping_ranges_only_compute_new_composites(ee_stub):
+    first = gee_service.get_regional_ndvi_stats("2020-01-01", "2020-06-01")
+    assert ee_stub.counters["getInfo"] == 1
+    assert ee_stub.counters["composites"] == len(ndvi_composite_dates(date(2020, 1, 1), date(2020, 6, 1)))
+    assert [r["date"] for r in first] == [d.isoformat() for d in ndvi_composite_dates(date(2020, 1, 1), date(2020, 6, 1))]
+
+    # Se superpone con el anterior: sólo los compuestos de junio en adelante van a GEE
+    second = gee_service.get_regional_ndvi_stats("2020-03-01", "2020-09-01")
+    new = ndvi_composite_dates(date(2020, 6, 1), date(2020, 9, 1))
+    assert ee_stub.counters["getInfo"] == 2
+    assert ee_stub.counters["composites"] == len(first) + len(new)
+    assert [r["date"] for r in second] == [d.isoformat() for d in ndvi_composite_dates(date(2020, 3, 1), date(2020, 9, 1))]
+
+    # Todo ya guardado: ningún round trip
+    inside = gee_service.get_regional_ndvi_stats("2020-02-01", "2020-08-01")
+    assert ee_stub.counters["getInfo"] == 2
+    assert len(inside) == len(ndvi_composite_dates(date(2020, 2, 1), date(2020, 8, 1)))
+
+def test_unpublished_composites_are_not_requested_again(ee_stub):
+    ee_stub.published_until = "2021-03-01"
+    results = gee_service.get_regional_ndvi_stats("2021-01-01", "2021-06-01")
+    assert ee_stub.counters["getInfo"] == 1
+    assert results[-1]["date"] <= "2021-03-01"
+
+    # Los que faltaban quedan marcados como no publicados hasta GEE_UNPUBLISHED_RECHECK_SECONDS
+    again = gee_service.get_regional_ndvi_stats("2021-01-01", "2021-06-01")
+    assert ee_stub.counters["getInfo"] == 1
+    assert again == results
@@ -0,0 +1,153 @@
+"""
+Índices y agrupamientos de app.utils.geospatial contra referencias por fuerza bruta sobre
+conjuntos sintéticos chicos: GridIndex contra un filtro de todos los puntos, ClusterPyramid
+contra agrupar los puntos originales en la grilla de cada zoom y cluster_events contra las
+componentes conexas del grafo de celdas vecinas armado par por par.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.geospatial import KM_PER_DEGREE, ClusterPyramid, GridIndex, cluster_events
+
+def corrientes_points(rng, n):
+    return rng.uniform(-30.8, -27.2, n), rng.uniform(-59.8, -55.6, n)
+
+def brute_force_bbox(lat, lon, west, south, east, north):
+    return np.flatnonzero((lon >= west) & (lon <= east) & (lat >= south) & (lat <= north))
+
+@pytest.mark.parametrize("seed", range(10))
+def test_grid_index_matches_a_full_scan(seed):
+    rng = np.random.default_rng(seed)
+    lat, lon = corrientes_points(rng, 500)
+    index = GridIndex(lat, lon, cell_size=float(rng.choice([0.05, 0.1, 0.5])))
+
+    for _ in range(50):
+        # bboxes dentro, cruzando los bordes y completamente fuera de los datos
+        west, east = np.sort(rng.uniform(-61.0, -54.5, 2))
+        south, north = np.sort(rng.uniform(-32.0, -26.0, 2))
+        assert index.query(west, south, east, north).tolist() == brute_force_bbox(lat, lon, west, south, east, north).tolist()
+
+def test_grid_index_edges():
+    lat = np.array([-28.0, -28.0, -27.5])
+    lon = np.array([-58.0, -57.9, -57.5])
+    index = GridIndex(lat, lon, cell_size=0.1)
+
+    # Los bordes del bbox son inclusivos
+    assert index.query(-58.0, -28.0, -57.9, -28.0).tolist() == [0, 1]
+    assert index.query(-57.0, -27.0, -56.0, -26.0).tolist() == []
+    assert index.query(-57.9, -27.0, -58.0, -26.0).tolist() == []  # Oeste al este del borde este
+    assert GridIndex(np.empty(0), np.empty(0)).query(-180, -90, 180, 90).tolist() == []
+
+def brute_force_clusters(lat, lon, frp, zoom, cells_per_tile=4):
+    """Clusters de un zoom agrupando directamente los puntos originales por celda."""
+    cell_size = 360.0 / (2 ** zoom * cells_per_tile)
+    cells = {}
+    for point_lat, point_lon, point_frp in zip(lat, lon, frp):
+        key = (math.floor(point_lat / cell_size), math.floor(point_lon / cell_size))
+        cells.setdefault(key, []).append((point_lat, point_lon, point_frp))
+    return sorted(
+        (len(points), max(p[2] for p in points), sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points))
+        for points in cells.values()
+    )
+
+def as_rows(clusters: pd.DataFrame):
+    return sorted(clusters[["cantidad", "frp_max", "latitud", "longitud"]].itertuples(index=False, name=None))
+
+@pytest.mark.parametrize("seed", range(5))
+def test_cluster_pyramid_matches_grouping_the_raw_points(seed):
+    rng = np.random.default_rng(seed)
+    lat, lon = corrientes_points(rng, 400)
+    frp = rng.uniform(0, 300, 400)
+    pyramid = ClusterPyramid(lat, lon, frp, max_zoom=10)
+
+    for zoom in range(11):
+        clusters = pyramid.query(zoom, None)
+        expected = brute_force_clusters(lat, lon, frp, zoom)
+        assert clusters["cantidad"].sum() == 400
+        assert [row[:2] for row in as_rows(clusters)] == [row[:2] for row in expected]
+        np.testing.assert_allclose([row[2:] for row in as_rows(clusters)], [row[2:] for row in expected], rtol=0, atol=1e-9)
+
+def test_cluster_pyramid_queries_by_bbox_with_one_cell_of_margin():
+    rng = np.random.default_rng(42)
+    lat, lon = corrientes_points(rng, 1000)
+    pyramid = ClusterPyramid(lat, lon, rng.uniform(0, 300, 1000), max_zoom=8)
+    bbox = (-58.5, -29.5, -57.0, -28.0)
+
+    for zoom in (3, 6, 8, 12):
+        clusters, index = pyramid.levels[min(zoom, 8)]
+        pad = index.cell_size
+        expected = brute_force_bbox(
+            clusters["latitud"].to_numpy(), clusters["longitud"].to_numpy(),
+            bbox[0] - pad, bbox[1] - pad, bbox[2] + pad, bbox[3] + pad,
+        )
+        # Los zooms mayores que max_zoom usan el nivel más fino
+        assert pyramid.query(zoom, bbox).index.tolist() == clusters.index[expected].tolist()
+
+def brute_force_events(lat, lon, hours, distance_km, gap_hours):
+    """
+    Referencia de cluster_events: la celda de cada punto y una unión de todos los pares cuyas
+    celdas se tocan (a lo sumo una de diferencia en fila, columna y tiempo). Devuelve la partición.
+    """
+    lat_step = distance_km / KM_PER_DEGREE
+    lon_step = distance_km / (KM_PER_DEGREE * math.cos(math.radians(np.mean(lat))))
+    cells = [
+        (math.floor((a - lat.min()) / lat_step), math.floor((b - lon.min()) / lon_step), math.floor((h - hours.min()) / gap_hours))
+        for a, b, h in zip(lat, lon, hours)
+    ]
+    parent = list(range(len(cells)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(len(cells)):
+        for j in range(i + 1, len(cells)):
+            if max(abs(p - q) for p, q in zip(cells[i], cells[j])) <= 1:
+                parent[find(i)] = find(j)
+    return partition([find(i) for i in range(len(cells))])
+
+def partition(labels):
+    groups = {}
+    for i, label in enumerate(labels):
+        groups.setdefault(label, []).append(i)
+    return sorted(groups.values())
+
+@pytest.mark.parametrize("seed", range(20))
+def test_cluster_events_matches_the_pairwise_components(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 250))
+    # Focos alrededor de unos pocos centros, con dispersión y horas variadas, y otros sueltos
+    centers = rng.uniform([-29.0, -58.5, 0], [-28.0, -57.0, 96], (5, 3))
+    picked = centers[rng.integers(0, 5, n)] + rng.normal(0, [0.02, 0.02, 6], (n, 3))
+    lone = rng.random(n) < 0.2
+    picked[lone] = rng.uniform([-29.0, -58.5, 0], [-28.0, -57.0, 96], (int(lone.sum()), 3))
+    lat, lon, hours = picked.T
+    hours = hours - hours.min()
+
+    labels = cluster_events(lat, lon, hours, distance_km=2.0, gap_hours=12.0)
+
+    assert partition(labels.tolist()) == brute_force_events(lat, lon, hours, 2.0, 12.0)
+    # Etiquetas consecutivas desde 0
+    assert sorted(set(labels.tolist())) == list(range(labels.max() + 1))
+
+def test_cluster_events_links_chains_and_splits_by_time_gap():
+    step = 0.9 / KM_PER_DEGREE  # Menos de distance_km entre focos consecutivos
+    chain = [(-28.0 + i * step, -58.0, 0.0) for i in range(10)]
+    # El mismo lugar que el inicio de la cadena, 30 horas después (más de dos gap_hours)
+    later = [(-28.0, -58.0, 30.0), (-28.0 + step, -58.0, 31.0)]
+    # A 20 km: otro evento aunque sea a la misma hora
+    far = [(-28.0, -58.0 + 20 / KM_PER_DEGREE, 0.5)]
+    lat, lon, hours = (np.array(values) for values in zip(*(chain + later + far)))
+
+    labels = cluster_events(lat, lon, hours, distance_km=1.0, gap_hours=12.0)
+
+    assert partition(labels.tolist()) == [list(range(10)), [10, 11], [12]]
+
+def test_cluster_events_single_and_empty():
+    assert cluster_events(np.array([-28.0]), np.array([-58.0]), np.array([0.0]), 1.0, 12.0).tolist() == [0]
+    assert cluster_events(np.empty(0), np.empty(0), np.empty(0), 1.0, 12.0).tolist() == []
@@ -0,0 +1,98 @@
+"""
+Etiquetado de áreas protegidas: ProtectedAreaIndex contra un recorrido punto por punto,
+con áreas anidadas, bordes compartidos y agujeros, y la función apagada cuando no hay
+límites oficiales configurados (PROTECTED_AREAS_GEOJSON).
+"""
+import json
+
+import numpy as np
+import pytest
+import shapely
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.firms import _transform_detections
+from app.utils.geospatial import ProtectedAreaIndex, get_protected_areas
+from benchmarks.synthetic_firms import CORRIENTES_BOUNDS, generate_viirs, synthetic_areas
+
+def area(name, west, south, east, north, holes=()):
+    polygon = shapely.Polygon(
+        [(west, south), (east, south), (east, north), (west, north)],
+        holes=[[(w, s), (e, s), (e, n), (w, n)] for w, s, e, n in holes],
+    )
+    return {"geometry": shapely.geometry.mapping(polygon), "properties": {"nombre": name}}
+
+RESERVA = area("Reserva", -58.0, -29.0, -57.0, -28.0)
+PARQUE = area("Parque", -57.8, -28.8, -57.4, -28.4)  # Dentro de la reserva
+VECINA = area("Vecina", -57.0, -28.5, -56.8, -28.3)  # Comparte parte del borde este de la reserva
+
+def tag(index, *points):
+    lat, lon = zip(*points)
+    return index.tag(np.array(lat, dtype="float64"), np.array(lon, dtype="float64")).tolist()
+
+@pytest.mark.parametrize("features", [[RESERVA, PARQUE, VECINA], [VECINA, PARQUE, RESERVA]])
+def test_the_smallest_area_wins(features):
+    index = ProtectedAreaIndex(features)
+
+    assert tag(index, (-28.6, -57.6), (-28.2, -57.2), (-28.4, -56.9), (-28.6, -56.0)) == ["Parque", "Reserva", "Vecina", None]
+
+def test_points_on_the_boundary_belong_to_the_area():
+    index = ProtectedAreaIndex([RESERVA, PARQUE, VECINA, area("Con laguna", -56.0, -30.0, -55.0, -29.0, holes=[(-55.8, -29.8, -55.2, -29.2)])])
+
+    assert tag(index, (-29.0, -57.5), (-28.0, -58.0)) == ["Reserva", "Reserva"]  # Borde y vértice
+    assert tag(index, (-28.8, -57.6)) == ["Parque"]  # Borde del parque, dentro de la reserva
+    assert tag(index, (-28.4, -57.0)) == ["Vecina"]  # Borde compartido: gana la más chica
+    # Dentro del agujero no hay área; sobre su borde, sí
+    assert tag(index, (-29.5, -55.5), (-29.8, -55.5)) == [None, "Con laguna"]
+
+def brute_force(features, lat, lon):
+    """Para cada punto, el área de menor superficie que lo contiene (o lo toca), recorriéndolas todas."""
+    areas = sorted(((shapely.geometry.shape(f["geometry"]), f["properties"]["nombre"]) for f in features), key=lambda a: a[0].area)
+    return [
+        next((name for geometry, name in areas if geometry.intersects(shapely.Point(x, y))), None)
+        for y, x in zip(lat, lon)
+    ]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_tag_matches_a_point_by_point_scan(seed):
+    features = synthetic_areas(30, seed=seed)
+    rng = np.random.default_rng(seed)
+    west, south, east, north = CORRIENTES_BOUNDS
+    lat, lon = rng.uniform(south, north, 500), rng.uniform(west, east, 500)
+    # Vértices de los polígonos: puntos exactamente sobre los bordes
+    vertices = np.concatenate([np.asarray(f["geometry"]["coordinates"][0]) for f in features[:5]])
+    lat, lon = np.concatenate([lat, vertices[:, 1]]), np.concatenate([lon, vertices[:, 0]])
+
+    assert ProtectedAreaIndex(features).tag(lat, lon).tolist() == brute_force(features, lat, lon)
+
+def test_missing_coordinates_and_empty_batches():
+    index = ProtectedAreaIndex([RESERVA])
+
+    assert tag(index, (np.nan, -57.5), (-28.5, np.nan), (-28.5, -57.5)) == [None, None, "Reserva"]
+    assert index.tag(np.empty(0), np.empty(0)).tolist() == []
+    assert tag(ProtectedAreaIndex([]), (-28.5, -57.5)) == [None]
+
+@pytest.fixture
+def protected_areas_file(tmp_path, monkeypatch):
+    path = tmp_path / "areas_protegidas.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": [RESERVA, PARQUE]}), encoding="utf-8")
+    monkeypatch.setattr(settings, "PROTECTED_AREAS_GEOJSON", str(path))
+    get_protected_areas.cache_clear()
+    yield path
+    get_protected_areas.cache_clear()
+
+def test_without_official_boundaries_nothing_is_tagged():
+    get_protected_areas.cache_clear()
+    focos = _transform_detections(generate_viirs(200, seed=0))
+
+    assert get_protected_areas() is None
+    assert focos["area_protegida"].isna().all()
+    response = TestClient(app).get("/api/v1/firms/stats", params={"agrupar_por": "area_protegida"})
+    assert response.status_code == 400 and "PROTECTED_AREAS_GEOJSON" in response.json()["detail"]
+
+def test_configured_boundaries_tag_the_detections(protected_areas_file):
+    raw = generate_viirs(3, seed=0)
+    raw["latitude"], raw["longitude"] = [-28.6, -28.2, -27.0], [-57.6, -57.2, -57.0]
+
+    assert _transform_detections(raw)["area_protegida"].tolist() == ["Parque", "Reserva", None]
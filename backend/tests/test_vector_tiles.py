@@ -0,0 +1,155 @@
+"""
+Codificador MVT de app.utils.vector_tiles contra un decodificador protobuf mínimo escrito
+a partir de la especificación (formato de cable + vector_tile.proto 2.1), y la proyección
+de los tiles contra las fórmulas escalares de Web Mercator.
+"""
+import math
+import struct
+
+import numpy as np
+import pytest
+
+from app.utils.vector_tiles import MVT_EXTENT, encode_point_layer, project_to_tile, tile_bounds
+
+def read_varint(data: bytes, pos: int):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return result, pos
+
+def read_fields(data: bytes):
+    """Lista de (campo, valor) de un mensaje: int para varints, bytes para 64 bits y longitud."""
+    fields, pos = [], 0
+    while pos < len(data):
+        key, pos = read_varint(data, pos)
+        field, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            value, pos = read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = data[pos:pos + 8], pos + 8
+        elif wire_type == 2:
+            length, pos = read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        else:
+            raise AssertionError(f"tipo de cable inesperado {wire_type}")
+        fields.append((field, value))
+    return fields
+
+def read_packed(data: bytes):
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = read_varint(data, pos)
+        values.append(value)
+    return values
+
+def unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+def decode_value(data: bytes):
+    ((field, raw),) = read_fields(data)
+    if field == 1:
+        return raw.decode("utf-8")
+    if field == 3:
+        return struct.unpack("<d", raw)[0]
+    if field == 6:
+        return unzigzag(raw)
+    if field == 7:
+        return bool(raw)
+    raise AssertionError(f"campo de Value inesperado {field}")
+
+def decode_tile(tile: bytes):
+    """(capa, features) con cada feature como (x, y, atributos)."""
+    ((field, layer_bytes),) = read_fields(tile)
+    assert field == 3  # Tile.layers
+    layer = {"features": [], "keys": [], "values": []}
+    for field, value in read_fields(layer_bytes):
+        if field == 15:
+            layer["version"] = value
+        elif field == 1:
+            layer["name"] = value.decode("utf-8")
+        elif field == 2:
+            layer["features"].append(value)
+        elif field == 3:
+            layer["keys"].append(value.decode("utf-8"))
+        elif field == 4:
+            layer["values"].append(decode_value(value))
+        elif field == 5:
+            layer["extent"] = value
+    features = []
+    for feature_bytes in layer.pop("features"):
+        feature = dict(read_fields(feature_bytes))
+        assert feature[3] == 1  # GeomType.POINT
+        command, x, y = read_packed(feature[4])
+        assert command == (1 << 3) | 1  # MoveTo, un punto
+        tags = read_packed(feature[2])
+        properties = {layer["keys"][k]: layer["values"][v] for k, v in zip(tags[::2], tags[1::2])}
+        features.append((unzigzag(x), unzigzag(y), properties))
+    return layer, features
+
+def test_point_layer_round_trips():
+    rng = np.random.default_rng(0)
+    n = 200
+    # Coordenadas negativas y mayores que 2**14 (fuera de la tabla de varints chicos)
+    tile_x = rng.integers(-100, 20_000, n)
+    tile_y = rng.integers(-100, 20_000, n)
+    properties = {
+        "confianza": rng.choice(["alta", "nominal", "baja", None], n).tolist(),
+        "frp": [None if i % 7 == 0 else float(v) for i, v in enumerate(rng.uniform(0, 500, n).round(1))],
+        "cantidad": rng.integers(-3, 3, n).tolist(),
+        "diurno": rng.choice([True, False], n).tolist(),
+        "area_protegida": ["Esteros del Iberá" if i % 5 == 0 else None for i in range(n)],
+    }
+
+    layer, features = decode_tile(encode_point_layer("focos", tile_x, tile_y, properties))
+
+    assert (layer["version"], layer["name"], layer["extent"]) == (2, "focos", MVT_EXTENT)
+    assert layer["keys"] == list(properties)
+    # La tabla de valores se comparte: cada valor distinto de un atributo aparece una sola vez
+    assert len(layer["values"]) == sum(len({v for v in column if v is not None}) for column in properties.values())
+    assert len(features) == n
+    for i, (x, y, decoded) in enumerate(features):
+        assert (x, y) == (tile_x[i], tile_y[i])
+        # Los None se omiten del feature y los tipos se conservan
+        expected = {key: column[i] for key, column in properties.items() if column[i] is not None}
+        assert decoded == expected
+        assert [type(v) for v in decoded.values()] == [type(v) for v in expected.values()]
+
+def test_empty_layer_has_no_features():
+    layer, features = decode_tile(encode_point_layer("focos", np.empty(0, "int64"), np.empty(0, "int64"), {"frp": []}))
+
+    assert features == [] and layer["keys"] == ["frp"] and layer["values"] == []
+
+def mercator_pixel(lat: float, lon: float, z: int, x: int, y: int):
+    """Referencia escalar: posición del punto en el tile, en unidades del extent."""
+    n = 2 ** z
+    world_x = (lon + 180.0) / 360.0 * n
+    world_y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+    return math.floor((world_x - x) * MVT_EXTENT), math.floor((world_y - y) * MVT_EXTENT)
+
+@pytest.mark.parametrize("z, x, y", [(0, 0, 0), (5, 10, 18), (9, 170, 291), (14, 5466, 9384)])
+def test_projection_matches_the_scalar_formula(z, x, y):
+    west, south, east, north = tile_bounds(z, x, y)
+    rng = np.random.default_rng(z)
+    lat = rng.uniform(south, north, 100)
+    lon = rng.uniform(west, east, 100)
+
+    tile_x, tile_y = project_to_tile(lat, lon, z, x, y)
+
+    reference = [mercator_pixel(a, b, z, x, y) for a, b in zip(lat, lon)]
+    # Tolera un píxel por el redondeo en el borde de floor
+    assert np.abs(tile_x - [px for px, _ in reference]).max() <= 1
+    assert np.abs(tile_y - [py for _, py in reference]).max() <= 1
+    assert ((tile_x >= 0) & (tile_x < MVT_EXTENT) & (tile_y >= 0) & (tile_y < MVT_EXTENT)).all()
+
+def test_tile_bounds_are_the_tile_corners():
+    z, x, y = 9, 170, 291
+    west, south, east, north = tile_bounds(z, x, y)
+    tile_x, tile_y = project_to_tile(np.array([north - 1e-9, south + 1e-9]), np.array([west + 1e-9, east - 1e-9]), z, x, y)
+
+    assert (tile_x.tolist(), tile_y.tolist()) == ([0, MVT_EXTENT - 1], [0, MVT_EXTENT - 1])
+    # Los tiles vecinos comparten bordes
+    assert tile_bounds(z, x + 1, y)[0] == east and tile_bounds(z, x, y + 1)[3] == south